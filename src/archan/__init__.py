@@ -10,7 +10,7 @@ from typing import List
 
 from .dsm import DesignStructureMatrix, DomainMappingMatrix, MultipleDomainMatrix
 from .logging import Logger
-from .plugins import Argument, Checker, Provider
+from .plugins import Argument, Checker, Message, Provider
 
 __all__: List[str] = [
     "DesignStructureMatrix",
@@ -19,6 +19,7 @@ __all__: List[str] = [
     "Provider",
     "Checker",
     "Argument",
+    "Message",
     "Logger",
 ]  # noqa: WPS410
 __version__ = "3.0.0"  # noqa: WPS410 (the only __variables__ we use)
@@ -2,13 +2,23 @@
 
 """Analysis module."""
 
+import contextlib
+import json
+import shutil
 import sys
+import tempfile
+import time
+import weakref
+from collections import namedtuple
 
-from tap.tracker import Tracker
-
+from .cache import DEFAULT_PROVIDER_CACHE_SIZE, ProviderCache, cache_dir
 from .enums import ResultCode
+from .errors import MatrixError, PluginCrashError, PluginTimeoutError
 from .logging import Logger
+from .output import TapWriter
+from .plugins import CheckerResult, Message
 from .printing import PrintableNameMixin, PrintableResultMixin
+from .registry import PluginInfo
 
 logger = Logger.get_logger(__name__)
 
@@ -20,23 +30,346 @@ class Analysis:
     An instance of Analysis contains a Config object.
     Providers are first run to generate the data, then
     these data are all checked against every checker.
+
+    Once every checker of a provider ran, the provider's data can be kept
+    in memory (default), freed, or spilled to disk to be reloaded on
+    access. Results only keep the metadata of providers, so freeing data
+    bounds memory usage to the data of one provider at a time.
+
+    Plugins running for longer than their timeout, or than the time left
+    in the time budget of the configuration, are interrupted: their results
+    have the ``TIMEOUT`` code, and the analysis goes on with the next plugins.
+    Once the time budget is exhausted, the remaining plugins are not run.
+
+    Plugins configured with ``isolate`` run in worker processes, limited
+    by the ``memory_limit`` (in mebibytes) and ``cpu_limit`` (in seconds)
+    items of the ``isolation`` item of the configuration. Their errors and
+    crashes are reported as failed results, and the analysis goes on.
+    Isolated checkers attach the provider's matrix from shared memory.
+
+    In fail-fast mode, checkers are scheduled by decreasing priority,
+    then increasing cost, and groups by the priority and total cost
+    of their checkers. The analysis stops on the first failure:
+    the remaining checkers and groups have no results.
     """
 
-    def __init__(self, config):
+    PROVIDER_DATA_MODES = ("keep", "free", "spill")
+    DEFAULT_PROVIDER_CONCURRENCY = 8
+    FAILURE_CODES = frozenset((ResultCode.FAILED, ResultCode.TIMEOUT))
+
+    def __init__(self, config, provider_data="keep", fail_fast=False, use_cache=True):
         """
         Initialization method.
 
         Args:
             config (Config): the configuration object to use for analysis.
+            provider_data (str): what to do with providers' data once
+                their checkers ran: "keep", "free" or "spill".
+            fail_fast (bool): run cheap checkers first, and stop on the first failure.
+            use_cache (bool): whether to read and write the data of providers configured to be cached.
+
+        Raises:
+            ValueError: when the provider data mode is unknown.
         """
+        if provider_data not in self.PROVIDER_DATA_MODES:
+            raise ValueError("provider_data must be one of %s" % ", ".join(self.PROVIDER_DATA_MODES))
         self.config = config
+        self.provider_data = provider_data
+        self.fail_fast = fail_fast
+        self.use_cache = use_cache
+        self.stopped = False
         self.results = []
+        self._spill_dir = None
+        self._deadline = None
+        self._worker_pool = None
+        self._shared_data = None
+        self._provider_cache = None
+        self._prefetched = {}
 
-    @staticmethod
-    def _get_checker_result(group, checker, provider=None, nd=""):
+    @property
+    def spill_dir(self):
+        """Return a temporary directory to spill providers' data, removed with the analysis."""
+        if self._spill_dir is None:
+            try:
+                directory = cache_dir("spill")
+            except OSError as error:
+                logger.debug("Cannot use cache directory: %s", error)
+                directory = None
+            self._spill_dir = tempfile.mkdtemp(prefix="spill-", dir=directory)
+            weakref.finalize(self, shutil.rmtree, self._spill_dir, ignore_errors=True)
+        return self._spill_dir
+
+    @property
+    def worker_pool(self):
+        """Return the pool of worker processes running isolated plugins, stopped with the analysis."""
+        if self._worker_pool is None:
+            from .isolation import WorkerPool  # noqa: WPS433 (costly import, done only when needed)
+
+            isolation = self.config.isolation
+            self._worker_pool = WorkerPool(isolation.get("memory_limit"), isolation.get("cpu_limit"))
+            weakref.finalize(self, self._worker_pool.close)
+        return self._worker_pool
+
+    @property
+    def provider_cache(self):
+        """Return the cache of providers' data, or None if it cannot be used."""
+        if self._provider_cache is None and self.use_cache:
+            max_size = self.config.provider_cache.get("max_size", DEFAULT_PROVIDER_CACHE_SIZE)
+            try:
+                self._provider_cache = ProviderCache(max_size=max_size)
+            except OSError as error:
+                logger.debug("Cannot use cache directory: %s", error)
+                self.use_cache = False
+        return self._provider_cache
+
+    def close(self):
+        """Stop the worker processes running isolated plugins, if any."""
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+
+    @contextlib.contextmanager
+    def time_budget(self):
+        """
+        Limit the time of the analysis groups run in this context to the configured time budget.
+
+        Yields:
+            None: the deadline is cleared on exit.
+        """
+        time_budget = self.config.time_budget
+        self._deadline = time.monotonic() + time_budget if time_budget else None
+        try:
+            yield
+        finally:
+            self._deadline = None
+
+    def remaining_time(self):
+        """
+        Return the time left in the time budget of the running analysis.
+
+        Returns:
+            float: the time left in seconds, or None without time budget.
+        """
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+
+    def _timeout_for(self, plugin):
+        remaining = self.remaining_time()
+        if remaining is None or (plugin.timeout and plugin.timeout < remaining):
+            return plugin.timeout
+        return max(remaining, 0)
+
+    def _budget_exhausted(self):
+        return Message("Time budget of %gs exhausted", (self.config.time_budget,))
+
+    def _get_checker_result(self, group, checker, provider=None, provider_info=None, nd=""):
+        timeout = self._timeout_for(checker)
+        if timeout == 0:
+            return Result(group, provider_info, checker, ResultCode.TIMEOUT, (self._budget_exhausted(),))
         logger.info("Run %schecker %s", nd, checker.identifier or checker.name)
-        checker.run(provider.data if provider else None)
-        return Result(group, provider, checker, *checker.result)
+        data = provider.data if provider else None
+        if checker.isolate:
+            self._run_isolated_checker(checker, data, timeout)
+        elif timeout is None:
+            checker.run(data)
+        else:
+            checker.run(data, timeout=timeout)
+        return Result(group, provider_info, checker, *checker.result)
+
+    def _run_isolated_checker(self, checker, data, timeout):
+        try:
+            self.worker_pool.run_checker(checker, self._shared_data or data, timeout)
+        except PluginTimeoutError as error:
+            logger.warning("Checker %s %s", checker.identifier or checker.name, error)
+            checker.result = CheckerResult(ResultCode.TIMEOUT, (Message("Timed out after %gs", (error.timeout,)),))
+        except PluginCrashError as error:
+            logger.error("Checker %s crashed: %s", checker.identifier or checker.name, error)
+            code = ResultCode.IGNORED if checker.allow_failure else ResultCode.FAILED
+            checker.result = CheckerResult(code, (Message("Checker crashed: %s", (str(error),)),))
+
+    def _share_data(self, provider, checkers):
+        # isolated checkers attach the data placed in shared memory, instead of receiving a copy each
+        if not any(checker.isolate for checker in checkers):
+            return None
+        try:
+            return provider.data.share()
+        except (AttributeError, MatrixError) as error:
+            logger.debug("Cannot share data of provider %s: %s", provider.identifier, error)
+            return None
+
+    def _prepare_provider(self, provider):
+        # return the timeout and cache key of the provider to run, or its failure if it must not run
+        timeout = self._timeout_for(provider)
+        if timeout == 0:
+            return False, (ResultCode.TIMEOUT, (self._budget_exhausted(),)), None, None
+        cache_key = ProviderCache.key(provider) if self.use_cache else None
+        if cache_key is not None and self.provider_cache is not None:
+            data = self.provider_cache.load(cache_key)
+            if data is not None:
+                logger.info("Read data of provider %s from cache", provider.identifier)
+                provider.data = data
+                return False, None, None, None
+        logger.info("Run provider %s", provider.identifier)
+        return True, None, timeout, cache_key
+
+    def _store_provider_data(self, provider, cache_key):
+        if cache_key is not None and self.provider_cache is not None and provider.data is not None:
+            self.provider_cache.store(cache_key, provider.data)
+
+    @staticmethod
+    def _provider_timed_out(provider, error):
+        logger.warning("Provider %s %s", provider.identifier, error)
+        return ResultCode.TIMEOUT, (Message("Provider timed out after %gs", (error.timeout,)),)
+
+    def _run_provider(self, provider):
+        # return the code and messages of the checkers' results if the provider did not succeed
+        if id(provider) in self._prefetched:
+            failure = self._prefetched.pop(id(provider))
+            if isinstance(failure, BaseException):
+                raise failure
+            return failure
+        must_run, failure, timeout, cache_key = self._prepare_provider(provider)
+        if not must_run:
+            return failure
+        try:
+            if provider.isolate:
+                self.worker_pool.run_provider(provider, timeout)
+            elif timeout is None:
+                provider.run()
+            else:
+                provider.run(timeout=timeout)
+        except PluginTimeoutError as error:
+            return self._provider_timed_out(provider, error)
+        except PluginCrashError as error:
+            logger.error("Provider %s crashed: %s", provider.identifier, error)
+            return ResultCode.FAILED, (Message("Provider crashed: %s", (str(error),)),)
+        self._store_provider_data(provider, cache_key)
+        return None
+
+    async def _run_provider_async(self, provider, semaphore, executor):
+        import asyncio  # noqa: WPS433 (costly import, done only when needed)
+
+        loop = asyncio.get_event_loop()
+        async with semaphore:
+            # reading and writing the cache must not block the other providers
+            must_run, failure, timeout, cache_key = await loop.run_in_executor(
+                executor, self._prepare_provider, provider
+            )
+            if not must_run:
+                return failure
+            try:
+                await provider.run_async(timeout, executor)
+            except PluginTimeoutError as error:
+                return self._provider_timed_out(provider, error)
+            await loop.run_in_executor(executor, self._store_provider_data, provider, cache_key)
+        return None
+
+    def concurrent_providers(self, groups):
+        """
+        Return the providers to run concurrently before the analysis groups.
+
+        Asynchronous providers always are, unless isolated. Synchronous providers
+        are too, in threads, when the configuration sets ``provider_concurrency``.
+        None are when providers' data are freed or spilled, or in fail-fast mode,
+        as all their data would be loaded before the first group runs.
+
+        Args:
+            groups (list of AnalysisGroup): the groups to run.
+
+        Returns:
+            list of Provider: the providers.
+        """
+        if self.provider_data != "keep" or self.fail_fast:
+            return []
+        everyone = bool(self.config.provider_concurrency)
+        return [
+            provider
+            for analysis_group in groups
+            for provider in analysis_group.providers
+            if not provider.isolate and (everyone or provider.is_async)
+        ]
+
+    def run_providers_concurrently(self, providers):
+        """
+        Run providers concurrently on an event loop, and keep their failures for the analysis.
+
+        At most ``provider_concurrency`` providers (8 by default) run at the same time.
+        Synchronous providers run in a pool of as many threads. Errors raised by
+        a provider are raised again when its analysis group runs, as if it ran then.
+
+        Args:
+            providers (list of Provider): the providers.
+        """
+        import asyncio  # noqa: WPS433 (costly import, done only when needed)
+        from concurrent.futures import ThreadPoolExecutor  # noqa: WPS433 (costly import, done only when needed)
+
+        limit = self.config.provider_concurrency or self.DEFAULT_PROVIDER_CONCURRENCY
+        logger.info("Run %d providers concurrently, %d at a time", len(providers), limit)
+        if self.use_cache:
+            self.provider_cache  # noqa: WPS428 (create the cache before the threads use it)
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="archan-provider")
+
+        async def run_all():  # noqa: WPS430 (the semaphore must be created in the loop)
+            semaphore = asyncio.Semaphore(limit)
+            return await asyncio.gather(
+                *(self._run_provider_async(provider, semaphore, executor) for provider in providers),
+                return_exceptions=True,
+            )
+
+        try:
+            failures = loop.run_until_complete(run_all())
+        finally:
+            executor.shutdown(wait=False)
+            loop.close()
+        self._prefetched = {id(provider): failure for provider, failure in zip(providers, failures)}
+
+    @staticmethod
+    def schedule_checkers(checkers):
+        """
+        Return checkers in fail-fast order: higher priorities first, then cheaper ones.
+
+        Args:
+            checkers (list of Checker): the checkers.
+
+        Returns:
+            list of Checker: the sorted checkers.
+        """
+        return sorted(checkers, key=lambda checker: (-checker.priority, checker.cost))
+
+    @staticmethod
+    def schedule_groups(groups):
+        """
+        Return groups in fail-fast order, based on the priority and total cost of their checkers.
+
+        Args:
+            groups (list of AnalysisGroup): the groups.
+
+        Returns:
+            list of AnalysisGroup: the sorted groups.
+        """
+
+        def group_key(group):
+            if not group.checkers:
+                return (0, 0)
+            priority = max(checker.priority for checker in group.checkers)
+            cost = sum(checker.cost for checker in group.checkers) * max(len(group.providers), 1)
+            return (-priority, cost)
+
+        return sorted(groups, key=group_key)
+
+    def release_data(self, provider):
+        """
+        Free or spill the data of a provider whose checkers all ran, depending on the analysis mode.
+
+        Args:
+            provider (Provider): the provider.
+        """
+        if self.provider_data == "free":
+            logger.debug("Free data of provider %s", provider.identifier)
+            provider.release()
+        elif self.provider_data == "spill":
+            provider.release(spill_dir=self.spill_dir)
 
     def run(self, verbose=True):
         """
@@ -49,74 +382,152 @@ class Analysis:
             verbose (bool): whether to immediately print the results or not.
         """
         self.results.clear()
+        self.stopped = False
 
-        for analysis_group in self.config.analysis_groups:
-            if analysis_group.providers:
-                for provider in analysis_group.providers:
-                    logger.info("Run provider %s", provider.identifier)
-                    provider.run()
-                    for checker in analysis_group.checkers:
-                        result = self._get_checker_result(analysis_group, checker, provider)
-                        self.results.append(result)
-                        analysis_group.results.append(result)
-                        if verbose:
-                            result.print()
-            else:
-                for checker in analysis_group.checkers:
-                    result = self._get_checker_result(analysis_group, checker, nd="no-data-")
-                    self.results.append(result)
-                    analysis_group.results.append(result)
-                    if verbose:
-                        result.print()
-
-    def print_results(self):
-        """Print analysis results as text on standard output."""
-        for result in self.results:
+        groups = self.config.analysis_groups
+        if self.fail_fast:
+            for analysis_group in groups:
+                analysis_group.results.clear()
+            groups = self.schedule_groups(groups)
+
+        with self.time_budget():
+            try:
+                concurrent_providers = self.concurrent_providers(groups)
+                if len(concurrent_providers) > 1 and self.config.provider_concurrency != 1:
+                    self.run_providers_concurrently(concurrent_providers)
+                for analysis_group in groups:
+                    self.results.extend(self.run_group(analysis_group, verbose=verbose))
+                    if self.stopped:
+                        break
+            finally:
+                self._prefetched = {}
+
+    def run_group(self, analysis_group, verbose=False):
+        """
+        Run a single analysis group, replacing its previous results.
+
+        Args:
+            analysis_group (AnalysisGroup): the group to run.
+            verbose (bool): whether to immediately print the results or not.
+
+        Returns:
+            list of Result: the results of the group.
+        """
+        analysis_group.results.clear()
+        checkers = analysis_group.checkers
+        if self.fail_fast:
+            checkers = self.schedule_checkers(checkers)
+        if analysis_group.providers:
+            for provider in analysis_group.providers:
+                failure = self._run_provider(provider)
+                provider_info = PluginInfo(provider.identifier, provider.name, provider.description)
+                self._shared_data = None if failure else self._share_data(provider, checkers)
+                try:
+                    for checker in checkers:
+                        if failure:
+                            result = Result(analysis_group, provider_info, checker, *failure)
+                        else:
+                            result = self._get_checker_result(analysis_group, checker, provider, provider_info)
+                        if self._add_result(analysis_group, result, verbose):
+                            break
+                finally:
+                    if self._shared_data is not None:
+                        self._shared_data.unlink()
+                        self._shared_data = None
+                self.release_data(provider)
+                if self.stopped:
+                    break
+        else:
+            for checker in checkers:
+                result = self._get_checker_result(analysis_group, checker, nd="no-data-")
+                if self._add_result(analysis_group, result, verbose):
+                    break
+        return analysis_group.results
+
+    def _add_result(self, analysis_group, result, verbose):
+        analysis_group.results.append(result)
+        if verbose:
             result.print()
+        if self.fail_fast and result.code in self.FAILURE_CODES:
+            logger.info("Fail fast: stop after the first failure, of %s", result.checker.name)
+            self.stopped = True
+        return self.stopped
 
-    def output_tap(self):
-        """Output analysis results in TAP format."""
-        tracker = Tracker(streaming=True, stream=sys.stdout)
-        for group in self.config.analysis_groups:
-            n_providers = len(group.providers)
-            n_checkers = len(group.checkers)
-            if not group.providers and group.checkers:
-                test_suite = group.name
-                description_lambda = lambda r: r.checker.name
-            elif not group.checkers:
-                logger.warning("Invalid analysis group (no checkers), skipping")
-                continue
-            elif n_providers > n_checkers:
-                test_suite = group.checkers[0].name
-                description_lambda = lambda r: r.provider.name
-            else:
-                test_suite = group.providers[0].name
-                description_lambda = lambda r: r.checker.name
-
-            for result in group.results:
-                description = description_lambda(result)
-                if result.code == ResultCode.PASSED:
-                    tracker.add_ok(test_suite, description)
-                elif result.code == ResultCode.IGNORED:
-                    tracker.add_ok(test_suite, description + " (ALLOWED FAILURE)")
-                elif result.code == ResultCode.NOT_IMPLEMENTED:
-                    tracker.add_not_ok(test_suite, description, "TODO implement the test")
-                elif result.code == ResultCode.FAILED:
-                    tracker.add_not_ok(
-                        test_suite,
-                        description,
-                        diagnostics="  ---\n  message: %s\n  hint: %s\n  ..."
-                        % ("\n  message: ".join(result.messages.split("\n")), result.checker.hint),
-                    )
+    def collect_results(self):
+        """Gather the current results of every analysis group, in order."""
+        self.results = [result for group in self.config.analysis_groups for result in group.results]
+
+    def print_results(self, stream=None):
+        """
+        Print analysis results as text.
+
+        Args:
+            stream (file): the stream to write to, standard output by default.
+        """
+        stream = stream or sys.stdout
+        for result in self.results:
+            result.print(stream=stream)
+
+    def output_tap(self, stream=None, max_messages=None, diagnostics_file=None):
+        """
+        Output analysis results in TAP format.
+
+        Args:
+            stream (file): the stream to write to, standard output by default.
+            max_messages (int): maximum number of messages written per result, or None.
+            diagnostics_file (str): path to a file receiving the complete
+                messages of results with more than ``max_messages`` messages.
+        """
+        with TapWriter(stream, max_messages, diagnostics_file) as writer:
+            for group in self.config.analysis_groups:
+                n_providers = len(group.providers)
+                n_checkers = len(group.checkers)
+                if not group.providers and group.checkers:
+                    test_suite = group.name
+                    description_lambda = lambda r: r.checker.name
+                elif not group.checkers:
+                    logger.warning("Invalid analysis group (no checkers), skipping")
+                    continue
+                elif n_providers > n_checkers:
+                    test_suite = group.checkers[0].name
+                    description_lambda = lambda r: r.provider.name
+                else:
+                    test_suite = group.providers[0].name
+                    description_lambda = lambda r: r.checker.name
+
+                for result in group.results:
+                    writer.suite(test_suite)
+                    description = description_lambda(result)
+                    if result.code == ResultCode.PASSED:
+                        writer.ok(description)
+                    elif result.code == ResultCode.IGNORED:
+                        writer.ok(description + " (ALLOWED FAILURE)")
+                    elif result.code == ResultCode.NOT_IMPLEMENTED:
+                        writer.not_ok(description, "TODO implement the test")
+                    elif result.code == ResultCode.FAILED:
+                        writer.not_ok(description, messages=result.messages, hint=result.checker.hint)
+                    elif result.code == ResultCode.TIMEOUT:
+                        writer.not_ok(description, messages=result.messages)
+
+    def as_dict(self):
+        """
+        Return the analysis results as JSON-serializable values.
+
+        Returns:
+            dict: the "successful" status and the list of results.
+        """
+        return {"successful": self.successful, "results": [result.as_dict() for result in self.results]}
 
     def output_json(self):
         """Output analysis results in JSON format."""
+        json.dump(self.as_dict(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
     @property
     def successful(self):
-        """Property to tell if the run was successful: no failures."""
+        """Property to tell if the run was successful: no failures, no timeouts."""
         for result in self.results:
-            if result.code == ResultCode.FAILED:
+            if result.code in self.FAILURE_CODES:
                 return False
         return True
 
@@ -141,22 +552,39 @@ class AnalysisGroup(PrintableNameMixin):
         self.results = []
 
 
-class Result(PrintableResultMixin):
-    """Placeholder for analysis results."""
+class Result(PrintableResultMixin, namedtuple("Result", "group provider checker code messages")):
+    """
+    Immutable record of an analysis result.
+
+    Attributes:
+        group (AnalysisGroup): parent group.
+        provider (PluginInfo): metadata of the parent Provider.
+        checker (Checker): parent Checker.
+        code (int): constant from Checker class.
+        messages (tuple of Message): the messages of the checker.
+    """
 
-    def __init__(self, group, provider, checker, code, messages):
+    __slots__ = ()
+
+    @property
+    def text(self):
+        """Return the text of the messages, one per line."""
+        return "\n".join(message.text for message in self.messages)
+
+    def as_dict(self):
         """
-        Initialization method.
+        Return the result as JSON-serializable values.
 
-        Args:
-            group (AnalysisGroup): parent group.
-            provider (Provider): parent Provider.
-            checker (Checker): parent Checker.
-            code (int): constant from Checker class.
-            messages (str): messages string.
-        """
-        self.group = group
-        self.provider = provider
-        self.checker = checker
-        self.code = code
-        self.messages = messages
+        Returns:
+            dict: the group, provider and checker names, the status and the messages.
+        """
+        return {
+            "group": self.group.name,
+            "provider": self.provider.name if self.provider else None,
+            "checker": self.checker.name,
+            "identifier": self.checker.identifier or None,
+            "code": self.code,
+            "status": ResultCode.NAMES.get(self.code),
+            "messages": [message.as_dict() for message in self.messages],
+            "hint": self.checker.hint if self.messages else "",
+        }
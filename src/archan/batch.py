@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+"""
+Batch module.
+
+Contains the ``archan batch`` command, which applies the same analysis
+to many CSV inputs in one invocation. The configuration is compiled and
+the plugins are imported once per worker process, then each input
+replaces the data of the configured providers.
+
+Results are streamed in input order, either as one TAP stream, where each
+input is a test with its results as an indented subtest, or as one JSON
+line per input. The exit code is 0 when every input passed,
+1 when at least one input failed or could not be analyzed.
+"""
+
+import argparse
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from .analysis import Analysis
+from .cli import valid_file, valid_level
+from .config import Config
+from .logging import Logger
+from .output import TapWriter
+from .plugins import Message
+from .plugins.providers import CSVInput
+
+logger = Logger.get_logger(__name__)
+
+_worker_config = None
+
+
+def expand_inputs(patterns, manifest=None):
+    """
+    Return the list of input files given as paths, glob patterns or in a manifest.
+
+    Args:
+        patterns (list of str): paths or glob patterns (``**`` is supported).
+        manifest (str): path to a file listing one path or pattern per line.
+            Empty lines and lines starting with ``#`` are ignored.
+
+    Returns:
+        list of str: the input files, in order, without duplicates.
+    """
+    patterns = list(patterns)
+    if manifest:
+        with open(manifest) as stream:
+            patterns.extend(line.strip() for line in stream if line.strip() and not line.startswith("#"))
+    inputs = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            logger.warning("No input file matches %s", pattern)
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                inputs.append(match)
+    return inputs
+
+
+def init_worker(config_dict, compiled_groups, level, log_queue=None):
+    """
+    Initialize a worker process with the compiled configuration.
+
+    Args:
+        config_dict (dict): the configuration dictionary.
+        compiled_groups (list of dict): the compiled analysis groups.
+        level (str): the logging level.
+        log_queue (multiprocessing.Queue): if given, log records are sent
+            to this queue, for the main process to handle them.
+    """
+    global _worker_config  # noqa: WPS420 (one configuration per worker process)
+    Logger.set_level(level)
+    if log_queue is not None:
+        Logger.enable_queue(log_queue)
+    _worker_config = Config(config_dict, compiled_groups=compiled_groups)
+
+
+def analyze_input(task):
+    """
+    Analyze one input file with the worker's configuration.
+
+    Args:
+        task (tuple): the input file path, the column delimiter,
+            the categories delimiter, and the output format.
+
+    Returns:
+        dict: the input path, the "successful" status, the results,
+        the TAP output, the error message if any, and the elapsed time.
+    """
+    file_path, delimiter, categories_delimiter, output_format = task
+    start = time.perf_counter()
+    report = {"input": file_path, "successful": False, "results": [], "tap": "", "error": None}
+    config = Config(_worker_config.config_dict, _worker_config.plugins, _worker_config.compiled_groups)
+    arguments = {"file_path": file_path, "delimiter": delimiter, "categories_delimiter": categories_delimiter}
+    for group in config.analysis_groups:
+        if group.providers:
+            group.providers = [CSVInput(name=file_path, arguments=arguments)]
+    analysis = Analysis(config, provider_data="free")
+    try:
+        analysis.run(verbose=False)
+    except Exception as error:  # noqa: W0703 (report any input or plugin error, and go on)
+        report["error"] = "%s: %s" % (type(error).__name__, error)
+    else:
+        report["successful"] = analysis.successful
+        if output_format == "json":
+            report["results"] = analysis.as_dict()["results"]
+        else:
+            tap = io.StringIO()
+            analysis.output_tap(stream=tap)
+            report["tap"] = tap.getvalue()
+    report["time"] = time.perf_counter() - start
+    return report
+
+
+def write_report(report, output_format, stream):
+    """
+    Write the section of an input.
+
+    In TAP, the input is a test of the batch, preceded by its results
+    as an indented subtest, or failing with the error if it could not be analyzed.
+
+    Args:
+        report (dict): the report returned by ``analyze_input``.
+        output_format (str): "tap" or "json".
+        stream (file/TapWriter): the stream to write JSON lines to, or the TAP writer.
+    """
+    if output_format == "json":
+        report = {key: value for key, value in report.items() if key != "tap"}
+        stream.write(json.dumps(report) + "\n")
+        stream.flush()
+        return
+    if report["error"]:
+        stream.not_ok(report["input"], messages=(Message("Could not be analyzed: %s", (report["error"],)),))
+    else:
+        # without the version line of the input's stream
+        lines = report["tap"].splitlines(True)[1:]
+        stream.write("# Subtest: %s\n" % report["input"])
+        stream.write("".join("    %s" % line for line in lines))
+        if report["successful"]:
+            stream.ok(report["input"])
+        else:
+            stream.not_ok(report["input"])
+    stream.flush()
+    stream.stream.flush()
+
+
+def run_batch(config, inputs, jobs=None, delimiter=",", categories_delimiter=None, output_format="tap", stream=None):
+    """
+    Analyze every input and stream the reports.
+
+    Args:
+        config (Config): the configuration to apply to each input.
+        inputs (list of str): the input files.
+        jobs (int): the number of worker processes, the number of CPUs by default.
+            With one job, inputs are analyzed in the current process.
+        delimiter (str): character(s) used as delimiter for columns.
+        categories_delimiter (str): character(s) used as delimiter for categories.
+        output_format (str): "tap" or "json".
+        stream (file): the stream to write to, standard output by default.
+
+    Returns:
+        dict: the number of inputs, of failed inputs and of errors.
+    """
+    stream = stream or sys.stdout
+    jobs = min(jobs or os.cpu_count() or 1, len(inputs)) or 1
+    tasks = [(file_path, delimiter, categories_delimiter, output_format) for file_path in inputs]
+    initargs = (config.config_dict, config.compiled_groups, Logger.level)
+    summary = {"inputs": len(inputs), "failed": 0, "errors": 0}
+    # inputs are numbered across the batch, the plan is written once every input is done
+    writer = TapWriter(stream) if output_format == "tap" else None
+
+    def collect(reports):
+        for report in reports:
+            write_report(report, output_format, writer or stream)
+            if report["error"]:
+                summary["errors"] += 1
+            elif not report["successful"]:
+                summary["failed"] += 1
+
+    if jobs == 1:
+        init_worker(*initargs)
+        collect(analyze_input(task) for task in tasks)
+    else:
+        # workers log through a queue: records of concurrent inputs are not interleaved
+        log_queue = multiprocessing.Queue()
+        listener = Logger.listen(log_queue)
+        try:
+            with multiprocessing.Pool(jobs, initializer=init_worker, initargs=initargs + (log_queue,)) as pool:
+                # ordered, but still streamed as soon as the next input is done
+                collect(pool.imap(analyze_input, tasks, chunksize=1))
+                # let workers flush their queued records before terminating them
+                pool.close()
+                pool.join()
+        finally:
+            listener.stop()
+    if writer is not None:
+        writer.close()
+    return summary
+
+
+def get_parser():
+    """
+    Return the ``archan batch`` argument parser.
+
+    Returns:
+        argparse.ArgumentParser: the parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="archan batch", description="Apply the same analysis to many CSV inputs, in parallel."
+    )
+    parser.add_argument("inputs", nargs="*", metavar="INPUT", help="Input CSV files, or glob patterns.")
+    parser.add_argument(
+        "-c", "--config", type=valid_file, dest="config_file", metavar="FILE", help="Configuration file to use."
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        type=valid_file,
+        metavar="FILE",
+        help="File listing input files or glob patterns, one per line.",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Number of worker processes. Default: number of CPUs."
+    )
+    parser.add_argument("-d", "--delimiter", default=",", help="Delimiter used in the CSV files. Default: ','.")
+    parser.add_argument("--categories-delimiter", default=None, help="If set, used as delimiter for categories.")
+    parser.add_argument(
+        "-f", "--format", dest="output_format", choices=("tap", "json"), default="tap", help="Output format."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Do not read or write cached plugins and configuration. Default: false.",
+    )
+    parser.add_argument(
+        "--no-config",
+        action="store_true",
+        default=False,
+        help="Do not load configuration from file. Default: false.",
+    )
+    parser.add_argument("--log-json", metavar="FILE", help="Also write log records as JSON lines to this file.")
+    parser.add_argument(
+        "-v", "--verbose-level", dest="level", type=valid_level, default="ERROR", help="Level of verbosity."
+    )
+    return parser
+
+
+def main(args=None):
+    """
+    Run the ``archan batch`` command.
+
+    Args:
+        args (list of str): the command-line arguments.
+
+    Returns:
+        int: an exit code.
+    """
+    opts = get_parser().parse_args(args=args)
+    Logger.set_level(opts.level)
+    if opts.log_json:
+        Logger.add_json_sink(opts.log_json)
+
+    from .registry import registry as default_registry  # noqa: WPS433
+
+    if opts.no_cache:
+        default_registry.use_cache = False
+
+    inputs = expand_inputs(opts.inputs, opts.manifest)
+    if not inputs:
+        print("archan batch: no input files", file=sys.stderr)
+        return 2
+
+    config_file = None if opts.no_config else opts.config_file or Config.find()
+    if config_file:
+        logger.info("Load configuration from %s", config_file)
+        config = Config.from_file(config_file, use_cache=not opts.no_cache)
+    else:
+        logger.info("No configuration file, use default one")
+        config = Config.default_config(None)
+
+    start = time.perf_counter()
+    try:
+        summary = run_batch(
+            config, inputs, opts.jobs, opts.delimiter, opts.categories_delimiter, opts.output_format
+        )
+    except KeyboardInterrupt:
+        logger.info("Keyboard interruption, aborting")
+        return 130
+    if opts.output_format == "tap":
+        print(
+            "# archan batch: %(inputs)d inputs, %(failed)d failed, %(errors)d errors" % summary
+            + " in %.2fs" % (time.perf_counter() - start)
+        )
+    return 1 if summary["failed"] or summary["errors"] else 0
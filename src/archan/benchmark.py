@@ -0,0 +1,655 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark module.
+
+Contains a seeded generator of synthetic DSMs, a benchmark suite timing
+the command line startup, the CSV provider, the transitive closure and
+every built-in checker on matrices of increasing sizes, and the comparison of benchmark results
+against a baseline.
+"""
+
+import argparse
+import fnmatch
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess  # noqa: S404 (running archan itself)
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from typing import List, Optional
+
+from . import __version__
+from .dsm import DesignStructureMatrix
+from .logging import Logger
+from .plugins import Checker, checkers
+from .plugins.providers import CSVInput
+
+logger = Logger.get_logger(__name__)
+
+# generated DSMs are dense lists: 8 bytes per cell, 200 MB at size 5000
+DEFAULT_SIZES = (100, 200, 500, 1000, 2000, 5000)
+STARTUP_COMMANDS = (
+    ("startup.version", ("--version",)),
+    ("startup.help", ("--help",)),
+    ("startup.list_plugins", ("--list-plugins", "--no-color")),
+)
+DEFAULT_CATEGORIES = (
+    ("framework", 0.05),
+    ("corelib", 0.15),
+    ("applib", 0.15),
+    ("data", 0.1),
+    ("broker", 0.05),
+    ("appmodule", 0.5),
+)
+
+
+def parse_categories(value):
+    """
+    Parse a category mix given as ``name:weight`` items separated by commas.
+
+    Args:
+        value (str): the category mix, e.g. ``framework:1,appmodule:4``.
+
+    Returns:
+        tuple: pairs of category name and weight, in layer order.
+    """
+    mix = []
+    for item in value.split(","):
+        name, _, weight = item.partition(":")
+        mix.append((name.strip(), float(weight or 1)))
+    return tuple(mix)
+
+
+def generate_entities(size, package_depth=2):
+    """
+    Generate unique dotted entity names.
+
+    Args:
+        size (int): number of entities.
+        package_depth (int): number of components in each name.
+
+    Returns:
+        list of str: the entity names.
+    """
+    package_depth = max(1, package_depth)
+    branching = 2
+    while branching ** package_depth < size:
+        branching += 1
+    prefixes = ["pkg"] + ["sub"] * (package_depth - 2) + ["mod"] if package_depth > 1 else ["pkg"]
+    entities = []
+    for index in range(size):
+        components = []
+        for level in range(package_depth):
+            digit = (index // branching ** (package_depth - 1 - level)) % branching
+            components.append("%s%d" % (prefixes[level], digit))
+        entities.append(".".join(components))
+    return entities
+
+
+def generate_categories(size, categories=DEFAULT_CATEGORIES):
+    """
+    Generate contiguous blocks of categories, in layer order.
+
+    Args:
+        size (int): number of entities.
+        categories (tuple): pairs of category name and weight.
+
+    Returns:
+        list of str: one category per entity.
+    """
+    total = sum(weight for _, weight in categories)
+    result = []
+    for name, weight in categories:
+        result.extend([name] * int(round(size * weight / total)))
+    # rounding may overflow or underflow the requested size
+    result = result[:size]
+    result.extend([categories[-1][0]] * (size - len(result)))
+    return result
+
+
+def generate_dsm(
+    size,
+    density=0.02,
+    categories=DEFAULT_CATEGORIES,
+    package_depth=2,
+    cycle_rate=0.05,
+    max_weight=10,
+    seed=0,
+):
+    """
+    Generate a synthetic DSM.
+
+    Entities are ordered by layer (categories block after block), and
+    dependencies point to lower layers, except a fraction of them
+    which point upwards and therefore create cycles.
+
+    Args:
+        size (int): number of entities (rows and columns).
+        density (float): probability for a cell to hold a dependency.
+        categories (tuple): pairs of category name and weight, in layer order.
+            Empty to generate a DSM without categories.
+        package_depth (int): number of dotted components in entity names.
+        cycle_rate (float): fraction of dependencies pointing upwards.
+        max_weight (int): maximum value of a dependency cell.
+        seed (int): seed of the random generator.
+
+    Returns:
+        DesignStructureMatrix: the generated DSM.
+    """
+    rng = random.Random(seed)
+    data = []
+    for i in range(size):
+        row = [0] * size
+        row[i] = rng.randint(1, max_weight)
+        for _ in range(int(density * size)):
+            if i < size - 1 and (i == 0 or rng.random() < cycle_rate):
+                j = rng.randrange(i + 1, size)
+            elif i > 0:
+                j = rng.randrange(0, i)
+            else:
+                continue
+            row[j] += rng.randint(1, max_weight)
+        data.append(row)
+    entities = generate_entities(size, package_depth)
+    return DesignStructureMatrix(data, entities, generate_categories(size, categories) if categories else None)
+
+
+def write_csv(dsm, file_path, delimiter=",", categories_delimiter=None):
+    """
+    Write a DSM as CSV data, in the format read by ``CSVInput``.
+
+    Args:
+        dsm (DesignStructureMatrix): the DSM to write.
+        file_path (str): path to the output file.
+        delimiter (str): delimiter of columns.
+        categories_delimiter (str): if set, write categories in the header,
+            separated from the entity names by this delimiter.
+    """
+    columns = dsm.entities
+    if categories_delimiter and dsm.categories:
+        columns = [categories_delimiter.join(pair) for pair in zip(dsm.entities, dsm.categories)]
+    with open(file_path, "w") as stream:
+        stream.write(delimiter.join([""] + list(columns)) + "\n")
+        for entity, row in zip(dsm.entities, dsm.data):
+            stream.write(entity + delimiter + delimiter.join(map(str, row)) + "\n")
+
+
+def get_benchmarks():
+    """
+    Return the benchmarked callables.
+
+    Returns:
+        list of tuple: pairs of benchmark name and setup function. Each setup
+        function accepts a DSM and the path to its CSV file, and returns
+        the callable to time.
+    """
+    benchmarks = [("provider.CSVInput", _setup_csv_input), ("dsm.transitive_closure", _setup_transitive_closure)]
+    for _, checker_class in inspect.getmembers(checkers, inspect.isclass):
+        if issubclass(checker_class, Checker) and checker_class.identifier:
+            benchmarks.append(("checker." + checker_class.__name__, partial(_setup_checker, checker_class)))
+    return benchmarks
+
+
+def run_command(args):
+    """
+    Run archan in a new interpreter, to measure startup time.
+
+    Args:
+        args (tuple of str): the command line arguments.
+    """
+    subprocess.run(  # noqa: S603 (trusted input)
+        [sys.executable, "-m", "archan", *args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def _setup_csv_input(dsm, file_path):
+    return partial(CSVInput().get_data, file_path, ",", "|")
+
+
+def _setup_transitive_closure(dsm, file_path):
+    return dsm.transitive_closure
+
+
+def _setup_checker(checker_class, dsm, file_path):
+    return partial(checker_class().run, dsm)
+
+
+def measure(function, repeat=3, time_limit=None, memory=True):
+    """
+    Measure the execution time and peak memory of a callable.
+
+    Args:
+        function (callable): the callable to measure.
+        repeat (int): number of timed executions.
+        time_limit (float): stop repeating once an execution takes longer.
+        memory (bool): whether to run it once more to trace memory allocations.
+
+    Returns:
+        dict: the times, their statistics and the peak memory in bytes.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+        if time_limit and times[-1] > time_limit:
+            break
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_memory": peak_memory,
+    }
+
+
+def predict_time(history, size):
+    """
+    Predict the execution time at a given size from previous measurements.
+
+    The scaling exponent is estimated from the last two measurements,
+    and defaults to 2 (most checkers are quadratic).
+
+    Args:
+        history (list of tuple): pairs of size and median time.
+        size (int): the size to predict the time for.
+
+    Returns:
+        float: the predicted time, or 0 without history.
+    """
+    if not history:
+        return 0.0
+    last_size, last_time = history[-1]
+    exponent = 2.0
+    if len(history) > 1:
+        previous_size, previous_time = history[-2]
+        if previous_time > 0 and last_time > 0 and last_size != previous_size:
+            exponent = max(1.0, math.log(last_time / previous_time) / math.log(last_size / previous_size))
+    return last_time * (size / last_size) ** exponent
+
+
+def run_benchmarks(
+    sizes=DEFAULT_SIZES,
+    pattern="*",
+    repeat=3,
+    time_limit=60.0,
+    memory=True,
+    generator_options=None,
+    progress=None,
+):
+    """
+    Run the benchmark suite.
+
+    Startup benchmarks run archan in new interpreters and do not depend
+    on the DSM size. Other benchmarks whose predicted execution time
+    at the next size exceeds the time limit are skipped for this size
+    and the following ones.
+
+    Args:
+        sizes (tuple of int): sizes of the generated DSMs.
+        pattern (str): shell-style pattern to select benchmarks by name.
+        repeat (int): number of timed executions per benchmark.
+        time_limit (float): maximum predicted time for one execution.
+        memory (bool): whether to measure peak memory.
+        generator_options (dict): keyword arguments for ``generate_dsm``.
+        progress (file): stream to report progress to.
+
+    Returns:
+        dict: the results, with a "meta" and a "benchmarks" key.
+    """
+    generator_options = generator_options or {}
+    benchmarks = [(name, setup) for name, setup in get_benchmarks() if fnmatch.fnmatch(name, pattern)]
+    history = {name: [] for name, _ in benchmarks}
+    results = {}
+
+    for name, args in STARTUP_COMMANDS:
+        if fnmatch.fnmatch(name, pattern):
+            # tracing memory of a subprocess is not possible with tracemalloc
+            measures = measure(partial(run_command, args), repeat, time_limit, memory=False)
+            results[name] = dict(name=name, size=None, skipped=None, **measures)
+            if progress:
+                progress.write("%s: %.6fs\n" % (name, measures["median"]))
+
+    with tempfile.TemporaryDirectory(prefix="archan-benchmark-") as tmp_dir:
+        for size in sorted(sizes):
+            runnable = []
+            for name, setup in benchmarks:
+                predicted = predict_time(history[name], size)
+                if time_limit and predicted > time_limit:
+                    results["%s[%s]" % (name, size)] = {
+                        "name": name,
+                        "size": size,
+                        "skipped": "predicted time %.1fs exceeds limit" % predicted,
+                    }
+                else:
+                    runnable.append((name, setup))
+            if not runnable:
+                continue
+
+            dsm = generate_dsm(size, **generator_options)
+            csv_path = os.path.join(tmp_dir, "dsm-%s.csv" % size)
+            write_csv(dsm, csv_path, categories_delimiter="|")
+
+            for name, setup in runnable:
+                measures = measure(setup(dsm, csv_path), repeat, time_limit, memory)
+                history[name].append((size, measures["median"]))
+                results["%s[%s]" % (name, size)] = dict(name=name, size=size, skipped=None, **measures)
+                if progress:
+                    progress.write("%s[%s]: %.6fs\n" % (name, size, measures["median"]))
+
+            os.remove(csv_path)
+            del dsm  # noqa: WPS420 (free memory before generating the next DSM)
+
+    return {"meta": get_metadata(repeat, generator_options), "benchmarks": results}
+
+
+def compare_benchmark(baseline, current, threshold=0.1, noise=3.0, min_time=0.001, min_memory=65536):
+    """
+    Compare the timings and peak memory of a benchmark against its baseline.
+
+    A timing difference is significant when it exceeds the relative threshold,
+    the minimum absolute time, and ``noise`` times the combined standard
+    deviation of both measurements. A memory difference is significant
+    when it exceeds the relative threshold and the minimum absolute memory.
+
+    Args:
+        baseline (dict): the baseline measurements.
+        current (dict): the current measurements.
+        threshold (float): relative threshold, e.g. 0.1 for 10%.
+        noise (float): number of standard deviations considered as noise.
+        min_time (float): minimum significant time difference, in seconds.
+        min_memory (int): minimum significant memory difference, in bytes.
+
+    Returns:
+        dict: the deltas and a status, one of "regression", "improvement"
+        and "unchanged".
+    """
+    time_delta = current["median"] - baseline["median"]
+    time_noise = noise * math.sqrt(baseline["stdev"] ** 2 + current["stdev"] ** 2)
+    time_significant = (
+        abs(time_delta) > threshold * baseline["median"] and abs(time_delta) > max(min_time, time_noise)
+    )
+
+    memory_delta = memory_ratio = None
+    memory_significant = False
+    if baseline.get("peak_memory") is not None and current.get("peak_memory") is not None:
+        memory_delta = current["peak_memory"] - baseline["peak_memory"]
+        memory_ratio = memory_delta / baseline["peak_memory"] if baseline["peak_memory"] else 0.0
+        memory_significant = abs(memory_delta) > max(threshold * baseline["peak_memory"], min_memory)
+
+    if (time_significant and time_delta > 0) or (memory_significant and memory_delta > 0):
+        status = "regression"
+    elif time_significant or memory_significant:
+        status = "improvement"
+    else:
+        status = "unchanged"
+
+    return {
+        "time_delta": time_delta,
+        "time_ratio": time_delta / baseline["median"] if baseline["median"] else 0.0,
+        "memory_delta": memory_delta,
+        "memory_ratio": memory_ratio,
+        "status": status,
+    }
+
+
+def compare_results(baseline, current, **options):
+    """
+    Compare benchmark results against baseline results.
+
+    Args:
+        baseline (dict): the baseline results, as returned by ``run_benchmarks``.
+        current (dict): the current results, as returned by ``run_benchmarks``.
+        **options: options passed to ``compare_benchmark``.
+
+    Returns:
+        dict: one comparison per benchmark key. Benchmarks present on one side
+        only, or skipped on one side, get the "new", "missing"
+        or "skipped" status.
+    """
+    comparisons = {}
+    baseline_benchmarks = baseline["benchmarks"]
+    current_benchmarks = current["benchmarks"]
+    merged = dict(baseline_benchmarks, **current_benchmarks)
+    for key in sorted(merged, key=lambda name: (merged[name]["name"], merged[name]["size"])):
+        if key not in baseline_benchmarks:
+            comparisons[key] = {"status": "new"}
+        elif key not in current_benchmarks:
+            comparisons[key] = {"status": "missing"}
+        elif baseline_benchmarks[key]["skipped"] or current_benchmarks[key]["skipped"]:
+            comparisons[key] = {"status": "skipped"}
+        else:
+            comparisons[key] = compare_benchmark(baseline_benchmarks[key], current_benchmarks[key], **options)
+    return comparisons
+
+
+def format_comparisons(baseline, current, comparisons):
+    """
+    Format comparisons as a human-readable report.
+
+    Args:
+        baseline (dict): the baseline results.
+        current (dict): the current results.
+        comparisons (dict): the comparisons, as returned by ``compare_results``.
+
+    Returns:
+        str: the report, one line per benchmark.
+    """
+    width = max([len(key) for key in comparisons] + [9])
+    lines = ["%-*s %12s %12s %9s %9s  %s" % (width, "benchmark", "baseline", "current", "time", "memory", "status")]
+    for key, comparison in comparisons.items():
+        if "time_delta" not in comparison:
+            lines.append("%-*s %12s %12s %9s %9s  %s" % (width, key, "", "", "", "", comparison["status"]))
+            continue
+        memory_ratio = comparison["memory_ratio"]
+        lines.append(
+            "%-*s %11.6fs %11.6fs %+8.1f%% %9s  %s"
+            % (
+                width,
+                key,
+                baseline["benchmarks"][key]["median"],
+                current["benchmarks"][key]["median"],
+                comparison["time_ratio"] * 100,
+                "" if memory_ratio is None else "%+.1f%%" % (memory_ratio * 100),
+                comparison["status"],
+            )
+        )
+    return "\n".join(lines)
+
+
+def get_metadata(repeat, generator_options):
+    """
+    Return the metadata of a benchmark run.
+
+    Args:
+        repeat (int): number of timed executions per benchmark.
+        generator_options (dict): keyword arguments used for ``generate_dsm``.
+
+    Returns:
+        dict: the versions, platform, date and options.
+    """
+    return {
+        "archan": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "date": datetime.now().isoformat(),
+        "repeat": repeat,
+        "generator": generator_options,
+    }
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Return the benchmark command argument parser.
+
+    Returns:
+        An argparse parser.
+    """
+    parser = argparse.ArgumentParser(prog="archan-benchmark", description="Benchmark archan on synthetic DSMs")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite and output results as JSON.")
+    run_parser.add_argument(
+        "-s",
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=DEFAULT_SIZES,
+        help="Comma-separated sizes of the generated DSMs. Default: %s." % ",".join(map(str, DEFAULT_SIZES)),
+    )
+    run_parser.add_argument("-k", "--select", default="*", help="Pattern to select benchmarks. Default: '*'.")
+    run_parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of timed runs. Default: 3.")
+    run_parser.add_argument(
+        "-t",
+        "--time-limit",
+        type=float,
+        default=60.0,
+        help="Skip benchmarks whose predicted time exceeds this limit, in seconds. Default: 60.",
+    )
+    run_parser.add_argument(
+        "--no-memory", action="store_false", dest="memory", help="Do not measure peak memory. Default: false."
+    )
+    run_parser.add_argument("--density", type=float, default=0.02, help="Density of dependencies. Default: 0.02.")
+    run_parser.add_argument(
+        "--categories",
+        type=parse_categories,
+        default=DEFAULT_CATEGORIES,
+        help="Category mix as comma-separated name:weight items, in layer order.",
+    )
+    run_parser.add_argument("--package-depth", type=int, default=2, help="Depth of entity names. Default: 2.")
+    run_parser.add_argument(
+        "--cycle-rate", type=float, default=0.05, help="Fraction of dependencies creating cycles. Default: 0.05."
+    )
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator. Default: 0.")
+    run_parser.add_argument("-o", "--output", default="-", help="File to write JSON results to. Default: stdout.")
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare results against a baseline. Exit with code 1 on significant regressions."
+    )
+    compare_parser.add_argument("baseline", help="JSON file containing the baseline results.")
+    compare_parser.add_argument("current", help="JSON file containing the current results.")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative threshold of significance. Default: 0.1."
+    )
+    compare_parser.add_argument(
+        "--noise",
+        type=float,
+        default=3.0,
+        help="Number of standard deviations considered as noise. Default: 3.",
+    )
+    compare_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.001,
+        help="Minimum significant time difference, in seconds. Default: 0.001.",
+    )
+    compare_parser.add_argument(
+        "--min-memory",
+        type=int,
+        default=65536,
+        help="Minimum significant memory difference, in bytes. Default: 65536.",
+    )
+    compare_parser.add_argument("-o", "--output", help="File to write JSON comparisons to.")
+    return parser
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmark command.
+
+    Arguments:
+        args: Arguments passed from the command line.
+
+    Returns:
+        An exit code.
+    """
+    opts = get_parser().parse_args(args=args)
+    if opts.command == "compare":
+        return compare(opts)
+    generator_options = {
+        "density": opts.density,
+        "categories": opts.categories,
+        "package_depth": opts.package_depth,
+        "cycle_rate": opts.cycle_rate,
+        "seed": opts.seed,
+    }
+    results = run_benchmarks(
+        opts.sizes, opts.select, opts.repeat, opts.time_limit, opts.memory, generator_options, sys.stderr
+    )
+    write_json(results, opts.output)
+    return 0
+
+
+def compare(opts):
+    """
+    Run the compare command.
+
+    Args:
+        opts (argparse.Namespace): the parsed command line options.
+
+    Returns:
+        int: 1 if there are significant regressions, 0 otherwise.
+    """
+    with open(opts.baseline) as stream:
+        baseline = json.load(stream)
+    with open(opts.current) as stream:
+        current = json.load(stream)
+    comparisons = compare_results(
+        baseline,
+        current,
+        threshold=opts.threshold,
+        noise=opts.noise,
+        min_time=opts.min_time,
+        min_memory=opts.min_memory,
+    )
+    print(format_comparisons(baseline, current, comparisons))
+    if opts.output:
+        write_json(comparisons, opts.output)
+    regressions = [key for key, comparison in comparisons.items() if comparison["status"] == "regression"]
+    if regressions:
+        logger.error("%d significant regression(s): %s", len(regressions), ", ".join(regressions))
+        return 1
+    return 0
+
+
+def write_json(results, output):
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        results (dict): the results.
+        output (str): path to the output file, or "-" for standard output.
+    """
+    if output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(output, "w") as stream:
+            json.dump(results, stream, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
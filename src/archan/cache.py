@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache module.
+
+Contains helpers to locate, read and write archan's on-disk caches,
+and the cache of providers' data.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle  # noqa: S403 (only reading our own cache files)
+import sys
+import tempfile
+
+from . import __version__
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+DEFAULT_PROVIDER_CACHE_SIZE = 512
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def cache_dir(*parts):
+    """
+    Return the path to archan's cache directory, creating it if needed.
+
+    The ``ARCHAN_CACHE_DIR`` environment variable takes precedence over
+    the platform's user cache directory.
+
+    Args:
+        *parts (str): sub-directories to append to the path.
+
+    Returns:
+        str: the path to the cache directory.
+    """
+    root = os.environ.get("ARCHAN_CACHE_DIR")
+    if not root:
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(base, "archan")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def environment_signature():
+    """
+    Return a signature of the installed distributions.
+
+    Installing, upgrading or removing a distribution adds or removes
+    entries in one of the ``sys.path`` directories, which updates
+    its modification time. The signature therefore combines the
+    interpreter, archan's version, and the modification time of every
+    ``sys.path`` entry, which is much cheaper than reading the metadata
+    of every installed distribution.
+
+    Returns:
+        str: a hexadecimal digest.
+    """
+    digest = hashlib.sha1()  # noqa: S303 (not used for security)
+    digest.update(("%s\0%s\0%s\0" % (sys.executable, sys.version, __version__)).encode())
+    for path in sys.path:
+        try:
+            mtime = os.stat(path or os.curdir).st_mtime_ns
+        except OSError:
+            mtime = 0
+        digest.update(("%s\0%s\0" % (path, mtime)).encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def write_atomic(path, content):
+    """
+    Write bytes to a file atomically, so readers never see partial contents.
+
+    Args:
+        path (str): path to the file.
+        content (bytes): the contents to write.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            stream.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_json(path):
+    """
+    Read a JSON cache file.
+
+    Args:
+        path (str): path to the file.
+
+    Returns:
+        obj: the decoded contents, or None if the file is missing or invalid.
+    """
+    try:
+        with open(path) as stream:
+            return json.load(stream)
+    except (OSError, ValueError) as error:
+        logger.debug("Could not read cache file %s: %s", path, error)
+        return None
+
+
+def write_json(path, obj):
+    """
+    Write a JSON cache file, logging failures instead of raising them.
+
+    Args:
+        path (str): path to the file.
+        obj (obj): the contents to encode.
+    """
+    try:
+        write_atomic(path, json.dumps(obj).encode())
+    except OSError as error:
+        logger.debug("Could not write cache file %s: %s", path, error)
+
+
+def read_pickle(path):
+    """
+    Read a pickle cache file.
+
+    Args:
+        path (str): path to the file.
+
+    Returns:
+        obj: the unpickled contents, or None if the file is missing or invalid.
+    """
+    try:
+        with open(path, "rb") as stream:
+            return pickle.load(stream)  # noqa: S301 (only reading our own cache files)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as error:
+        logger.debug("Could not read cache file %s: %s", path, error)
+        return None
+
+
+def write_pickle(path, obj):
+    """
+    Write a pickle cache file, logging failures instead of raising them.
+
+    Args:
+        path (str): path to the file.
+        obj (obj): the contents to pickle.
+    """
+    try:
+        write_atomic(path, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except (OSError, pickle.PicklingError, TypeError) as error:
+        logger.debug("Could not write cache file %s: %s", path, error)
+
+
+def path_hash(path):
+    """
+    Return a short hash of an absolute path, to name cache files after it.
+
+    Args:
+        path (str): the path.
+
+    Returns:
+        str: a hexadecimal digest.
+    """
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8", "surrogateescape")).hexdigest()  # noqa: S303
+
+
+def fingerprint_path(path, content_hash=False):
+    """
+    Return a fingerprint of a file, or of the files of a directory.
+
+    Args:
+        path (str): the path to the file or directory.
+        content_hash (bool): whether to hash the contents of the files,
+            instead of using their modification time and size only.
+
+    Returns:
+        str: a hexadecimal digest, or None if the path does not exist.
+    """
+    path = os.path.abspath(path)
+    digest = hashlib.sha1()  # noqa: S303 (not used for security)
+    digest.update(("%s\0" % path).encode("utf-8", "surrogateescape"))
+    if os.path.isdir(path):
+        file_paths = []
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            file_paths.extend(os.path.join(directory, file_name) for file_name in sorted(files))
+    elif os.path.exists(path):
+        file_paths = [path]
+    else:
+        return None
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        name = os.path.relpath(file_path, path)
+        digest.update(("%s\0%s\0" % (name, stat.st_size)).encode("utf-8", "surrogateescape"))
+        if content_hash:
+            with open(file_path, "rb") as stream:
+                for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):  # noqa: WPS426 (read by chunks)
+                    digest.update(chunk)
+        else:
+            digest.update(b"%d\0" % stat.st_mtime_ns)
+    return digest.hexdigest()
+
+
+class ProviderCache(object):
+    """
+    Cache of providers' data, keyed on their arguments and on the fingerprints of their input files.
+
+    Data are pickled in a directory of archan's cache, where compact matrices
+    are stored as packed binary rows. Reading an entry updates its modification
+    time, and the least recently used entries are removed when the total size
+    of the directory exceeds the limit.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_PROVIDER_CACHE_SIZE):
+        """
+        Initialization method.
+
+        Args:
+            directory (str): the cache directory, a ``providers`` directory in archan's cache by default.
+            max_size (float): the maximum total size of the entries, in mebibytes.
+        """
+        self.directory = directory or cache_dir("providers")
+        self.max_size = max_size * 1024 * 1024
+
+    @staticmethod
+    def key(provider):
+        """
+        Return the key of the data of a provider with its current arguments and inputs.
+
+        The arguments listed in the provider's ``path_arguments`` are paths
+        (or lists of paths) of files or directories, and are fingerprinted,
+        with their contents hashed if the provider's ``cache`` is "hash".
+
+        Args:
+            provider (Provider): the provider.
+
+        Returns:
+            str: the key, or None if the data of the provider cannot be cached,
+                for example when it reads standard input.
+        """
+        if not provider.cache:
+            return None
+        arguments = dict(provider.arguments)
+        try:
+            parameters = inspect.signature(provider.get_data).parameters
+        except (TypeError, ValueError):
+            parameters = {}
+        fingerprints = []
+        for name in provider.path_arguments:
+            value = arguments.get(name)
+            if value is None and name in parameters:
+                value = parameters[name].default
+                if value is inspect.Parameter.empty:
+                    value = None
+            paths = [value] if isinstance(value, str) else value
+            if paths is not None and not all(isinstance(path, str) for path in _as_list(paths)):
+                return None
+            # relative paths are resolved, as the same path can designate other files elsewhere
+            paths = [os.path.abspath(path) for path in paths or ()]
+            if name in arguments:
+                arguments[name] = paths
+            fingerprints.append([fingerprint_path(path, provider.cache == "hash") for path in paths])
+        digest = hashlib.sha1()  # noqa: S303 (not used for security)
+        digest.update(
+            repr(
+                (
+                    __version__,
+                    type(provider).__module__,
+                    type(provider).__qualname__,
+                    provider.identifier,
+                    sorted(arguments.items()),
+                    fingerprints,
+                )
+            ).encode("utf-8", "surrogateescape")
+        )
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Return cached data, and mark them as recently used.
+
+        Args:
+            key (str): the key of the data.
+
+        Returns:
+            obj: the data, or None if they are not in the cache.
+        """
+        path = os.path.join(self.directory, "%s.pickle" % key)
+        data = read_pickle(path)
+        if data is not None:
+            try:
+                os.utime(path)
+            except OSError as error:
+                logger.debug("Could not update cache file %s: %s", path, error)
+        return data
+
+    def store(self, key, data):
+        """
+        Store data in the cache, and remove the least recently used entries if it is too large.
+
+        Args:
+            key (str): the key of the data.
+            data (obj): the data.
+        """
+        write_pickle(os.path.join(self.directory, "%s.pickle" % key), data)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries while the cache is too large."""
+        entries = []
+        total_size = 0
+        with os.scandir(self.directory) as directory_entries:
+            for entry in directory_entries:
+                if not entry.name.endswith(".pickle"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total_size += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            logger.debug("Evict %s from the providers cache", path)
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+
+
+def _as_list(value):
+    return value if isinstance(value, (list, tuple)) else [value]
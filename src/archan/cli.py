@@ -12,16 +12,13 @@
 """Module that contains the command line application."""
 
 import argparse
+import functools
 import logging
 import os
 import sys
 from typing import List, Optional
 
-import colorama
-
 from . import __version__
-from .analysis import Analysis
-from .config import Config
 from .logging import Logger
 
 logger = Logger.get_logger(__name__)
@@ -65,7 +62,13 @@ def get_parser() -> argparse.ArgumentParser:
         An argparse parser.
     """
     parser = argparse.ArgumentParser(
-        prog="archan", add_help=False, description="Analysis of your architecture strength based on DSM data"
+        prog="archan",
+        add_help=False,
+        description="Analysis of your architecture strength based on DSM data",
+        epilog=(
+            "Run 'archan serve -h' to see how to run archan as a server, "
+            "and 'archan batch -h' to see how to analyze many inputs at once."
+        ),
     )
     parser.add_argument(
         "-c",
@@ -76,6 +79,13 @@ def get_parser() -> argparse.ArgumentParser:
         metavar="FILE",
         help="Configuration file to use.",
     )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        dest="fail_fast",
+        default=False,
+        help="Run cheap checkers first, and stop on the first failure. Default: false.",
+    )
     parser.add_argument(
         "-h", "--help", action="help", default=argparse.SUPPRESS, help="Show this help message and exit."
     )
@@ -86,7 +96,7 @@ def get_parser() -> argparse.ArgumentParser:
         type=valid_file,
         dest="input_file",
         metavar="FILE",
-        help="Input file containing CSV data.",
+        help="Input file containing CSV data, possibly compressed with gzip, bzip2 or xz.",
     )
     parser.add_argument(
         "-l",
@@ -96,9 +106,39 @@ def get_parser() -> argparse.ArgumentParser:
         default=False,
         help="Show the available plugins. Default: false.",
     )
+    parser.add_argument(
+        "--log-json",
+        action="store",
+        dest="log_json",
+        metavar="FILE",
+        help="Also write log records as JSON lines to this file.",
+    )
+    parser.add_argument(
+        "--max-messages",
+        action="store",
+        type=int,
+        dest="max_messages",
+        default=None,
+        metavar="N",
+        help="Maximum number of messages output per result. Default: no limit.",
+    )
+    parser.add_argument(
+        "--diagnostics-file",
+        action="store",
+        dest="diagnostics_file",
+        metavar="FILE",
+        help="File receiving the complete messages of results truncated by --max-messages.",
+    )
     parser.add_argument(
         "--no-color", action="store_true", dest="no_color", default=False, help="Do not use colors. Default: false."
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        default=False,
+        help="Do not read or write cached plugins, configuration and providers data. Default: false.",
+    )
     parser.add_argument(
         "--no-config",
         action="store_true",
@@ -106,6 +146,15 @@ def get_parser() -> argparse.ArgumentParser:
         default=False,
         help="Do not load configuration from file. Default: false.",
     )
+    parser.add_argument(
+        "--provider-data",
+        action="store",
+        dest="provider_data",
+        choices=("keep", "free", "spill"),
+        default="keep",
+        help="What to do with the data of a provider once its checkers ran: keep them in memory, "
+        "free them, or spill them to disk. Default: keep.",
+    )
     parser.add_argument(
         "-v",
         "--verbose-level",
@@ -115,6 +164,14 @@ def get_parser() -> argparse.ArgumentParser:
         default="ERROR",
         help="Level of verbosity.",
     )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        dest="watch",
+        default=False,
+        help="Watch the configuration and input files, and run affected analyses again on change. Default: false.",
+    )
     parser.add_argument(
         "-V",
         "--version",
@@ -137,20 +194,49 @@ def main(args: Optional[List[str]] = None) -> int:
     Returns:
         An exit code.
     """
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "serve":
+        from .server import main as serve  # noqa: WPS433 (costly import, done only when needed)
+
+        return serve(args[1:])
+    elif args and args[0] == "batch":
+        from .batch import main as batch  # noqa: WPS433 (costly import, done only when needed)
+
+        return batch(args[1:])
+
     parser = get_parser()
     opts = parser.parse_args(args=args)
     Logger.set_level(opts.level)
+    if opts.log_json:
+        Logger.add_json_sink(opts.log_json)
+
+    # heavy modules are imported only once arguments are parsed,
+    # so that --help and --version return as fast as possible
+    import colorama  # noqa: WPS433
+
+    from .analysis import Analysis  # noqa: WPS433
+    from .config import Config  # noqa: WPS433
+    from .registry import registry as default_registry  # noqa: WPS433
 
     colorama_args = {"autoreset": True}
     if opts.no_color:
         colorama_args["strip"] = True
     colorama.init(**colorama_args)
 
-    config = None
+    if opts.no_cache:
+        default_registry.use_cache = False
+
+    if opts.list_plugins:
+        logger.info("Print list of plugins")
+        Config().print_plugins()
+        return 0
+
+    config = config_file = None
     if opts.no_config:
         logger.info("--no-config flag used, use default configuration")
         if opts.input_file:
-            logger.info("Input file specified: %s" % opts.input_file)
+            logger.info("Input file specified: %s", opts.input_file)
             file_path = opts.input_file
         else:
             logger.info("No input file specified, will read standard input")
@@ -158,33 +244,41 @@ def main(args: Optional[List[str]] = None) -> int:
         config = Config.default_config(file_path)
     else:
         if opts.config_file:
-            logger.info("Configuration file specified: %s" % opts.config_file)
+            logger.info("Configuration file specified: %s", opts.config_file)
             config_file = opts.config_file
         else:
             logger.info("No configuration file specified, searching")
             config_file = Config.find()
         if config_file:
-            logger.info("Load configuration from %s" % config_file)
-            config = Config.from_file(config_file)
+            logger.info("Load configuration from %s", config_file)
+            config = Config.from_file(config_file, use_cache=not opts.no_cache)
         if config is None:
             logger.info("No configuration file found, use default one")
             config = Config.default_config()
 
-    logger.debug("Configuration = {}".format(config))
-    logger.debug("Plugins loaded = {}".format(config.plugins))
-
-    if opts.list_plugins:
-        logger.info("Print list of plugins")
-        config.print_plugins()
-        return 0
+    logger.debug("Configuration = %s", config)
 
     logger.info("Run analysis")
-    analysis = Analysis(config)
+    analysis = Analysis(
+        config, provider_data=opts.provider_data, fail_fast=opts.fail_fast, use_cache=not opts.no_cache
+    )
     try:
         analysis.run(verbose=False)
-        logger.info("Analysis successful: %s" % analysis.successful)
+        logger.info("Analysis successful: %s", analysis.successful)
         logger.info("Output results as TAP")
-        analysis.output_tap()
+        output_tap = functools.partial(
+            analysis.output_tap, max_messages=opts.max_messages, diagnostics_file=opts.diagnostics_file
+        )
+        output_tap()
+        if opts.watch:
+            from .watch import AnalysisWatcher  # noqa: WPS433 (costly import, done only when needed)
+
+            watcher = AnalysisWatcher(analysis, config_file, use_cache=not opts.no_cache)
+            if not watcher.watched_paths():
+                logger.error("Nothing to watch: use a configuration or input file, not standard input")
+                return 2
+            sys.stdout.flush()
+            watcher.run(output=output_tap)
         return 0 if analysis.successful else 1
     except KeyboardInterrupt:
         logger.info("Keyboard interruption, aborting")
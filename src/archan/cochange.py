@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""
+Co-change module.
+
+Contains the helpers of the git co-change provider: streaming the files
+changed by each commit from ``git log``, and counting the pairs of modules
+changed together, in the same commit or within a window of commits.
+
+Counts are accumulated sparsely, by pair of module indices, and only the
+modules of the commits in the window are kept. The counts and the last
+processed commit are saved in archan's cache directory, so that the next
+run only processes the new commits.
+"""
+
+import collections
+import fnmatch
+import os
+import subprocess  # noqa: S404 (running git)
+
+from .cache import cache_dir, path_hash, read_pickle, write_pickle
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+STATE_VERSION = 2
+COMMIT_MARKER = "\0"
+
+
+def git(repository, *args):
+    """
+    Return the output of a git command.
+
+    Args:
+        repository (str): path to the git repository.
+        *args (str): the arguments of the command.
+
+    Returns:
+        str: the output of the command, stripped.
+
+    Raises:
+        subprocess.CalledProcessError: when the command failed.
+    """
+    return subprocess.run(  # noqa: S603,S607 (trusted input)
+        ["git", "-C", repository] + list(args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout.strip()
+
+
+def iter_commits(repository, revisions):
+    """
+    Stream the commits of a revision range, from the oldest.
+
+    Merge commits are skipped, their changes being those of the merged commits.
+
+    Args:
+        repository (str): path to the git repository.
+        revisions (str): the revision range, like ``HEAD`` or ``abc123..HEAD``.
+
+    Yields:
+        tuple: the hash of the commit, and the list of the paths it changed.
+
+    Raises:
+        subprocess.CalledProcessError: when ``git log`` failed.
+    """
+    command = [
+        "git",
+        "-C",
+        repository,
+        "-c",
+        "core.quotePath=false",
+        "log",
+        "--reverse",
+        "--no-merges",
+        "--name-only",
+        "--format=%x00%H",
+        revisions,
+        "--",
+    ]
+    process = subprocess.Popen(  # noqa: S603,S607 (trusted input)
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    commit, files = None, []
+    with process:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(COMMIT_MARKER):
+                if commit is not None:
+                    yield commit, files
+                commit, files = line[1:], []
+            elif line:
+                files.append(line)
+        if commit is not None:
+            yield commit, files
+        stderr = process.stderr.read()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+
+
+def module_of(path, depth=None):
+    """
+    Return the module of a path.
+
+    Args:
+        path (str): the path of a file, relative to the repository.
+        depth (int): the number of leading path components forming a module, the whole path if None.
+
+    Returns:
+        str: the module.
+    """
+    if depth is None:
+        return path
+    return "/".join(path.split("/")[:depth])
+
+
+class CoChangeCounter(object):
+    """Sparse accumulator of the number of times pairs of modules changed together."""
+
+    def __init__(self, window=1, depth=None, pattern=None, max_files=None):
+        """
+        Initialization method.
+
+        Args:
+            window (int): the number of consecutive commits in which modules changed together,
+                1 for the same commit.
+            depth (int): the number of leading path components forming a module, the whole path if None.
+            pattern (str): if set, only the paths matching this shell pattern are counted.
+            max_files (int): if set, the modules of commits changing more files are ignored
+                (mass reformatting, vendoring), as their pairs grow quadratically.
+                These commits still count in the window.
+        """
+        self.window = max(window, 1)
+        self.depth = depth
+        self.pattern = pattern
+        self.max_files = max_files
+        self.last_commit = None
+        self.modules = []
+        self.index = {}
+        self.counts = {}
+        self.recent = collections.deque(maxlen=self.window - 1 or None)
+
+    @property
+    def parameters(self):
+        """Return the parameters changing the counts."""
+        return self.window, self.depth, self.pattern, self.max_files
+
+    def add_commit(self, commit, files):
+        """
+        Count the pairs of modules changed by a commit, and in the previous commits of the window.
+
+        Args:
+            commit (str): the hash of the commit.
+            files (list of str): the paths changed by the commit.
+        """
+        self.last_commit = commit
+        if self.pattern:
+            files = [path for path in files if fnmatch.fnmatch(path, self.pattern)]
+        if self.max_files and len(files) > self.max_files:
+            logger.debug("Skip commit %s changing %d files", commit, len(files))
+            if self.window > 1:
+                # a skipped commit still counts in the window, without modules
+                self.recent.append(set())
+            return
+        changed = set()
+        for path in files:
+            module = module_of(path, self.depth)
+            if module not in self.index:
+                self.index[module] = len(self.modules)
+                self.modules.append(module)
+            changed.add(self.index[module])
+        window = set(changed)
+        if self.window > 1:
+            for previous in self.recent:
+                window.update(previous)
+            self.recent.append(changed)
+        counts = self.counts
+        pairs = {(min(one, other), max(one, other)) for one in changed for other in window if one != other}
+        for pair in pairs:
+            counts[pair] = counts.get(pair, 0) + 1
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["recent"] = list(self.recent)
+        return state
+
+    def __setstate__(self, state):
+        recent = state.pop("recent")
+        self.__dict__.update(state)
+        self.recent = collections.deque(recent, maxlen=self.window - 1 or None)
+
+
+def count_co_changes(repository=".", window=1, depth=None, pattern=None, max_files=None, resume=True):
+    """
+    Count the pairs of modules changed together in the history of a git repository.
+
+    Args:
+        repository (str): path to the git repository.
+        window (int): the number of consecutive commits in which modules changed together.
+        depth (int): the number of leading path components forming a module, the whole path if None.
+        pattern (str): if set, only the paths matching this shell pattern are counted.
+        max_files (int): if set, the modules of commits changing more files are ignored,
+            these commits still counting in the window.
+        resume (bool): whether to resume from the counts saved by the previous run,
+            and save them for the next one. Counts are not saved when the cache directory is unusable.
+
+    Returns:
+        CoChangeCounter: the counter, with the modules and the counts of their pairs.
+
+    Raises:
+        subprocess.CalledProcessError: when a git command failed.
+    """
+    repository = os.path.abspath(repository)
+    head = git(repository, "rev-parse", "HEAD")
+    counter = CoChangeCounter(window, depth, pattern, max_files)
+    state_path = None
+    if resume:
+        state_key = "%s\0%r" % (repository, counter.parameters)
+        try:
+            state_path = os.path.join(cache_dir("cochange"), "%s.pickle" % path_hash(state_key))
+        except OSError as error:
+            logger.debug("Cannot use cache directory: %s", error)
+    revisions = head
+    if state_path:
+        saved = read_pickle(state_path)
+        if isinstance(saved, tuple) and len(saved) == 2 and saved[0] == STATE_VERSION:
+            saved = saved[1]
+            if is_ancestor(repository, saved.last_commit, head):
+                counter = saved
+                revisions = "%s..%s" % (saved.last_commit, head)
+    if counter.last_commit == head:
+        logger.info("No new commit since %s", head)
+        return counter
+    logger.info("Count co-changes in %s, commits %s", repository, revisions)
+    commits = 0
+    for commit, files in iter_commits(repository, revisions):
+        counter.add_commit(commit, files)
+        commits += 1
+    logger.info("Processed %d commits", commits)
+    counter.last_commit = head
+    if state_path:
+        write_pickle(state_path, (STATE_VERSION, counter))
+    return counter
+
+
+def is_ancestor(repository, commit, head):
+    """
+    Tell if a commit is an ancestor of another one, or the same commit.
+
+    Args:
+        repository (str): path to the git repository.
+        commit (str): the hash of the commit, or None.
+        head (str): the hash of the other commit.
+
+    Returns:
+        bool: whether the commit is an ancestor of the other one.
+    """
+    if not commit:
+        return False
+    if commit == head:
+        return True
+    try:
+        git(repository, "merge-base", "--is-ancestor", commit, head)
+    except subprocess.CalledProcessError:
+        return False
+    return True
@@ -3,60 +3,107 @@
 """Configuration module."""
 
 import collections
+import hashlib
 import importlib
 import os
 import sys
-from copy import deepcopy
-
-import pkg_resources
-import yaml
-from colorama import Style
 
 from .analysis import AnalysisGroup
-from .errors import ConfigError
+from .cache import cache_dir, environment_signature, path_hash, read_pickle, write_pickle
+from .errors import ConfigError, PluginNotFoundError
 from .logging import Logger
-from .plugins import Checker, Provider
+from .plugins import Checker
 from .printing import console_width
+from .registry import kind_of
+from .registry import registry as default_registry
 
-try:
-
-    class PluginNotFoundError(ModuleNotFoundError):
-        """Exception to raise when a plugin is not found or importable."""
+logger = Logger.get_logger(__name__)
 
 
-except NameError:
+def load_yaml(content):
+    """
+    Load YAML contents with the C-accelerated safe loader when available.
 
-    class PluginNotFoundError(ImportError):  # type: ignore
-        """Exception to raise when a plugin is not found or importable."""
+    Args:
+        content (bytes/str): the YAML contents.
 
+    Returns:
+        obj: the loaded object.
+    """
+    import yaml  # noqa: WPS433 (costly import, done only when needed)
 
-logger = Logger.get_logger(__name__)
+    return yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))  # noqa: S506 (safe loader)
 
 
 class Config(object):
-    """Configuration class."""
-
-    def __init__(self, config_dict=None):
+    """
+    Configuration class.
+
+    The configuration dictionary is first compiled into a list of validated
+    and normalized analysis groups definitions, which are then inflated
+    into analysis groups of plugins instances. Compiled definitions
+    of configuration files are cached on disk.
+
+    The optional ``time_budget`` item of the configuration is the
+    maximum time of a whole analysis run, in seconds, the optional
+    ``isolation`` item sets the limits of isolated plugins, the optional
+    ``provider_cache`` item sets the maximum size of the providers' data cache,
+    and the optional ``provider_concurrency`` item is the number of providers
+    run concurrently.
+    """
+
+    def __init__(self, config_dict=None, registry=None, compiled_groups=None):
         """
         Initialization method.
 
         Args:
             config_dict (dict): the configuration as a dictionary.
+            registry (PluginRegistry): the registry of installed plugins.
+            compiled_groups (list of dict): already compiled analysis groups
+                definitions, to skip compilation of ``config_dict``.
         """
-        self.config_dict = deepcopy(config_dict)
-        self.plugins = Config.load_installed_plugins()
-        self.analysis_groups = []
+        self.config_dict = config_dict
+        self.plugins = registry or default_registry
+        self.compile_errors = 0
+        self.time_budget = (config_dict or {}).get("time_budget")
+        self.isolation = dict((config_dict or {}).get("isolation") or {})
+        self.provider_cache = dict((config_dict or {}).get("provider_cache") or {})
+        self.provider_concurrency = (config_dict or {}).get("provider_concurrency")
+        if compiled_groups is None:
+            compiled_groups = self.compile(config_dict)
+        self.compiled_groups = compiled_groups
+        self.analysis_groups = self.inflate_analysis_groups()
+
+    def __str__(self):
+        return str(self.config_dict)
 
+    def compile(self, config_dict):  # noqa: A003 (method, not shadowing the builtin)
+        """
+        Compile a configuration dictionary into analysis groups definitions.
+
+        The configuration dictionary is not modified.
+
+        Args:
+            config_dict (dict): the configuration as a dictionary.
+
+        Returns:
+            list of dict: the compiled analysis groups definitions.
+
+        Raises:
+            ValueError: when the "analysis" item is not a dict.
+        """
+        compiled_groups = []
         if not config_dict:
-            return
+            return compiled_groups
 
         analysis = config_dict.get("analysis", {})
 
         if isinstance(analysis, dict):
             for group_key, group_def in analysis.items():
                 try:
-                    self.analysis_groups.append(self.inflate_analysis_group(group_key, group_def))
+                    compiled_groups.append(self.compile_analysis_group(group_key, group_def))
                 except ValueError as e:
+                    self.compile_errors += 1
                     logger.error(
                         'Error while inflating "%s" analysis group. '
                         "The group will not be added to the list. "
@@ -66,9 +113,7 @@ class Config(object):
                     )
         else:
             raise ValueError('%s type is not supported for "analysis" key, ' "use dict only" % type(analysis))
-
-    def __str__(self):
-        return str(self.config_dict)
+        return compiled_groups
 
     @staticmethod
     def load_local_plugin(name):
@@ -84,15 +129,9 @@ class Config(object):
     @staticmethod
     def load_installed_plugins():
         """Search and load every installed plugin through entry points."""
-        providers = {}
-        checkers = {}
-        for entry_point in pkg_resources.iter_entry_points(group="archan"):
-            obj = entry_point.load()
-            if issubclass(obj, Provider):
-                providers[entry_point.name] = obj
-            elif issubclass(obj, Checker):
-                checkers[entry_point.name] = obj
-        return collections.namedtuple("Plugins", "providers checkers")(providers=providers, checkers=checkers)
+        return collections.namedtuple("Plugins", "providers checkers")(
+            providers=default_registry.providers, checkers=default_registry.checkers
+        )
 
     @staticmethod
     def lint(config):
@@ -103,12 +142,46 @@ class Config(object):
             raise ConfigError('config must have "analysis" item')
 
     @staticmethod
-    def from_file(path):
-        """Return a ``Config`` instance by reading a configuration file."""
-        with open(path) as stream:
-            obj = yaml.safe_load(stream)
+    def from_file(path, use_cache=True):
+        """
+        Return a ``Config`` instance by reading a configuration file.
+
+        Compiled analysis groups are cached, keyed on the file contents
+        and the installed distributions. The C-accelerated YAML loader
+        is used when available.
+
+        Args:
+            path (str): path to the configuration file.
+            use_cache (bool): whether to read and write the compiled configuration cache.
+
+        Returns:
+            Config: the configuration instance.
+        """
+        with open(path, "rb") as stream:
+            content = stream.read()
+
+        cache_file = key = None
+        if use_cache:
+            key = hashlib.sha256(content + environment_signature().encode()).hexdigest()
+            try:
+                cache_file = os.path.join(cache_dir("config"), "%s.pickle" % path_hash(path))
+            except OSError as error:
+                logger.debug("Cannot use cache directory: %s", error)
+            cached = read_pickle(cache_file) if cache_file else None
+            if cached and cached.get("key") == key:
+                logger.debug("Read compiled configuration from cache %s", cache_file)
+                return Config(config_dict=cached["config_dict"], compiled_groups=cached["compiled_groups"])
+
+        obj = load_yaml(content)
         Config.lint(obj)
-        return Config(config_dict=obj)
+        config = Config(config_dict=obj)
+        # don't cache configurations with errors, so they are reported on each run
+        if cache_file and not config.compile_errors:
+            logger.debug("Write compiled configuration to cache %s", cache_file)
+            write_pickle(
+                cache_file, {"key": key, "config_dict": obj, "compiled_groups": config.compiled_groups}
+            )
+        return config
 
     @staticmethod
     def find():
@@ -143,73 +216,61 @@ class Config(object):
                 "analysis": {
                     "archan.CSVInput": {
                         "arguments": {"file_path": file_path},
-                        "checkers": (
+                        "checkers": [
                             "archan.CompleteMediation",
                             "archan.EconomyOfMechanism",
                             "archan.LeastCommonMechanism",
                             "archan.LayeredArchitecture",
-                        ),
+                        ],
                     }
                 }
             }
         )
 
-    @staticmethod
-    def inflate_plugin_list(plugin_list, inflate_plugin):
+    def compile_plugins(self, plugins_definition, cls):
         """
-        Inflate a list of strings/dictionaries to a list of plugin instances.
+        Compile a list/dict of plugins definitions.
+
+        Plugins that cannot be found are logged and skipped.
 
         Args:
-            plugin_list (list): a list of str/dict.
-            inflate_plugin (method): the method to inflate the plugin.
+            plugins_definition (list/dict): a list of str/dict, or a dict of dict.
+            cls (str): "provider" or "checker".
 
         Returns:
-            list: a plugin instances list.
+            list of tuple: pairs of plugin identifier and definition.
 
         Raises:
-            ValueError: when a dictionary item contains more than one key.
-        """
-        plugins = []
-        for plugin_def in plugin_list:
-            if isinstance(plugin_def, str):
-                try:
-                    plugins.append(inflate_plugin(plugin_def))
-                except PluginNotFoundError as e:
-                    logger.error("Could not import plugin identified by %s. " "Exception: %s.", plugin_def, e)
-            elif isinstance(plugin_def, dict):
-                if len(plugin_def) > 1:
-                    raise ValueError("When using a plugin list, each dictionary item " "must contain only one key.")
-                identifier = list(plugin_def.keys())[0]
-                definition = plugin_def[identifier]
-                try:
-                    plugins.append(inflate_plugin(identifier, definition))
-                except PluginNotFoundError as e:
-                    logger.error(
-                        "Could not import plugin identified by %s. " "Inflate method: %s. Exception: %s.",
-                        identifier,
-                        inflate_plugin,
-                        e,
-                    )
-        return plugins
-
-    @staticmethod
-    def inflate_plugin_dict(plugin_dict, inflate_plugin):
+            ValueError: when the definition type is not list or dict,
+                or when a dictionary item of a list contains more than one key.
         """
-        Inflate a list of strings/dictionaries to a list of plugin instances.
-
-        Args:
-            plugin_dict (dict): a dict of dict.
-            inflate_plugin (method): the method to inflate the plugin.
+        if isinstance(plugins_definition, (list, tuple)):
+            items = []
+            for plugin_def in plugins_definition:
+                if isinstance(plugin_def, str):
+                    items.append((plugin_def, None))
+                elif isinstance(plugin_def, dict):
+                    if len(plugin_def) > 1:
+                        raise ValueError(
+                            "When using a plugin list, each dictionary item " "must contain only one key."
+                        )
+                    items.extend(plugin_def.items())
+        elif isinstance(plugins_definition, dict):
+            items = list(plugins_definition.items())
+        else:
+            raise ValueError(
+                "%s type is not supported for a plugin list, " "use list or dict" % type(plugins_definition)
+            )
 
-        Returns:
-            list: a plugin instances list.
-        """
         plugins = []
-        for identifier, definition in plugin_dict.items():
+        for identifier, definition in items:
             try:
-                plugins.append(inflate_plugin(identifier, definition))
+                self.get_plugin_kind(identifier, cls)
             except PluginNotFoundError as e:
-                logger.error("Could not import plugin identified by %s. " "Exception: %s.", identifier, e)
+                self.compile_errors += 1
+                logger.error("Could not import %s identified by %s. " "Exception: %s.", cls, identifier, e)
+            else:
+                plugins.append((identifier, definition))
         return plugins
 
     @staticmethod
@@ -231,6 +292,7 @@ class Config(object):
         if isinstance(definition, bool):
             return Checker(name=identifier, passes=definition)
         elif isinstance(definition, dict):
+            definition = dict(definition)
             return Checker(definition.pop("name", identifier), **definition)
         else:
             raise ValueError("%s type is not supported for no-data checkers, " "use bool or dict" % type(definition))
@@ -263,10 +325,9 @@ class Config(object):
         Returns:
             Checker/Provider: plugin class.
         """
-        if (cls is None or cls == "provider") and identifier in self.available_providers:
-            return self.available_providers[identifier]
-        elif (cls is None or cls == "checker") and identifier in self.available_checkers:
-            return self.available_checkers[identifier]
+        plugin = self.plugins.get(identifier, cls)
+        if plugin is not None:
+            return plugin
         return Config.load_local_plugin(identifier)
 
     def get_provider(self, identifier):
@@ -310,28 +371,26 @@ class Config(object):
         # same instances shared across analyses (to avoid re-computing stuff)
         return cls(**definition or {})
 
-    def inflate_plugins(self, plugins_definition, inflate_method):
+    def inflate_plugins(self, compiled_plugins, cls):
         """
-        Inflate multiple plugins based on a list/dict definition.
+        Inflate multiple plugins based on their compiled definitions.
+
+        Plugins that cannot be imported anymore are logged and skipped.
 
         Args:
-            plugins_definition (list/dict): the plugins definitions.
-            inflate_method (method): the method to indlate each plugin.
+            compiled_plugins (list of tuple): pairs of plugin identifier and definition.
+            cls (str): "provider" or "checker".
 
         Returns:
             list: a list of plugin instances.
-
-        Raises:
-            ValueError: when the definition type is not list or dict.
         """
-        if isinstance(plugins_definition, list):
-            return self.inflate_plugin_list(plugins_definition, inflate_method)
-        elif isinstance(plugins_definition, dict):
-            return self.inflate_plugin_dict(plugins_definition, inflate_method)
-        else:
-            raise ValueError(
-                "%s type is not supported for a plugin list, " "use list or dict" % type(plugins_definition)
-            )
+        plugins = []
+        for identifier, definition in compiled_plugins:
+            try:
+                plugins.append(self.inflate_plugin(identifier, definition, cls))
+            except PluginNotFoundError as e:
+                logger.error("Could not import %s identified by %s. " "Exception: %s.", cls, identifier, e)
+        return plugins
 
     def inflate_provider(self, identifier, definition=None):
         """Shortcut to inflate a provider."""
@@ -341,64 +400,61 @@ class Config(object):
         """Shortcut to inflate a checker."""
         return self.inflate_plugin(identifier, definition, "checker")
 
-    def inflate_providers(self, providers_definition):
+    def inflate_providers(self, compiled_providers):
         """Shortcut to inflate multiple providers."""
-        return self.inflate_plugins(providers_definition, self.inflate_provider)  # noqa
+        return self.inflate_plugins(compiled_providers, "provider")
 
-    def inflate_checkers(self, checkers_definition):
+    def inflate_checkers(self, compiled_checkers):
         """Shortcut to inflate multiple checkers."""
-        return self.inflate_plugins(checkers_definition, self.inflate_checker)
+        return self.inflate_plugins(compiled_checkers, "checker")
 
-    def inflate_analysis_group(self, identifier, definition):
+    def get_plugin_kind(self, identifier, cls=None):
+        """
+        Return the kind of the plugin corresponding to the given identifier and type.
+
+        Installed plugins are not imported, local plugins are.
+
+        Args:
+            identifier (str): identifier of the plugin.
+            cls (str): one of checker / provider.
+
+        Returns:
+            str: "provider", "checker", or None.
         """
-        Inflate a whole analysis group.
+        kind = self.plugins.kind(identifier)
+        if kind is not None and (cls is None or kind == cls):
+            return kind
+        return kind_of(Config.load_local_plugin(identifier))
+
+    def compile_analysis_group(self, identifier, definition):
+        """
+        Compile a whole analysis group.
 
         An analysis group is a section defined in the YAML file.
+        The definition is not modified.
 
         Args:
             identifier (str): the group identifier.
-            definition (list/dict): the group definition.
+            definition (dict): the group definition.
 
         Returns:
-            AnalysisGroup: an instance of AnalysisGroup.
+            dict: the compiled analysis group definition, with "name",
+            "description", "providers", "checkers" and "nd_checkers" items.
 
         Raises:
             ValueError: when identifier targets a plugin of a certain type,
                 and the definition does not contain the entry for the
                 other-type plugins (providers <-> checkers).
         """
+        definition = dict(definition or {})
         providers_definition = definition.pop("providers", None)
         checkers_definition = definition.pop("checkers", None)
 
-        analysis_group = AnalysisGroup()
+        compiled_group = {"name": None, "description": None, "providers": [], "checkers": [], "nd_checkers": []}
 
         try:
 
-            first_plugin = self.inflate_plugin(identifier, definition)
-
-            if isinstance(first_plugin, Checker):
-                analysis_group.checkers.append(first_plugin)
-
-                if providers_definition is None:
-                    raise ValueError(
-                        "when declaring an analysis group with a checker "
-                        "identifier, you must also declare providers with "
-                        'the "providers" key.'
-                    )
-
-                analysis_group.providers.extend(self.inflate_providers(providers_definition))
-
-            elif isinstance(first_plugin, Provider):
-                analysis_group.providers.append(first_plugin)
-
-                if checkers_definition is None:
-                    raise ValueError(
-                        "when declaring an analysis group with a provider "
-                        "identifier, you must also declare checkers with "
-                        'the "checkers" key.'
-                    )
-
-                analysis_group.checkers.extend(self.inflate_checkers(checkers_definition))
+            kind = self.get_plugin_kind(identifier)
 
         except PluginNotFoundError as e:
 
@@ -408,8 +464,8 @@ class Config(object):
                 e,
             )
 
-            analysis_group.name = definition.pop("name", identifier)
-            analysis_group.description = definition.pop("description", None)
+            compiled_group["name"] = definition.pop("name", identifier)
+            compiled_group["description"] = definition.pop("description", None)
 
             if bool(providers_definition) != bool(checkers_definition):
                 raise ValueError(
@@ -418,28 +474,90 @@ class Config(object):
                 )
 
             if providers_definition and checkers_definition:
-                analysis_group.providers.extend(self.inflate_providers(providers_definition))
-                analysis_group.checkers.extend(self.inflate_checkers(checkers_definition))
+                compiled_group["providers"] = self.compile_plugins(providers_definition, "provider")
+                compiled_group["checkers"] = self.compile_plugins(checkers_definition, "checker")
 
-        self.cleanup_definition(definition)
+            self.cleanup_definition(definition)
 
-        for nd_identifier, nd_definition in definition.items():
-            analysis_group.checkers.append(self.inflate_nd_checker(nd_identifier, nd_definition))
+            for nd_identifier, nd_definition in definition.items():
+                if not isinstance(nd_definition, (bool, dict)):
+                    raise ValueError(
+                        "%s type is not supported for no-data checkers, " "use bool or dict" % type(nd_definition)
+                    )
+                compiled_group["nd_checkers"].append((nd_identifier, nd_definition))
+
+            return compiled_group
+
+        # the remaining items of the definition are the first plugin's arguments
+        if kind == "checker":
+            compiled_group["checkers"].append((identifier, definition))
+
+            if providers_definition is None:
+                raise ValueError(
+                    "when declaring an analysis group with a checker "
+                    "identifier, you must also declare providers with "
+                    'the "providers" key.'
+                )
+
+            compiled_group["providers"] = self.compile_plugins(providers_definition, "provider")
+
+        elif kind == "provider":
+            compiled_group["providers"].append((identifier, definition))
+
+            if checkers_definition is None:
+                raise ValueError(
+                    "when declaring an analysis group with a provider "
+                    "identifier, you must also declare checkers with "
+                    'the "checkers" key.'
+                )
+
+            compiled_group["checkers"] = self.compile_plugins(checkers_definition, "checker")
+
+        return compiled_group
 
+    def inflate_analysis_group(self, compiled_group):
+        """
+        Inflate a whole analysis group from its compiled definition.
+
+        Args:
+            compiled_group (dict): the compiled analysis group definition.
+
+        Returns:
+            AnalysisGroup: an instance of AnalysisGroup.
+        """
+        analysis_group = AnalysisGroup(name=compiled_group["name"], description=compiled_group["description"])
+        analysis_group.providers.extend(self.inflate_providers(compiled_group["providers"]))
+        analysis_group.checkers.extend(self.inflate_checkers(compiled_group["checkers"]))
+        for nd_identifier, nd_definition in compiled_group["nd_checkers"]:
+            analysis_group.checkers.append(self.inflate_nd_checker(nd_identifier, nd_definition))
         return analysis_group
 
+    def inflate_analysis_groups(self):
+        """
+        Inflate new instances of every compiled analysis group.
+
+        Returns:
+            list of AnalysisGroup: the analysis groups.
+        """
+        return [self.inflate_analysis_group(compiled_group) for compiled_group in self.compiled_groups]
+
     def print_plugins(self):
         """Print the available plugins."""
+        from colorama import Style  # noqa: WPS433 (costly import, done only when needed)
+
         width = console_width()
         line = Style.BRIGHT + "=" * width + "\n"
         middle = int(width / 2)
-        if self.available_providers:
+        # plugins metadata come from the registry cache, plugins are not imported
+        providers = self.plugins.infos("provider")
+        checkers = self.plugins.infos("checker")
+        if providers:
             print(line + " " * middle + "PROVIDERS")
-            for provider in sorted(self.available_providers.values(), key=lambda x: x.identifier):
-                provider().print()
+            for provider in providers:
+                provider.print()
                 print()
-        if self.available_checkers:
+        if checkers:
             print(line + " " * middle + "CHECKERS")
-            for checker in sorted(self.available_checkers.values(), key=lambda x: x.identifier):
-                checker().print()
+            for checker in checkers:
+                checker.print()
                 print()
@@ -5,10 +5,27 @@ DSM module.
 
 Contains the DesignStructureMatrix, DomainMappingMatrix and
 MultipleDomainMatrix classes.
+
+Design structure and domain mapping matrices can be placed in shared
+memory (Python 3.8+), to be attached by other processes without copy:
+cells are packed in a shared memory block, the returned handle holding
+its name, the shape and type of cells, and the entities and categories.
+Attached matrices have read-only ``memoryview`` rows.
+
+Matrices are pickled compactly, their cells packed the same way and
+compressed, and are not validated again when unpickled.
 """
 
+import sys
+import weakref
+import zlib
+from array import array
+from collections import namedtuple
+
 from .errors import DesignStructureMatrixError, DomainMappingMatrixError, MatrixError, MultipleDomainMatrixError
 
+PACKING_TYPECODES = ("B", "h", "i", "q", "d")
+
 
 def validate_rows_length(data, length, message=None, exception=MatrixError):
     """Validate that all rows have the same length."""
@@ -38,6 +55,159 @@ def validate_categories_equal_entities(categories, entities, message=None, excep
         raise exception(message)
 
 
+def get_shared_memory_class():
+    """
+    Return the SharedMemory class.
+
+    Returns:
+        type: the ``multiprocessing.shared_memory.SharedMemory`` class.
+
+    Raises:
+        MatrixError: when shared memory is not available (before Python 3.8).
+    """
+    try:
+        from multiprocessing.shared_memory import SharedMemory  # noqa: WPS433 (costly import, done only when needed)
+    except ImportError:
+        raise MatrixError("Shared memory needs Python 3.8 or later")
+    return SharedMemory
+
+
+def pack_rows(rows):
+    """
+    Pack the cells of rows in bytes, with the smallest array type fitting them.
+
+    Cells are packed as doubles only if they all are floats: integers beyond
+    64 bits, or mixed with floats, would not be restored as they were.
+
+    Args:
+        rows (list of list of int/float, or list of array/memoryview of a same type): the rows.
+
+    Returns:
+        tuple (str, bytes/list): the array typecode and the packed cells,
+            or None and the rows themselves if they cannot be packed without changing them.
+    """
+    if rows and isinstance(rows[0], memoryview):
+        return rows[0].format, b"".join([row.tobytes() for row in rows])
+    if rows and isinstance(rows[0], array):
+        typecode = rows[0].typecode
+        if all(isinstance(row, array) and row.typecode == typecode for row in rows):
+            return typecode, b"".join([row.tobytes() for row in rows])
+        return None, rows
+    for typecode in PACKING_TYPECODES:
+        if typecode == "d" and not all(isinstance(cell, float) for row in rows for cell in row):
+            break
+        try:
+            if typecode == "B":
+                # fast path for binary and small positive weights
+                packed_rows = [bytes(row) for row in rows]
+            else:
+                packed_rows = [array(typecode, row).tobytes() for row in rows]
+        except (OverflowError, TypeError, ValueError):
+            continue
+        return typecode, b"".join(packed_rows)
+    return None, rows
+
+
+def restore_matrix(  # noqa: WPS211 (the arguments of the pickled matrix)
+    matrix_class, shape, typecode, payload, compressed=False, byteorder=sys.byteorder, state=None, array_rows=False
+):
+    """
+    Restore a pickled matrix, without validating it again.
+
+    Args:
+        matrix_class (type): the class of the matrix.
+        shape (tuple of int): the number of rows and columns.
+        typecode (str): the array typecode of the packed cells, or None if the payload is the data itself.
+        payload (bytes/list): the packed cells, or the data.
+        compressed (bool): whether the packed cells are compressed.
+        byteorder (str): the byte order of the packed cells.
+        state (dict): the other attributes of the matrix, like entities and categories.
+        array_rows (bool): whether to restore rows as arrays, like the pickled ones, instead of lists.
+
+    Returns:
+        BaseMatrix: the matrix.
+    """
+    if typecode is None:
+        data = payload
+    else:
+        if compressed:
+            payload = zlib.decompress(payload)
+        cells = array(typecode)
+        cells.frombytes(payload)
+        if byteorder != sys.byteorder:
+            cells.byteswap()
+        rows, columns = shape
+        if array_rows:
+            data = [cells[index * columns : (index + 1) * columns] for index in range(rows)]
+        else:
+            data = [cells[index * columns : (index + 1) * columns].tolist() for index in range(rows)]
+    matrix = matrix_class.__new__(matrix_class)
+    matrix.__dict__.update(state or {})
+    matrix.data = data
+    return matrix
+
+
+def release_shared_rows(rows, cells, shared_memory):
+    """
+    Release the rows of an attached matrix, and close its shared memory block.
+
+    Args:
+        rows (list of memoryview): the rows.
+        cells (memoryview): the view of every cell.
+        shared_memory (SharedMemory): the shared memory block.
+    """
+    for row in rows:
+        row.release()
+    cells.release()
+    shared_memory.close()
+
+
+class SharedMatrixHandle(namedtuple("SharedMatrixHandle", "name shape typecode entities categories matrix_class")):
+    """
+    Handle of a matrix placed in shared memory, as returned by ``BaseMatrix.share``.
+
+    Handles are small and can be sent to other processes, to attach the matrix.
+    """
+
+    __slots__ = ()
+
+    def attach(self):
+        """
+        Attach the matrix, without copying its cells.
+
+        The shared memory block is closed when the returned matrix is
+        garbage-collected, or when its ``detach`` method is called.
+
+        Returns:
+            BaseMatrix: a matrix with read-only ``memoryview`` rows.
+        """
+        shared_memory_class = get_shared_memory_class()
+        try:
+            shared_memory = shared_memory_class(name=self.name, track=False)
+        except TypeError:
+            # before Python 3.13, attaching also registers the block to the resource tracker,
+            # which is the one of the owner in processes it started: the owner still unlinks it
+            shared_memory = shared_memory_class(name=self.name)
+        rows, columns = self.shape
+        cells = shared_memory.buf.toreadonly().cast(self.typecode)
+        data = [cells[index * columns : (index + 1) * columns] for index in range(rows)]
+        # attached data are already validated
+        matrix = self.matrix_class.__new__(self.matrix_class)
+        matrix.data = data
+        matrix.entities = list(self.entities)
+        matrix.categories = list(self.categories)
+        matrix._detach = weakref.finalize(  # noqa: WPS437 (set by the handle)
+            matrix, release_shared_rows, data, cells, shared_memory
+        )
+        return matrix
+
+    def unlink(self):
+        """Free the shared memory block, once every process is done with the matrix."""
+        shared_memory = get_shared_memory_class()(name=self.name)
+        shared_memory.close()
+        shared_memory.unlink()
+
+
 class BaseMatrix(object):
     """Base class for matrix classes."""
 
@@ -48,6 +218,8 @@ class BaseMatrix(object):
     error = MatrixError
     square = False
 
+    _detach = None
+
     def __init__(self, data, entities=None, categories=None):
         """
         Initialization method.
@@ -93,6 +265,59 @@ class BaseMatrix(object):
         """Default entities used when there are none."""
         return [str(i) for i in range(self.rows)]
 
+    def __reduce__(self):
+        typecode, payload = pack_rows(self.data)
+        if typecode is None:
+            return (restore_matrix, (type(self), self.size, None, payload, False, sys.byteorder, self._pickled_state()))
+        compressed = zlib.compress(payload, 1)
+        is_compressed = len(compressed) < len(payload)
+        return (
+            restore_matrix,
+            (
+                type(self),
+                self.size,
+                typecode,
+                compressed if is_compressed else payload,
+                is_compressed,
+                sys.byteorder,
+                self._pickled_state(),
+                bool(self.data) and isinstance(self.data[0], array),
+            ),
+        )
+
+    def _pickled_state(self):
+        return {key: value for key, value in self.__dict__.items() if key not in {"data", "_detach"}}
+
+    def share(self):
+        """
+        Copy the matrix in a new shared memory block.
+
+        Cells are packed with the smallest integer type fitting them,
+        or as floats. The block must be freed with the ``unlink`` method
+        of the returned handle.
+
+        Returns:
+            SharedMatrixHandle: the handle to attach the matrix from other processes.
+
+        Raises:
+            MatrixError: when shared memory is not available, or the cells cannot be packed.
+        """
+        shared_memory_class = get_shared_memory_class()
+        typecode, payload = pack_rows(self.data)
+        if typecode is None:
+            raise self.error("Cells must all be 64-bit integers, or all floats, to be shared")
+        shared_memory = shared_memory_class(create=True, size=max(len(payload), 1))
+        shared_memory.buf[: len(payload)] = payload
+        shared_memory.close()
+        return SharedMatrixHandle(
+            shared_memory.name, self.size, typecode, list(self.entities), list(self.categories), type(self)
+        )
+
+    def detach(self):
+        """Close the shared memory block of an attached matrix. Its rows cannot be used anymore."""
+        if self._detach is not None:
+            self._detach()
+
 
 class DesignStructureMatrix(BaseMatrix):
     """Design Structure Matrix class."""
@@ -144,6 +369,19 @@ class MultipleDomainMatrix(BaseMatrix):
     error = MultipleDomainMatrixError
     square = True
 
+    def share(self):
+        """
+        Multiple domain matrices cannot be placed in shared memory: their cells are matrices.
+
+        Raises:
+            MultipleDomainMatrixError: always.
+        """
+        raise self.error("Multiple domain matrices cannot be placed in shared memory")
+
+    def __reduce__(self):
+        # cells are matrices, pickled compactly themselves
+        return (restore_matrix, (type(self), self.size, None, self.data, False, sys.byteorder, self._pickled_state()))
+
     def validate(self):
         """Base validation + each cell is instance of DSM or MDM."""
         super().validate()
@@ -15,5 +15,13 @@ class ResultCode(metaclass=MetaEnum):
     FAILED = 0
     IGNORED = -1
     NOT_IMPLEMENTED = -2
+    TIMEOUT = -3
 
-    ALL = (PASSED, FAILED, IGNORED, NOT_IMPLEMENTED)
+    ALL = (PASSED, FAILED, IGNORED, NOT_IMPLEMENTED, TIMEOUT)
+    NAMES = {
+        PASSED: "passed",
+        FAILED: "failed",
+        IGNORED: "ignored",
+        NOT_IMPLEMENTED: "not_implemented",
+        TIMEOUT: "timeout",
+    }
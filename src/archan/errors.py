@@ -21,3 +21,38 @@ class MultipleDomainMatrixError(MatrixError):
 
 class ConfigError(Exception):
     """Exception raised for errors in the configuration."""
+
+
+try:
+
+    class PluginNotFoundError(ModuleNotFoundError):
+        """Exception to raise when a plugin is not found or importable."""
+
+
+except NameError:
+
+    class PluginNotFoundError(ImportError):  # type: ignore
+        """Exception to raise when a plugin is not found or importable."""
+
+
+class PluginTimeoutError(BaseException):
+    """
+    Exception raised when a plugin runs for longer than its timeout.
+
+    Like ``KeyboardInterrupt``, it derives from ``BaseException``: it is raised
+    inside the plugin's code, and must not be swallowed by ``except Exception``.
+    """
+
+    def __init__(self, timeout):
+        """
+        Initialization method.
+
+        Args:
+            timeout (float): the expired timeout, in seconds.
+        """
+        super().__init__("timed out after %gs" % timeout)
+        self.timeout = timeout
+
+
+class PluginCrashError(Exception):
+    """Exception raised when an isolated plugin failed with an error, or its worker process died."""
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+"""
+Imports module.
+
+Contains the helpers of the Python imports provider: finding the modules
+of packages, parsing the imports of each file with ``ast``, in a pool
+of processes, and caching them per file.
+
+A cached file is not read again while its modification time and size
+do not change. When they change, the file is read again, but it is only
+parsed again if the hash of its contents changed too.
+"""
+
+import ast
+import hashlib
+import multiprocessing
+import os
+
+from .cache import cache_dir, path_hash, read_pickle, write_pickle
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+CACHE_VERSION = 1
+SKIPPED_DIRECTORIES = frozenset(("__pycache__", "node_modules"))
+
+
+def find_modules(packages):
+    """
+    Find the modules of packages, and the files defining them.
+
+    Args:
+        packages (list of str): paths to package directories, or to single modules.
+
+    Returns:
+        dict: the files and whether they are packages (``__init__`` files), by module name.
+    """
+    modules = {}
+    for package in packages:
+        package = os.path.abspath(package)
+        root = os.path.dirname(package)
+        if os.path.isfile(package):
+            modules[os.path.splitext(os.path.basename(package))[0]] = (package, False)
+            continue
+        for directory, subdirectories, files in os.walk(package):
+            subdirectories[:] = sorted(
+                name for name in subdirectories if name not in SKIPPED_DIRECTORIES and not name.startswith(".")
+            )
+            parts = os.path.relpath(directory, root).split(os.sep)
+            for file_name in sorted(files):
+                if not file_name.endswith(".py"):
+                    continue
+                if file_name == "__init__.py":
+                    modules[".".join(parts)] = (os.path.join(directory, file_name), True)
+                else:
+                    modules[".".join(parts + [file_name[:-3]])] = (os.path.join(directory, file_name), False)
+    return modules
+
+
+def parse_imports(source, module_name, is_package=False, file_name="<unknown>"):
+    """
+    Return the absolute names imported by Python source code.
+
+    Relative imports are resolved from the name of the module.
+    Names imported from a module are returned as submodules of it
+    (``from a import b`` gives ``a.b``): they are resolved to the longest
+    existing module later, see ``resolve_import``.
+
+    Args:
+        source (bytes/str): the source code.
+        module_name (str): the name of the module.
+        is_package (bool): whether the module is a package (``__init__`` file).
+        file_name (str): the name of the file, for syntax errors.
+
+    Returns:
+        list of str: the imported names, once per import.
+
+    Raises:
+        SyntaxError: when the source code is invalid.
+    """
+    package = module_name.split(".") if is_package else module_name.split(".")[:-1]
+    names = []
+    for node in ast.walk(ast.parse(source, file_name)):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if node.level > len(package):
+                    continue
+                base = package[: len(package) - node.level + 1]
+                base = ".".join(base + [node.module] if node.module else base)
+            else:
+                base = node.module
+            if not base:
+                continue
+            names.extend(base if alias.name == "*" else "%s.%s" % (base, alias.name) for alias in node.names)
+    return names
+
+
+def resolve_import(name, modules):
+    """
+    Return the longest known module a name is in.
+
+    Args:
+        name (str): the imported name, like ``a.b.c``.
+        modules (dict/set): the known module names.
+
+    Returns:
+        str: the module name, or None if the name is not in a known module.
+    """
+    while name:
+        if name in modules:
+            return name
+        name = name.rpartition(".")[0]
+    return None
+
+
+def scan_file(task):
+    """
+    Read a file and parse its imports, unless its contents did not change.
+
+    Args:
+        task (tuple): the module name, path, whether it is a package,
+            and the hash of the contents when they were last parsed, or None.
+
+    Returns:
+        tuple: the module name, path, modification time, size, hash of the
+            contents, and imported names (None if the contents did not change).
+    """
+    module_name, file_path, is_package, known_digest = task
+    with open(file_path, "rb") as stream:
+        stat = os.fstat(stream.fileno())
+        source = stream.read()
+    digest = hashlib.sha1(source).hexdigest()  # noqa: S303 (not used for security)
+    if digest == known_digest:
+        return module_name, file_path, stat.st_mtime_ns, stat.st_size, digest, None
+    try:
+        names = parse_imports(source, module_name, is_package, file_path)
+    except (SyntaxError, ValueError) as error:
+        logger.warning("Cannot parse %s: %s", file_path, error)
+        names = []
+    return module_name, file_path, stat.st_mtime_ns, stat.st_size, digest, names
+
+
+class ImportsCache(object):
+    """Imports of files, with their modification time, size and hash."""
+
+    def __init__(self, key, enabled=True):
+        """
+        Initialization method.
+
+        The cache file is disabled when the cache directory cannot be created.
+
+        Args:
+            key (str): the key of the cache file, for example the analyzed packages.
+            enabled (bool): whether to read and write the cache file.
+        """
+        self.path = None
+        self.entries = {}
+        if enabled:
+            try:
+                self.path = os.path.join(cache_dir("imports"), "%s.pickle" % path_hash(key))
+            except OSError as error:
+                logger.debug("Cannot use cache directory: %s", error)
+        if self.path:
+            cached = read_pickle(self.path)
+            if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == CACHE_VERSION:
+                self.entries = cached[1]
+
+    def lookup(self, module_name, file_path, is_package):
+        """
+        Return the cached imports of a file, if it did not change.
+
+        Args:
+            module_name (str): the name of the module.
+            file_path (str): the path to the file.
+            is_package (bool): whether the module is a package.
+
+        Returns:
+            tuple: the imported names (None when the file must be read again),
+                and the hash of its contents when they were last parsed (None if never).
+        """
+        entry = self.entries.get(file_path)
+        if entry is None or entry[0] != module_name or entry[1] != is_package:
+            return None, None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None, None
+        if (stat.st_mtime_ns, stat.st_size) == entry[2:4]:
+            return entry[5], entry[4]
+        return None, entry[4]
+
+    def store(self, module_name, file_path, is_package, mtime, size, digest, names):
+        """
+        Store the imports of a file.
+
+        Args:
+            module_name (str): the name of the module.
+            file_path (str): the path to the file.
+            is_package (bool): whether the module is a package.
+            mtime (int): the modification time of the file, in nanoseconds.
+            size (int): the size of the file.
+            digest (str): the hash of its contents.
+            names (list of str): the imported names.
+        """
+        self.entries[file_path] = (module_name, is_package, mtime, size, digest, names)
+
+    def save(self, file_paths):
+        """
+        Write the cache file, forgetting the files that were not analyzed.
+
+        Args:
+            file_paths (set of str): the paths to the analyzed files.
+        """
+        self.entries = {path: entry for path, entry in self.entries.items() if path in file_paths}
+        if self.path:
+            write_pickle(self.path, (CACHE_VERSION, self.entries))
+
+
+def scan_imports(packages, jobs=None, cache=True):
+    """
+    Return the internal imports of the modules of packages.
+
+    Files that changed since the last scan are parsed in a pool of processes,
+    or in turn when running in a daemon process (an isolated provider),
+    which cannot have children.
+
+    Args:
+        packages (list of str): paths to package directories, or to single modules.
+        jobs (int): the number of processes, the number of CPUs by default.
+        cache (bool): whether to use the cache of the imports of each file.
+
+    Returns:
+        tuple: the sorted module names, and the dictionary of the number
+            of imports, by pair of importing and imported module names.
+    """
+    modules = find_modules(packages)
+    imports_cache = ImportsCache("\0".join(sorted(os.path.abspath(package) for package in packages)), cache)
+    names_by_module = {}
+    tasks = []
+    for module_name, (file_path, is_package) in modules.items():
+        names, digest = imports_cache.lookup(module_name, file_path, is_package)
+        if names is None:
+            tasks.append((module_name, file_path, is_package, digest))
+        else:
+            names_by_module[module_name] = names
+    logger.info("Scan %d of %d modules", len(tasks), len(modules))
+
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    if jobs > 1 and multiprocessing.current_process().daemon:
+        logger.debug("Parse files in turn in daemon process")
+        jobs = 1
+    if jobs > 1:
+        with multiprocessing.Pool(jobs) as pool:
+            results = pool.map(scan_file, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+    else:
+        results = map(scan_file, tasks)
+    for module_name, file_path, mtime, size, digest, names in results:
+        if names is None:
+            names = imports_cache.entries[file_path][5]
+        imports_cache.store(module_name, file_path, modules[module_name][1], mtime, size, digest, names)
+        names_by_module[module_name] = names
+    if tasks or len(imports_cache.entries) != len(modules):
+        imports_cache.save({file_path for file_path, _ in modules.values()})
+
+    dependencies = {}
+    for module_name, names in names_by_module.items():
+        for name in names:
+            imported = resolve_import(name, modules)
+            if imported is not None and imported != module_name:
+                dependencies[module_name, imported] = dependencies.get((module_name, imported), 0) + 1
+    return sorted(modules), dependencies
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""
+Isolation module.
+
+Contains the pool of worker processes running isolated plugins.
+Plugins and data are pickled and sent to a worker through a pipe,
+and the provided data or the checker result are sent back. Matrices
+placed in shared memory are sent as handles, and attached by workers.
+Workers limit their address space and the CPU time of each plugin
+with the ``resource`` module, where available.
+
+When a worker dies, because of a crash or an exceeded limit, or does not
+answer before the timeout, it is killed and replaced, and the error is
+raised in the analysis process, to be reported as a result.
+"""
+
+import multiprocessing
+import signal
+from types import ModuleType
+from typing import Optional
+
+from .dsm import SharedMatrixHandle
+from .errors import PluginCrashError, PluginTimeoutError
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+resource: Optional[ModuleType]
+try:
+    import resource  # noqa: WPS440 (optional module)
+except ImportError:  # not available on Windows
+    resource = None
+
+MEBIBYTE = 1024 * 1024
+
+
+def set_memory_limit(memory_limit):
+    """
+    Limit the address space of the current process.
+
+    Args:
+        memory_limit (int): the limit in mebibytes.
+    """
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit * MEBIBYTE, hard))
+
+
+def set_cpu_limit(cpu_limit):
+    """
+    Limit the CPU time of the current process, from now on.
+
+    The limit of a process is on its total CPU time: the time already
+    used is added to the given limit, so it can be set again for each plugin.
+
+    Args:
+        cpu_limit (float): the limit in seconds.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_limit) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def worker_main(connection, memory_limit=None, cpu_limit=None):
+    """
+    Run plugins received from a connection until it is closed.
+
+    Args:
+        connection (multiprocessing.connection.Connection): the worker's end of the pipe.
+        memory_limit (int): the memory limit in mebibytes, or None.
+        cpu_limit (float): the CPU time limit of each plugin in seconds, or None.
+    """
+    # interruptions are handled by the analysis process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit and resource is not None:
+        set_memory_limit(memory_limit)
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        kind, plugin, data = task
+        if cpu_limit and resource is not None:
+            set_cpu_limit(cpu_limit)
+        try:
+            if kind == "provider":
+                plugin.run()
+                output = plugin.data
+            else:
+                if isinstance(data, SharedMatrixHandle):
+                    data = data.attach()
+                plugin.run(data)
+                output = plugin.result
+        except BaseException as error:  # noqa: WPS424 (any error is reported, including MemoryError)
+            connection.send((False, "%s: %s" % (type(error).__name__, error)))
+            continue
+        finally:
+            if hasattr(data, "detach"):
+                data.detach()
+            data = None  # noqa: WPS440 (release the data before waiting for the next task)
+        try:
+            connection.send((True, output))
+        except Exception as error:  # noqa: W0703 (unpicklable output)
+            connection.send((False, "cannot send the output of the plugin: %s" % error))
+
+
+def describe_exit(exitcode):
+    """
+    Return a description of the exit code of a worker.
+
+    Args:
+        exitcode (int): the exit code, negative for a signal.
+
+    Returns:
+        str: the description.
+    """
+    if exitcode is not None and exitcode < 0:
+        try:
+            name = signal.Signals(-exitcode).name
+        except ValueError:
+            name = "signal %d" % -exitcode
+        if name == "SIGXCPU":
+            return "worker killed by %s (CPU time limit exceeded)" % name
+        return "worker killed by %s" % name
+    return "worker exited with code %s" % exitcode
+
+
+class PluginWorker(object):
+    """A worker process running plugins, one at a time."""
+
+    def __init__(self, context, memory_limit=None, cpu_limit=None):
+        """
+        Initialization method.
+
+        Args:
+            context (multiprocessing.context.BaseContext): the multiprocessing context.
+            memory_limit (int): the memory limit in mebibytes, or None.
+            cpu_limit (float): the CPU time limit of each plugin in seconds, or None.
+        """
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=worker_main, args=(child_connection, memory_limit, cpu_limit), name="archan-worker", daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+
+    def call(self, kind, plugin, data=None, timeout=None):
+        """
+        Run a plugin in the worker.
+
+        Args:
+            kind (str): "provider" or "checker".
+            plugin (Provider/Checker): the plugin.
+            data (DSM/DMM/MDM/SharedMatrixHandle): the data to check.
+            timeout (float): maximum time to wait for the plugin, in seconds.
+
+        Returns:
+            obj: the provided data, or the checker result.
+
+        Raises:
+            PluginCrashError: when the plugin raised an error, or the worker died.
+            PluginTimeoutError: when the timeout expired. The worker is then killed.
+        """
+        try:
+            self.connection.send((kind, plugin, data))
+        except (OSError, EOFError):
+            self.close()
+            raise PluginCrashError(describe_exit(self.process.exitcode))
+        except Exception as error:  # noqa: W0703 (unpicklable plugin or data, nothing was sent)
+            raise PluginCrashError("cannot send the plugin to a worker: %s" % error)
+        if not self.connection.poll(timeout):
+            self.close()
+            raise PluginTimeoutError(timeout)
+        try:
+            success, output = self.connection.recv()
+        except EOFError:
+            self.process.join()
+            self.close()
+            raise PluginCrashError(describe_exit(self.process.exitcode))
+        if not success:
+            raise PluginCrashError(output)
+        return output
+
+    @property
+    def alive(self):
+        """Tell if the worker can run plugins."""
+        return not self.connection.closed and self.process.is_alive()
+
+    def close(self):
+        """Stop the worker, killing it if it is busy."""
+        if not self.connection.closed:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.connection.close()
+        self.process.join()
+
+
+class WorkerPool(object):
+    """
+    Pool of worker processes running isolated plugins.
+
+    Workers are started when needed, reused for the next plugins,
+    and replaced when they die.
+    """
+
+    def __init__(self, memory_limit=None, cpu_limit=None, context=None):
+        """
+        Initialization method.
+
+        Args:
+            memory_limit (int): the memory limit of each worker in mebibytes, or None.
+            cpu_limit (float): the CPU time limit of each plugin in seconds, or None.
+            context (multiprocessing.context.BaseContext): the multiprocessing context, the default one if None.
+        """
+        if resource is None and (memory_limit or cpu_limit):
+            logger.warning("Resource limits are not supported on this platform, ignoring them")
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.context = context or multiprocessing.get_context()
+        self._idle = []
+
+    def call(self, kind, plugin, data=None, timeout=None):
+        """
+        Run a plugin in an idle worker.
+
+        Args:
+            kind (str): "provider" or "checker".
+            plugin (Provider/Checker): the plugin.
+            data (DSM/DMM/MDM): the data to check.
+            timeout (float): maximum time to wait for the plugin, in seconds.
+
+        Returns:
+            obj: the provided data, or the checker result.
+        """
+        worker = self._idle.pop() if self._idle else PluginWorker(self.context, self.memory_limit, self.cpu_limit)
+        try:
+            return worker.call(kind, plugin, data, timeout)
+        finally:
+            if worker.alive:
+                self._idle.append(worker)
+
+    def run_provider(self, provider, timeout=None):
+        """
+        Run a provider in a worker, and store its data.
+
+        Args:
+            provider (Provider): the provider.
+            timeout (float): maximum time to wait for the provider, in seconds.
+        """
+        provider.data = self.call("provider", provider, timeout=timeout)
+
+    def run_checker(self, checker, data, timeout=None):
+        """
+        Run a checker in a worker, and store its result.
+
+        Args:
+            checker (Checker): the checker.
+            data (DSM/DMM/MDM/SharedMatrixHandle): the data to check.
+            timeout (float): maximum time to wait for the checker, in seconds.
+        """
+        checker.result = self.call("checker", checker, data, timeout)
+
+    def close(self):
+        """Stop the idle workers."""
+        while self._idle:
+            worker = self._idle.pop()
+            try:
+                worker.connection.send(None)
+            except OSError:
+                pass
+            worker.process.join(1)
+            worker.close()
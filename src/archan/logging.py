@@ -1,19 +1,32 @@
 # -*- coding: utf-8 -*-
 
-"""Logging module."""
+"""
+Logging module.
+
+Every logger returned by ``Logger.get_logger`` shares the same handlers:
+a colorizing stream handler by default, optionally a JSON-lines sink.
+In worker processes, records can be sent through a queue to the main
+process instead, where a listener passes them to the shared handlers.
+
+Messages must be given as templates with arguments, like
+``logger.debug("Entities = %s", entities)``: arguments are only
+formatted when a record is emitted.
+"""
 
 from __future__ import absolute_import
 
+import json
 import logging
-from typing import Dict
+from typing import Dict, List
 
-from colorama import Back, Fore, Style
+DEFAULT_FORMAT = ":%(lineno)d: %(message)s"
 
 
 class Logger(object):
-    """Static class to store loggers."""
+    """Static class to store loggers and their shared handlers."""
 
     loggers: Dict[str, logging.Logger] = {}
+    handlers: List[logging.Handler] = []
     level = None
 
     @staticmethod
@@ -29,14 +42,15 @@ class Logger(object):
             logger.setLevel(level)
 
     @staticmethod
-    def get_logger(name, level=None, fmt=":%(lineno)d: %(message)s"):
+    def get_logger(name, level=None, fmt=DEFAULT_FORMAT):
         """
         Return a logger.
 
         Args:
             name (str): name to pass to the logging module.
             level (int): level of logging.
-            fmt (str): format string.
+            fmt (str): format string, appended to the logger name.
+                Loggers with the default format share the same handlers.
 
         Returns:
             logging.Logger: logger from ``logging.getLogger``.
@@ -49,29 +63,142 @@ class Logger(object):
             elif level is None:
                 level = Logger.level
             logger = logging.getLogger(name)
-            logger_handler = logging.StreamHandler()
-            logger_handler.setFormatter(LoggingFormatter(fmt=name + fmt))
-            logger.addHandler(logger_handler)
+            if fmt == DEFAULT_FORMAT:
+                for handler in Logger.get_handlers():
+                    logger.addHandler(handler)
+            else:
+                logger_handler = logging.StreamHandler()
+                logger_handler.setFormatter(LoggingFormatter(fmt=name + fmt))
+                logger.addHandler(logger_handler)
             logger.setLevel(level)
             Logger.loggers[name] = logger
         return Logger.loggers[name]
 
+    @staticmethod
+    def get_handlers():
+        """
+        Return the handlers shared by the loggers, creating the default one if needed.
+
+        Returns:
+            list of logging.Handler: the shared handlers.
+        """
+        if not Logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(LoggingFormatter(fmt="%(name)s" + DEFAULT_FORMAT))
+            Logger.handlers.append(handler)
+        return Logger.handlers
+
+    @staticmethod
+    def set_handlers(handlers):
+        """
+        Replace the handlers shared by the loggers.
+
+        Args:
+            handlers (list of logging.Handler): the new handlers.
+        """
+        old_handlers = list(Logger.handlers)
+        for logger in Logger.loggers.values():
+            for old_handler in old_handlers:
+                logger.removeHandler(old_handler)
+            for handler in handlers:
+                logger.addHandler(handler)
+        Logger.handlers[:] = handlers
+
+    @staticmethod
+    def add_json_sink(path):
+        """
+        Also write records as JSON lines to a file.
+
+        Args:
+            path (str): path to the file, records are appended to it.
+
+        Returns:
+            logging.Handler: the added handler.
+        """
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(JSONLinesFormatter())
+        Logger.set_handlers(Logger.get_handlers() + [handler])
+        return handler
+
+    @staticmethod
+    def enable_queue(queue):
+        """
+        Send records to a queue instead of the shared handlers.
+
+        To use in worker processes, the main process listening
+        to the same queue with ``Logger.listen``.
+
+        Args:
+            queue (multiprocessing.Queue): the queue.
+        """
+        from logging.handlers import QueueHandler  # noqa: WPS433 (costly import, done only when needed)
+
+        Logger.set_handlers([QueueHandler(queue)])
+
+    @staticmethod
+    def listen(queue):
+        """
+        Start passing the records received from a queue to the shared handlers.
+
+        Args:
+            queue (multiprocessing.Queue): the queue.
+
+        Returns:
+            logging.handlers.QueueListener: the started listener, to stop when workers are done.
+        """
+        from logging.handlers import QueueListener  # noqa: WPS433 (costly import, done only when needed)
+
+        listener = QueueListener(queue, *Logger.get_handlers(), respect_handler_level=True)
+        listener.start()
+        return listener
+
 
 class LoggingFormatter(logging.Formatter):
     """Custom logging formatter."""
 
+    _badges = None
+
     def format(self, record):
         """Override default format method."""
-        if record.levelno == logging.DEBUG:
-            string = Back.WHITE + Fore.BLACK + " debug "
-        elif record.levelno == logging.INFO:
-            string = Back.BLUE + Fore.WHITE + " info "
-        elif record.levelno == logging.WARNING:
-            string = Back.YELLOW + Fore.BLACK + " warning "
-        elif record.levelno == logging.ERROR:
-            string = Back.RED + Fore.WHITE + " error "
-        elif record.levelno == logging.CRITICAL:
-            string = Back.BLACK + Fore.WHITE + " critical "
-        else:
-            string = ""
-        return "{none}{string}{none} {super}".format(none=Style.RESET_ALL, string=string, super=super().format(record))
+        if LoggingFormatter._badges is None:
+            from colorama import Back, Fore, Style  # noqa: WPS433 (costly import, done only when needed)
+
+            LoggingFormatter._badges = {
+                level: "{none}{badge}{none} ".format(none=Style.RESET_ALL, badge=badge)
+                for level, badge in (
+                    (logging.DEBUG, Back.WHITE + Fore.BLACK + " debug "),
+                    (logging.INFO, Back.BLUE + Fore.WHITE + " info "),
+                    (logging.WARNING, Back.YELLOW + Fore.BLACK + " warning "),
+                    (logging.ERROR, Back.RED + Fore.WHITE + " error "),
+                    (logging.CRITICAL, Back.BLACK + Fore.WHITE + " critical "),
+                )
+            }
+            LoggingFormatter._badges[None] = "{none}{none} ".format(none=Style.RESET_ALL)
+        badge = LoggingFormatter._badges.get(record.levelno) or LoggingFormatter._badges[None]
+        return badge + super().format(record)
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formatter of records as JSON objects, one per line."""
+
+    def format(self, record):
+        """
+        Format a record as a JSON object.
+
+        Args:
+            record (logging.LogRecord): the record.
+
+        Returns:
+            str: the JSON object, on one line.
+        """
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+Output module.
+
+Contains the TapWriter class, a buffered writer of TAP version 13 streams.
+"""
+
+import sys
+from json.encoder import encode_basestring
+
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+
+def yaml_string(text):
+    """
+    Return a text as a double-quoted YAML scalar.
+
+    JSON strings are valid double-quoted YAML scalars.
+
+    Args:
+        text (str): the text.
+
+    Returns:
+        str: the quoted text.
+    """
+    return encode_basestring(text)
+
+
+class TapWriter(object):
+    """
+    Buffered writer of TAP version 13 streams.
+
+    Test lines are numbered across test suites, each suite being announced
+    by a comment, and the plan is written at the end. Diagnostics of
+    failed tests are written as YAML blocks, one line per message.
+    The number of messages per test can be limited: the remaining
+    messages are then counted, and written to a side file if given.
+    """
+
+    def __init__(self, stream=None, max_messages=None, diagnostics_file=None, buffer_size=65536):
+        """
+        Initialization method.
+
+        Args:
+            stream (file): the stream to write to, standard output by default.
+            max_messages (int): maximum number of messages written per test, or None.
+            diagnostics_file (str): path to a file receiving the complete
+                messages of tests with more than ``max_messages`` messages.
+            buffer_size (int): number of characters buffered before writing to the stream.
+        """
+        self.stream = stream or sys.stdout
+        self.max_messages = max_messages
+        self.diagnostics_file = diagnostics_file
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._suite = None
+        self._buffer = []
+        self._buffered = 0
+        self._side_stream = None
+        self.write("TAP version 13\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # no plan: consumers will see the stream is incomplete
+            self.flush()
+            if self._side_stream is not None:
+                self._side_stream.close()
+
+    def write(self, text):
+        """
+        Write text through the buffer.
+
+        Args:
+            text (str): the text.
+        """
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffer to the stream."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+    def suite(self, name):
+        """
+        Announce the test suite of the next tests, if it changed.
+
+        Args:
+            name (str): the name of the suite.
+        """
+        if name != self._suite:
+            self._suite = name
+            self.write("# TAP results for %s\n" % name)
+
+    def ok(self, description, directive=""):
+        """
+        Write a passed test.
+
+        Args:
+            description (str): the description of the test.
+            directive (str): an optional directive, like "SKIP reason".
+        """
+        self._test_line("ok", description, directive)
+
+    def not_ok(self, description, directive="", messages=(), hint=""):
+        """
+        Write a failed test, with its diagnostics.
+
+        Args:
+            description (str): the description of the test.
+            directive (str): an optional directive, like "TODO reason".
+            messages (sequence of Message): the messages.
+            hint (str): a hint to fix the failure.
+        """
+        self._test_line("not ok", description, directive)
+        if not messages and not hint:
+            return
+        write = self.write
+        write("  ---\n")
+        if messages:
+            write("  messages:\n")
+            shown = messages
+            if self.max_messages is not None and len(messages) > self.max_messages:
+                shown = messages[: self.max_messages]
+            # one write per result, messages are formatted only here
+            write(
+                "".join(
+                    [
+                        "    - %s\n" % encode_basestring(template % args if args else template)
+                        for template, args, _, _ in shown  # noqa: WPS405 (unpacking is faster than attributes)
+                    ]
+                )
+            )
+            if len(shown) < len(messages):
+                self._truncate(description, messages, len(shown))
+        if hint:
+            write("  hint: %s\n" % yaml_string(" ".join(hint.split())))
+        write("  ...\n")
+
+    def close(self):
+        """Write the plan, flush the buffer and close the side file."""
+        self.write("1..%d\n" % self.count)
+        self.flush()
+        self.stream.flush()
+        if self._side_stream is not None:
+            self._side_stream.close()
+            self._side_stream = None
+
+    def _test_line(self, status, description, directive):
+        self.count += 1
+        description = description.replace("\n", " ").replace("#", "\\#")
+        if directive:
+            self.write("%s %d %s # %s\n" % (status, self.count, description, directive))
+        else:
+            self.write("%s %d %s\n" % (status, self.count, description))
+
+    def _truncate(self, description, messages, written):
+        self.write("  truncated: %d\n" % (len(messages) - written))
+        if not self.diagnostics_file:
+            return
+        if self._side_stream is None:
+            self._side_stream = open(self.diagnostics_file, "w")  # noqa: WPS515 (closed in close)
+        self._side_stream.write("# %d %s\n" % (self.count, description))
+        self._side_stream.writelines(str(message) + "\n" for message in messages)
+        self.write("  diagnostics: %s\n" % yaml_string(self.diagnostics_file))
@@ -2,12 +2,17 @@
 
 """Plugins submodule."""
 
+import inspect
+import os
+import pickle  # noqa: S403 (only reading our own spill files)
 from collections import namedtuple
 from typing import Sequence
 
 from ..enums import ResultCode
+from ..errors import PluginTimeoutError
 from ..logging import Logger
 from ..printing import PrintableArgumentMixin, PrintableNameMixin, PrintablePluginMixin
+from ..timeouts import call_with_timeout
 
 logger = Logger.get_logger(__name__)
 
@@ -34,6 +39,62 @@ class Argument(PrintableArgumentMixin):
         return "  %s (%s, default %s): %s" % (self.name, self.cls, self.default, self.description)
 
 
+class Message(namedtuple("Message", "template args source target")):
+    """
+    A message of a checker result, such as a violation.
+
+    The text is formatted only when needed, from a template shared between
+    messages and the tuple of its arguments, so checkers can cheaply return
+    a large number of messages. The entities concerned by the message,
+    if any, are stored as source and target.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def text(self):
+        """Return the formatted text of the message."""
+        return self.template % self.args if self.args else self.template
+
+    def as_dict(self):
+        """
+        Return the message as JSON-serializable values.
+
+        Returns:
+            dict: the text, source and target of the message.
+        """
+        return {"text": self.text, "source": self.source, "target": self.target}
+
+
+# defaults for args, source and target (the defaults parameter of namedtuple needs Python 3.7)
+Message.__new__.__defaults__ = ((), None, None)
+
+CheckerResult = namedtuple("CheckerResult", "code messages")
+
+
+def normalize_messages(messages):
+    """
+    Return messages as a tuple of Message instances.
+
+    Args:
+        messages (str/Message/iterable): a string (one message per line),
+            a message, or an iterable of strings and messages.
+
+    Returns:
+        tuple of Message: the messages.
+    """
+    if not messages:
+        return ()
+    elif isinstance(messages, str):
+        return tuple(Message(line) for line in messages.split("\n") if line)
+    elif isinstance(messages, Message):
+        return (messages,)
+    return tuple(message if isinstance(message, Message) else Message(str(message)) for message in messages)
+
+
 # TODO: also add some "expect" attribute to describe the expected data format
 class Checker(PrintableNameMixin, PrintablePluginMixin):
     """
@@ -48,16 +109,37 @@ class Checker(PrintableNameMixin, PrintablePluginMixin):
     description = ""
     hint = ""
     argument_list: Sequence[Argument] = ()
+    timeout = None
+    priority = 0
+    cost: float = 1.0
+    isolate = False
 
     Code = ResultCode
 
-    def __init__(self, name=None, description=None, hint=None, allow_failure=False, passes=None, arguments=None):
+    def __init__(  # noqa: WPS211 (plugins are configured with keyword arguments)
+        self,
+        name=None,
+        description=None,
+        hint=None,
+        allow_failure=False,
+        passes=None,
+        arguments=None,
+        timeout=None,
+        priority=None,
+        cost=None,
+        isolate=None,
+    ):
         """
         Initialization method.
 
         Args:
             allow_failure (bool): still pass if failed or not.
             arguments (dict): arguments passed to the check method when run.
+            timeout (float): maximum time of the check method in seconds.
+            priority (int): checkers with higher priorities run first in fail-fast mode.
+            cost (float): relative cost of the check method, cheaper checkers
+                run first in fail-fast mode, for a same priority.
+            isolate (bool): whether to run the checker in a worker process.
         """
         if name:
             self.name = name
@@ -69,6 +151,17 @@ class Checker(PrintableNameMixin, PrintablePluginMixin):
         self.allow_failure = allow_failure
         self.passes = passes
         self.arguments = arguments or {}
+        if timeout is not None:
+            self.timeout = timeout
+        if priority is not None:
+            self.priority = priority
+        if cost is not None:
+            self.cost = cost
+        elif passes is not None:
+            # no-data checkers do not run anything
+            self.cost = 0
+        if isolate is not None:
+            self.isolate = isolate
         self.result = None
 
     def check(self, data, **kwargs):
@@ -81,45 +174,53 @@ class Checker(PrintableNameMixin, PrintablePluginMixin):
 
         Returns:
             obj: Checker constant or object with a ``__bool__`` method.
-            tuple (obj, str): obj as before and string of messages
+            tuple (obj, messages): obj as before, and messages as a string
+            (one message per line), or an iterable of strings or Message instances.
         """
         raise NotImplementedError
 
-    def run(self, data):
+    def run(self, data, timeout=None):
         """
         Run the check method and format the result for analysis.
 
+        A check method running for longer than the timeout is interrupted,
+        and the result has the ``TIMEOUT`` code.
+
         Args:
             data (DSM/DMM/MDM): DSM/DMM/MDM instance to check.
+            timeout (float): maximum time of the check method in seconds,
+                the checker's own timeout by default.
 
         Returns:
-            tuple (int, str): status constant from Checker class and messages.
+            CheckerResult: status constant from Checker class and tuple of messages.
         """
-        result_type = namedtuple("Result", "code messages")
-
         if self.passes is True:
-            result = result_type(Checker.Code.PASSED, "")
+            result = CheckerResult(Checker.Code.PASSED, ())
         elif self.passes is False:
             if self.allow_failure:
-                result = result_type(Checker.Code.IGNORED, "")
+                result = CheckerResult(Checker.Code.IGNORED, ())
             else:
-                result = result_type(Checker.Code.FAILED, "")
+                result = CheckerResult(Checker.Code.FAILED, ())
         else:
+            timeout = timeout if timeout is not None else self.timeout
             try:
-                result = self.check(data, **self.arguments)
-                messages = ""
+                result = call_with_timeout(self.check, timeout, data, **self.arguments)
+                messages = ()
                 if isinstance(result, tuple):
                     result, messages = result
 
-                if result not in Checker.Code:
+                if isinstance(result, bool) or result not in Checker.Code:
                     result = Checker.Code.PASSED if bool(result) else Checker.Code.FAILED
 
                 if result == Checker.Code.FAILED and self.allow_failure:
                     result = Checker.Code.IGNORED
 
-                result = result_type(result, messages)
+                result = CheckerResult(result, normalize_messages(messages))
             except NotImplementedError:
-                result = result_type(Checker.Code.NOT_IMPLEMENTED, "")
+                result = CheckerResult(Checker.Code.NOT_IMPLEMENTED, ())
+            except PluginTimeoutError as error:
+                logger.warning("Checker %s %s", self.identifier or self.name, error)
+                result = CheckerResult(Checker.Code.TIMEOUT, (Message("Timed out after %gs", (error.timeout,)),))
         self.result = result
 
 
@@ -129,19 +230,38 @@ class Provider(PrintableNameMixin, PrintablePluginMixin):
 
     An instance of provider implements a get_data method that returns an
     instance of DSM/DMM/MDM to be checked by an instance of Checker.
+
+    Providers listing in ``path_arguments`` their arguments that are paths
+    to input files or directories can have their data cached, until their
+    arguments or inputs change.
+
+    The get_data method can also be a coroutine function (``async def``),
+    for providers waiting on files or subprocesses: the analysis then runs
+    such providers concurrently, on one event loop.
     """
 
     identifier = ""
     name = ""
     description = ""
-    argument_list = ()
+    argument_list: Sequence[Argument] = ()
+    path_arguments: Sequence[str] = ()
+    timeout = None
+    isolate = False
+    cache = False
+
+    _data = None
+    _spill_file = None
 
-    def __init__(self, name=None, description=None, arguments=None):
+    def __init__(self, name=None, description=None, arguments=None, timeout=None, isolate=None, cache=None):
         """
         Initialization method.
 
         Args:
             arguments (dict): arguments that will be used for get_data method.
+            timeout (float): maximum time of the get_data method in seconds.
+            isolate (bool): whether to run the provider in a worker process.
+            cache (bool/str): whether to cache the provided data, keyed on the modification
+                time and size of the input files, or on the hash of their contents with "hash".
         """
         if name:
             self.name = name
@@ -149,12 +269,115 @@ class Provider(PrintableNameMixin, PrintablePluginMixin):
             self.description = description
 
         self.arguments = arguments or {}
+        if timeout is not None:
+            self.timeout = timeout
+        if isolate is not None:
+            self.isolate = isolate
+        if cache is not None:
+            self.cache = cache
         self.data = None
 
+    @property
+    def data(self):
+        """Return the provided data, reloading them if they were spilled to disk."""
+        if self._data is None and self._spill_file is not None:
+            logger.debug("Reload data of provider %s from %s", self.identifier, self._spill_file)
+            with open(self._spill_file, "rb") as stream:
+                self._data = pickle.load(stream)  # noqa: S301 (only reading our own spill files)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._spill_file = None
+
     def get_data(self, **kwargs):
         """Abstract method. Return instance of DSM/DMM/MDM."""
         raise NotImplementedError
 
-    def run(self):
-        """Run the get_data method with run arguments, store the result."""
-        self.data = self.get_data(**self.arguments)
+    @property
+    def is_async(self):
+        """Tell if the get_data method is a coroutine function."""
+        return inspect.iscoroutinefunction(self.get_data)
+
+    def run(self, timeout=None):
+        """
+        Run the get_data method with run arguments, store the result.
+
+        A coroutine get_data method is run in a new event loop.
+
+        Args:
+            timeout (float): maximum time of the get_data method in seconds,
+                the provider's own timeout by default.
+
+        Raises:
+            PluginTimeoutError: when the get_data method timed out.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        if self.is_async:
+            import asyncio  # noqa: WPS433 (costly import, done only when needed)
+
+            loop = asyncio.new_event_loop()
+            try:
+                self.data = loop.run_until_complete(self._await_data(timeout))
+            finally:
+                loop.close()
+        else:
+            self.data = call_with_timeout(self.get_data, timeout, **self.arguments)
+
+    async def run_async(self, timeout=None, executor=None):
+        """
+        Run the get_data method with run arguments in the running event loop, store the result.
+
+        A synchronous get_data method is run in a thread of the executor.
+        The thread of a synchronous method that timed out cannot be stopped:
+        its result is ignored.
+
+        Args:
+            timeout (float): maximum time of the get_data method in seconds,
+                the provider's own timeout by default.
+            executor (concurrent.futures.Executor): the executor running synchronous
+                get_data methods, the loop's default executor if None.
+
+        Raises:
+            PluginTimeoutError: when the get_data method timed out.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        if self.is_async:
+            self.data = await self._await_data(timeout)
+        else:
+            import asyncio  # noqa: WPS433 (costly import, done only when needed)
+            import functools  # noqa: WPS433 (costly import, done only when needed)
+
+            function = functools.partial(call_with_timeout, self.get_data, timeout, **self.arguments)
+            self.data = await asyncio.get_event_loop().run_in_executor(executor, function)
+
+    async def _await_data(self, timeout):
+        import asyncio  # noqa: WPS433 (costly import, done only when needed)
+
+        if timeout is not None and timeout <= 0:
+            raise PluginTimeoutError(0)
+        try:
+            return await asyncio.wait_for(self.get_data(**self.arguments), timeout)
+        except asyncio.TimeoutError:
+            raise PluginTimeoutError(timeout)
+
+    def release(self, spill_dir=None):
+        """
+        Release the provided data, to free memory once every checker used them.
+
+        Args:
+            spill_dir (str): if set, data are first pickled in this directory,
+                and reloaded the next time they are accessed.
+        """
+        if self._data is None:
+            return
+        if spill_dir is not None:
+            spill_file = os.path.join(spill_dir, "%s-%x.pickle" % (self.identifier or "provider", id(self)))
+            with open(spill_file, "wb") as stream:
+                pickle.dump(self._data, stream, protocol=pickle.HIGHEST_PROTOCOL)
+            logger.debug("Spilled data of provider %s to %s", self.identifier, spill_file)
+            self._data = None
+            self._spill_file = spill_file
+        else:
+            self.data = None
@@ -4,7 +4,7 @@
 
 from ..errors import DesignStructureMatrixError
 from ..logging import Logger
-from . import Argument, Checker
+from . import Argument, Checker, Message
 
 logger = Logger.get_logger(__name__)
 
@@ -25,6 +25,7 @@ class CompleteMediation(Checker):
     authority check be examined skeptically. If a change in authority occurs,
     such remembered results must be systematically updated."""
     hint = "Remove the dependencies or deviate them through a broker module."
+    cost = 5
 
     @staticmethod
     def generate_mediation_matrix(dsm):
@@ -130,7 +131,7 @@ class CompleteMediation(Checker):
             complete_mediation_matrix (list of list of int): 2-dim array
 
         Returns:
-            bool: True if compliant, else False
+            bool, list of Message: True if compliant, else False, and the untolerated dependencies.
         """
         matrix = dsm.data
         rows_dep_matrix = len(matrix)
@@ -141,23 +142,24 @@ class CompleteMediation(Checker):
         if rows_dep_matrix != rows_med_matrix or cols_dep_matrix != cols_med_matrix:
             raise DesignStructureMatrixError("Matrices are NOT compliant " "(number of rows/columns not equal)")
 
-        discrepancy_found = False
-        message = []
+        template = "Untolerated dependency at %s:%s (%s:%s): %s instead of %s"
+        messages = []
+        entities = dsm.entities
         for i in range(0, rows_dep_matrix):
             for j in range(0, cols_dep_matrix):
                 if (complete_mediation_matrix[i][j] == 0 and matrix[i][j] > 0) or (
                     complete_mediation_matrix[i][j] == 1 and matrix[i][j] < 1
                 ):
-                    discrepancy_found = True
-                    message.append(
-                        "Untolerated dependency at %s:%s (%s:%s): "
-                        "%s instead of %s"
-                        % (i, j, dsm.entities[i], dsm.entities[j], matrix[i][j], complete_mediation_matrix[i][j])
+                    messages.append(
+                        Message(
+                            template,
+                            (i, j, entities[i], entities[j], matrix[i][j], complete_mediation_matrix[i][j]),
+                            entities[i],
+                            entities[j],
+                        )
                     )
 
-        message = "\n".join(message)
-
-        return not discrepancy_found, message
+        return not messages, messages
 
     def check(self, dsm, **kwargs):
         """
@@ -223,7 +225,7 @@ class EconomyOfMechanism(Checker):
         """
         # economy_of_mechanism
         economy_of_mechanism = False
-        message = ""
+        message = ()
         data = dsm.data
         categories = dsm.categories
         dsm_size = dsm.size[0]
@@ -245,12 +247,9 @@ class EconomyOfMechanism(Checker):
         if dependency_number < dsm_size * simplicity_factor:
             economy_of_mechanism = True
         else:
-            message = " ".join(
-                [
-                    "Number of dependencies (%s)" % dependency_number,
-                    "> number of rows (%s)" % dsm_size,
-                    "* simplicity factor (%s) = %s" % (simplicity_factor, dsm_size * simplicity_factor),
-                ]
+            message = Message(
+                "Number of dependencies (%s) > number of rows (%s) * simplicity factor (%s) = %s",
+                (dependency_number, dsm_size, simplicity_factor, dsm_size * simplicity_factor),
             )
         return economy_of_mechanism, message
 
@@ -276,6 +275,7 @@ class SeparationOfPrivileges(Checker):
     systems providing user-extendible protected data types usually depend on
     separation of privilege for their implementation."""
     # TODO: add hint
+    cost = 0
 
     def check(self, dsm, **kwargs):
         """TODO: To implement."""
@@ -300,6 +300,7 @@ class LeastPrivileges(Checker):
     where to install the firewalls. The military security rule of
     "need-to-know" is an example of this principle."""
     # TODO: add hint
+    cost = 0
 
     def check(self, dsm, **kwargs):
         """TODO: To implement."""
@@ -353,7 +354,7 @@ class LeastCommonMechanism(Checker):
         """
         # leastCommonMechanismMatrix
         least_common_mechanism = False
-        message = ""
+        message = ()
         # get the list of dependent modules for each module
         data = dsm.data
         categories = dsm.categories
@@ -380,12 +381,11 @@ class LeastCommonMechanism(Checker):
             least_common_mechanism = True
         else:
             maximum = max(dependent_module_number)
-            message = "Dependencies to %s (%s) > matrix size (%s) / " "independence factor (%s) = %s" % (
-                dsm.entities[dependent_module_number.index(maximum)],
-                maximum,
-                dsm_size,
-                independence_factor,
-                dsm_size / independence_factor,
+            entity = dsm.entities[dependent_module_number.index(maximum)]
+            message = Message(
+                "Dependencies to %s (%s) > matrix size (%s) / independence factor (%s) = %s",
+                (entity, maximum, dsm_size, independence_factor, dsm_size / independence_factor),
+                target=entity,
             )
 
         return least_common_mechanism, message
@@ -411,6 +411,7 @@ class LayeredArchitecture(Checker):
     hint = (
         "Ensure that your applications are listed in the right " "order when building the DSM, or remove dependencies."
     )
+    cost = 2
 
     def check(self, dsm, **kwargs):
         """
@@ -420,7 +421,7 @@ class LayeredArchitecture(Checker):
             dsm (:class:`DesignStructureMatrix`): the DSM to check.
 
         Returns:
-            bool, str: True if layered architecture else False, messages
+            bool, list of Message: True if layered architecture else False, messages
         """
         layered_architecture = True
         messages = []
@@ -440,11 +441,15 @@ class LayeredArchitecture(Checker):
                     if dsm.data[i][j] > 0:
                         layered_architecture = False
                         messages.append(
-                            "Dependency from %s to %s breaks the "
-                            "layered architecture." % (dsm.entities[i], dsm.entities[j])
+                            Message(
+                                "Dependency from %s to %s breaks the layered architecture.",
+                                (dsm.entities[i], dsm.entities[j]),
+                                dsm.entities[i],
+                                dsm.entities[j],
+                            )
                         )
 
-        return layered_architecture, "\n".join(messages)
+        return layered_architecture, messages
 
 
 class CodeClean(Checker):
@@ -464,6 +469,7 @@ class CodeClean(Checker):
     Reduce the number of issues in your code or increase the threshold."""
 
     argument_list = (Argument("threshold", int, "Message number threshold (per module).", default=10),)
+    cost = 0.1
 
     def check(self, dsm, **kwargs):
         """
@@ -473,9 +479,9 @@ class CodeClean(Checker):
             dsm (:class:`DesignStructureMatrix`): the DSM to check.
 
         Returns:
-            bool, str: True if code clean else False, messages
+            bool, list of Message: True if code clean else False, messages
         """
-        logger.debug("Entities = %s" % dsm.entities)
+        logger.debug("Entities = %s", dsm.entities)
         messages = []
         code_clean = True
         threshold = kwargs.pop("threshold", 1)
@@ -483,9 +489,12 @@ class CodeClean(Checker):
         for i in range(0, rows):
             if dsm.data[i][0] > threshold:
                 messages.append(
-                    "Number of issues (%d) in module %s "
-                    "> threshold (%d)" % (dsm.data[i][0], dsm.entities[i], threshold)
+                    Message(
+                        "Number of issues (%d) in module %s > threshold (%d)",
+                        (dsm.data[i][0], dsm.entities[i], threshold),
+                        dsm.entities[i],
+                    )
                 )
                 code_clean = False
 
-        return code_clean, "\n".join(messages)
+        return code_clean, messages
@@ -1,8 +1,25 @@
 # -*- coding: utf-8 -*-
 
-"""Provider module."""
+"""
+Provider module.
 
+CSV files are parsed line by line, each row being stored in a compact
+``array`` of the smallest integer type fitting the whole matrix,
+instead of a list of Python integers. Large files can be parsed
+in parallel, by chunks of lines.
+
+Input files compressed with gzip, bzip2 or xz (lzma) are detected by
+their first bytes, and decompressed while being parsed.
+"""
+
+import importlib
+import itertools
+import locale
+import multiprocessing
+import os
 import sys
+from array import array
+from json import loads as json_loads
 
 from ..dsm import DesignStructureMatrix
 from ..logging import Logger
@@ -10,6 +27,192 @@ from . import Argument, Provider
 
 logger = Logger.get_logger(__name__)
 
+ROW_TYPECODES = ("b", "h", "i", "q")
+COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "lzma"),
+    (b"\x5d\x00\x00", "lzma"),
+)
+
+
+def detect_compression(head):
+    """
+    Return the compression format of data, from its first bytes.
+
+    Args:
+        head (bytes): the first bytes of the data.
+
+    Returns:
+        str: "gzip", "bz2" or "lzma", or None for uncompressed data.
+    """
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def compression_of(file_path):
+    """
+    Return the compression format of a file.
+
+    Args:
+        file_path (str): the path to the file.
+
+    Returns:
+        str: "gzip", "bz2" or "lzma", or None for an uncompressed file.
+    """
+    with open(file_path, "rb") as stream:
+        return detect_compression(stream.read(6))
+
+
+def open_input(file_path, encoding=None):
+    """
+    Open a file, or standard input, as text, decompressing it if needed.
+
+    Args:
+        file_path (str/fd): path to the file, or a text stream like ``sys.stdin``.
+        encoding (str): the encoding of the text, the locale's one by default.
+
+    Returns:
+        io.TextIOBase: the text stream, to close after use unless it is the given stream.
+    """
+    if isinstance(file_path, (str, bytes, os.PathLike)):
+        compression = compression_of(file_path)
+        if compression is None:
+            return open(file_path, encoding=encoding)  # noqa: WPS515 (closed by the caller)
+        logger.debug("Decompress %s data from %s", compression, file_path)
+        source = file_path
+    else:
+        binary = getattr(file_path, "buffer", None)
+        compression = detect_compression(binary.peek(6)[:6]) if hasattr(binary, "peek") else None
+        if compression is None:
+            return file_path
+        # the decompressor does not close the stream it reads
+        source = binary
+    # the modules are named after the formats
+    module = importlib.import_module(compression)
+    return module.open(source, "rt", encoding=encoding)
+
+
+def widen_rows(rows, typecode):
+    """
+    Convert array rows to a common typecode.
+
+    Args:
+        rows (list of array): the rows.
+        typecode (str): the typecode of the rows, at least as wide as the others.
+
+    Returns:
+        list of array: the rows.
+    """
+    return [row if row.typecode == typecode else array(typecode, row) for row in rows]
+
+
+def json_cells(line, delimiter=","):
+    """
+    Parse the cells of a line as a JSON array, the first column being ignored.
+
+    Args:
+        line (str): the line.
+        delimiter (str): character(s) used as delimiter for columns.
+
+    Returns:
+        list: the cells, or None if the line is not a valid JSON array, or has booleans.
+    """
+    values = line.partition(delimiter)[2]
+    if delimiter != ",":
+        values = values.replace(delimiter, ",")
+    if "true" in values or "false" in values:
+        # booleans are integers for arrays, they must be rejected like int does
+        return None
+    try:
+        return json_loads("[%s]" % values)
+    except ValueError:
+        return None
+
+
+def parse_rows(lines, delimiter=",", compact=True):
+    """
+    Parse the rows of a matrix, the first column of each line being ignored.
+
+    Cells are parsed as JSON at C speed, falling back to ``int``
+    for the notations JSON does not support, like leading zeros.
+
+    Args:
+        lines (iterable of str): the lines, consumed one at a time.
+        delimiter (str): character(s) used as delimiter for columns.
+        compact (bool): whether to return rows as arrays instead of lists.
+
+    Returns:
+        list of array/list: the rows. Arrays have the smallest typecode fitting every cell.
+
+    Raises:
+        ValueError: when a cell is not an integer, or does not fit in 64 bits in compact rows.
+    """
+    if not compact:
+        return [list(map(int, line.split(delimiter)[1:])) for line in lines]
+    rows = []
+    typecode_index = 0
+    for line in lines:
+        cells = json_cells(line, delimiter)
+        while True:
+            try:
+                row = array(ROW_TYPECODES[typecode_index], cells)
+            except OverflowError:
+                if typecode_index == len(ROW_TYPECODES) - 1:
+                    raise ValueError("Cells of compact rows must fit in 64-bit integers, use compact: false") from None
+                typecode_index += 1
+            except TypeError:
+                # not JSON, or not only integers: raises ValueError like int does
+                cells = list(map(int, line.split(delimiter)[1:]))
+            else:
+                break
+        rows.append(row)
+    if typecode_index:
+        rows = widen_rows(rows, ROW_TYPECODES[typecode_index])
+    return rows
+
+
+def parse_chunk(task):
+    """
+    Parse the rows of a chunk of a CSV file.
+
+    Args:
+        task (tuple): the file path, the start and end offsets of the chunk, the delimiter and the encoding.
+
+    Returns:
+        list of array: the rows.
+    """
+    file_path, start, end, delimiter, encoding = task
+    with open(file_path, "rb") as stream:
+        stream.seek(start)
+        chunk = stream.read(end - start)
+    return parse_rows(chunk.decode(encoding).splitlines(), delimiter)
+
+
+def chunk_offsets(file_path, start, jobs):
+    """
+    Return the offsets of chunks of lines of a file.
+
+    Args:
+        file_path (str): the path to the file.
+        start (int): the offset of the first line.
+        jobs (int): the number of chunks.
+
+    Returns:
+        list of int: the offsets of the chunks, and of the end of the file.
+    """
+    size = os.path.getsize(file_path)
+    offsets = [start]
+    with open(file_path, "rb") as stream:
+        for index in range(1, jobs):
+            stream.seek(max(start + (size - start) * index // jobs - 1, offsets[-1]))
+            stream.readline()
+            offsets.append(min(stream.tell(), size))
+    offsets.append(size)
+    return offsets
+
 
 class CSVInput(Provider):
     """Provider to read DSM from CSV data."""
@@ -17,13 +220,16 @@ class CSVInput(Provider):
     identifier = "archan.CSVInput"
     name = "CSV Input"
     description = "Parse a CSV file to provide a matrix."
-    arguments = (
+    argument_list = (
         Argument("file_path", str, "Path to the CSV file to parse.", "sys.stdin"),
         Argument("delimiter", str, "Delimiter used in the CSV file.", ","),
         Argument("categories_delimiter", str, "If set, used as delimiter for categories."),
+        Argument("jobs", int, "Number of processes parsing chunks of the file in parallel.", 1),
+        Argument("compact", bool, "Store rows as compact arrays instead of lists of integers.", True),
     )
+    path_arguments = ("file_path",)
 
-    def get_data(self, file_path=sys.stdin, delimiter=",", categories_delimiter=None):
+    def get_data(self, file_path=sys.stdin, delimiter=",", categories_delimiter=None, jobs=1, compact=True):
         """
         Implement get_dsm method from Provider class.
 
@@ -35,25 +241,331 @@ class CSVInput(Provider):
             categories_delimiter (str):
                 character(s) used as delimiter for categories and keys
                 (first column).
+            jobs (int): number of processes parsing chunks of the file in parallel.
+                Standard input and compressed files are always parsed sequentially.
+            compact (bool): whether to store rows as arrays instead of lists.
 
         Returns:
             DSM: instance of DSM.
         """
         if file_path == sys.stdin:
             logger.info("Read data from standard input")
-            lines = [line.replace("\n", "") for line in file_path]
-        else:
-            logger.info("Read data from file " + file_path)
-            with open(file_path) as file:
-                lines = list(file)
-        columns = lines[0].rstrip("\n").split(delimiter)[1:]
+            return self.parse_lines(open_input(file_path), delimiter, categories_delimiter, compact)
+        logger.info("Read data from file %s", file_path)
+        if jobs > 1 and compact:
+            if compression_of(file_path) is None:
+                return self.parse_file_in_parallel(file_path, delimiter, categories_delimiter, jobs)
+            logger.info("Compressed files are parsed sequentially")
+        with open_input(file_path) as file:
+            return self.parse_lines(file, delimiter, categories_delimiter, compact)
+
+    @staticmethod
+    def parse_header(header, delimiter=",", categories_delimiter=None):
+        """
+        Parse the header of a CSV matrix.
+
+        Args:
+            header (str): the first line.
+            delimiter (str): character(s) used as delimiter for columns.
+            categories_delimiter (str): character(s) used as delimiter for categories and keys.
+
+        Returns:
+            tuple: the entities and the categories (None without categories delimiter).
+        """
+        columns = header.rstrip("\r\n").split(delimiter)[1:]
         categories = None
         if categories_delimiter:
             columns, categories = zip(*[c.split(categories_delimiter, 1) for c in columns])
-        size = len(columns)
-        data = [list(map(int, l.split(delimiter)[1:])) for l in lines[1 : size + 1]]
+        return columns, categories
+
+    @staticmethod
+    def parse_lines(lines, delimiter=",", categories_delimiter=None, compact=True):
+        """
+        Parse CSV lines to return an instance of DSM.
+
+        Args:
+            lines (iterable of str): the CSV lines, header included, consumed one at a time.
+            delimiter (str): character(s) used as delimiter for columns.
+            categories_delimiter (str):
+                character(s) used as delimiter for categories and keys
+                (first column).
+            compact (bool): whether to store rows as arrays instead of lists.
+
+        Returns:
+            DSM: instance of DSM.
+        """
+        lines = iter(lines)
+        columns, categories = CSVInput.parse_header(next(lines), delimiter, categories_delimiter)
+        data = parse_rows(itertools.islice(lines, len(columns)), delimiter, compact)
         return DesignStructureMatrix(data, columns, categories)
 
+    @staticmethod
+    def parse_file_in_parallel(file_path, delimiter=",", categories_delimiter=None, jobs=None):
+        """
+        Parse a CSV file by chunks of lines, in parallel.
+
+        Args:
+            file_path (str): path to the CSV file.
+            delimiter (str): character(s) used as delimiter for columns.
+            categories_delimiter (str): character(s) used as delimiter for categories and keys.
+            jobs (int): the number of processes, the number of CPUs by default.
+
+        Returns:
+            DSM: instance of DSM.
+        """
+        # the encoding open uses when parsing sequentially
+        encoding = locale.getpreferredencoding(False)
+        with open(file_path, "rb") as stream:
+            header = stream.readline()
+        columns, categories = CSVInput.parse_header(header.decode(encoding), delimiter, categories_delimiter)
+        offsets = chunk_offsets(file_path, len(header), jobs or os.cpu_count() or 1)
+        tasks = [
+            (file_path, start, end, delimiter, encoding) for start, end in zip(offsets, offsets[1:]) if start < end
+        ]
+        with multiprocessing.Pool(len(tasks) or 1) as pool:
+            chunks = pool.map(parse_chunk, tasks)
+        data = list(itertools.islice(itertools.chain.from_iterable(chunks), len(columns)))
+        if data:
+            typecode = max((row.typecode for row in data), key=ROW_TYPECODES.index)
+            data = widen_rows(data, typecode)
+        return DesignStructureMatrix(data, columns, categories)
+
+
+class EdgeListInput(Provider):
+    """Provider to read DSM from edge lists."""
+
+    identifier = "archan.EdgeListInput"
+    name = "Edge List Input"
+    description = """
+    Parse a file of dependencies, one per line, as source, target and
+    optional weight (1 by default), to provide a matrix. Entities are
+    indexed in order of appearance, unless an entities file lists them,
+    one per line, with their optional category."""
+    argument_list = (
+        Argument("file_path", str, "Path to the edge list file to parse.", "sys.stdin"),
+        Argument("entities_file", str, "Path to the file listing entities and their categories."),
+        Argument("delimiter", str, "Delimiter used in the files.", ","),
+        Argument("header", bool, "Whether the first line of the edge list is a header to skip.", False),
+        Argument(
+            "entities_header", bool, "Whether the first line of the entities file is a header, like the edge list."
+        ),
+    )
+    path_arguments = ("file_path", "entities_file")
+
+    def get_data(self, file_path=sys.stdin, entities_file=None, delimiter=",", header=False, entities_header=None):
+        """
+        Parse an edge list to return an instance of DSM.
+
+        Rows are sources and columns are targets. The weights of repeated
+        edges are summed. Edges are read in one pass, and stored in arrays
+        until the number of entities is known. Lines with an empty source
+        or target are skipped.
+
+        Args:
+            file_path (str/fd): path or file descriptor of the edge list.
+            entities_file (str): path to the file listing entities
+                and their categories, defining their order.
+            delimiter (str): character(s) used as delimiter for columns.
+            header (bool): whether the first line of the edge list is a header to skip.
+            entities_header (bool): whether the first line of the entities file is a header to skip,
+                like the edge list if None.
+
+        Returns:
+            DSM: instance of DSM.
+        """
+        index = {}
+        entities = []
+        categories = []
+        if entities_file:
+            with open_input(entities_file) as stream:
+                if entities_header is None:
+                    entities_header = header
+                self._read_entities(stream, delimiter, entities_header, index, entities, categories)
+        known_entities = len(entities)
+
+        sources, targets, weights = array("l"), array("l"), array("q")
+        if file_path == sys.stdin:
+            logger.info("Read edges from standard input")
+            self._read_edges(open_input(file_path), delimiter, header, index, entities, (sources, targets, weights))
+        else:
+            logger.info("Read edges from file %s", file_path)
+            with open_input(file_path) as stream:
+                self._read_edges(stream, delimiter, header, index, entities, (sources, targets, weights))
+
+        if categories and len(entities) > known_entities:
+            logger.warning(
+                "%d entities are not in the entities file, their category is empty", len(entities) - known_entities
+            )
+            categories.extend([""] * (len(entities) - known_entities))
+        data = self.build_rows(len(entities), sources, targets, weights)
+        return DesignStructureMatrix(data, entities, categories or None)
+
+    @staticmethod
+    def _read_entities(stream, delimiter, header, index, entities, categories):
+        if header:
+            next(stream, None)
+        for line in stream:
+            columns = line.rstrip("\r\n").split(delimiter)
+            if not columns[0]:
+                continue
+            index[columns[0]] = len(entities)
+            entities.append(columns[0])
+            categories.append(columns[1] if len(columns) > 1 else "")
+        if not any(categories):
+            categories.clear()
+
+    @staticmethod
+    def _read_edges(stream, delimiter, header, index, entities, edges):
+        sources, targets, weights = edges
+        if header:
+            next(stream, None)
+        skipped = 0
+        for line in stream:
+            columns = line.rstrip("\r\n").split(delimiter)
+            if len(columns) < 2 or not columns[0] or not columns[1]:
+                skipped += bool(line.strip())
+                continue
+            for entity in columns[:2]:
+                if entity not in index:
+                    index[entity] = len(entities)
+                    entities.append(entity)
+            sources.append(index[columns[0]])
+            targets.append(index[columns[1]])
+            weights.append(int(columns[2]) if len(columns) > 2 and columns[2] else 1)
+        if skipped:
+            logger.warning("Skipped %d lines without source or target", skipped)
+
+    @staticmethod
+    def build_rows(size, sources, targets, weights):
+        """
+        Build the compact rows of a matrix from its edges.
+
+        Args:
+            size (int): the number of entities.
+            sources (array): the row of each edge.
+            targets (array): the column of each edge.
+            weights (array): the weight of each edge.
+
+        Returns:
+            list of array: the rows, with the smallest typecode fitting every cell.
+        """
+        for typecode in ROW_TYPECODES:
+            empty_row = array(typecode, bytes(size * array(typecode).itemsize))
+            rows = [array(typecode, empty_row) for _ in range(size)]
+            try:
+                for source, target, weight in zip(sources, targets, weights):
+                    rows[source][target] += weight
+            except OverflowError:
+                continue
+            return rows
+        raise OverflowError("edge weights are too large")
+
+
+class PythonImports(Provider):
+    """Provider to read DSM from the imports of Python packages."""
+
+    identifier = "archan.PythonImports"
+    name = "Python Imports"
+    description = """
+    Parse the Python modules of packages to provide a matrix of their
+    internal dependencies: the number of imports of each module by each
+    module. Files are parsed in parallel, and their imports are cached
+    until they change."""
+    argument_list = (
+        Argument("packages", list, "Paths to the package directories (or modules) to analyze."),
+        Argument("jobs", int, "Number of processes parsing files in parallel, the number of CPUs by default."),
+        Argument("cache_imports", bool, "Cache the imports of each file until it changes.", True),
+    )
+    path_arguments = ("packages",)
+
+    def get_data(self, packages, jobs=None, cache_imports=True):
+        """
+        Parse the modules of packages to return an instance of DSM.
+
+        Rows are importing modules and columns are imported modules.
+        Relative and absolute imports are resolved to the modules of the
+        given packages, other imports are ignored.
+
+        Args:
+            packages (list of str): paths to the package directories, or to single modules.
+            jobs (int): number of processes parsing files in parallel, the number of CPUs by default.
+            cache_imports (bool): whether to cache the imports of each file until it changes.
+
+        Returns:
+            DSM: instance of DSM.
+        """
+        from ..imports import scan_imports  # noqa: WPS433 (costly import, done only when needed)
+
+        if isinstance(packages, str):
+            packages = [packages]
+        modules, dependencies = scan_imports(packages, jobs, cache_imports)
+        index = {module: position for position, module in enumerate(modules)}
+        sources, targets, weights = array("l"), array("l"), array("q")
+        for (module, imported), count in dependencies.items():
+            sources.append(index[module])
+            targets.append(index[imported])
+            weights.append(count)
+        return DesignStructureMatrix(EdgeListInput.build_rows(len(modules), sources, targets, weights), modules)
+
+
+class GitCoChanges(Provider):
+    """Provider to read DSM from the co-changes in a git repository."""
+
+    identifier = "archan.GitCoChanges"
+    name = "Git Co-Changes"
+    description = """
+    Stream the history of a git repository to provide a matrix of logical
+    coupling: the number of times each pair of modules changed together,
+    in the same commit or within a window of consecutive commits. Counts are
+    saved, so that the next run only processes the new commits."""
+    argument_list = (
+        Argument("repository", str, "Path to the git repository.", "."),
+        Argument("window", int, "Number of consecutive commits in which modules changed together.", 1),
+        Argument("depth", int, "Number of leading path components forming a module, whole paths by default."),
+        Argument("pattern", str, "Shell pattern of the paths to count, like '*.py'. All paths by default."),
+        Argument("max_files", int, "Ignore the modules of commits changing more files than this.", 100),
+        Argument("min_count", int, "Minimum number of co-changes for a pair to be counted.", 1),
+        Argument("resume", bool, "Resume from the counts of the previous run.", True),
+    )
+
+    def get_data(
+        self, repository=".", window=1, depth=None, pattern=None, max_files=100, min_count=1, resume=True
+    ):
+        """
+        Count co-changes in the history of a git repository to return an instance of DSM.
+
+        The matrix is symmetric, and its diagonal is empty.
+
+        Args:
+            repository (str): path to the git repository.
+            window (int): number of consecutive commits in which modules changed together,
+                1 for the same commit.
+            depth (int): number of leading path components forming a module, whole paths if None.
+            pattern (str): if set, only the paths matching this shell pattern are counted.
+            max_files (int): if set, the modules of commits changing more files are ignored,
+                these commits still counting in the window.
+            min_count (int): minimum number of co-changes for a pair to be counted.
+            resume (bool): whether to resume from the counts of the previous run.
+
+        Returns:
+            DSM: instance of DSM.
+        """
+        from ..cochange import count_co_changes  # noqa: WPS433 (costly import, done only when needed)
+
+        counter = count_co_changes(repository, window, depth, pattern, max_files, resume)
+        order = sorted(range(len(counter.modules)), key=counter.modules.__getitem__)
+        position = array("l", bytes(array("l").itemsize * len(order)))
+        for new_index, old_index in enumerate(order):
+            position[old_index] = new_index
+        sources, targets, weights = array("l"), array("l"), array("q")
+        for (one, other), count in counter.counts.items():
+            if count >= min_count:
+                sources.extend((position[one], position[other]))
+                targets.extend((position[other], position[one]))
+                weights.extend((count, count))
+        data = EdgeListInput.build_rows(len(order), sources, targets, weights)
+        return DesignStructureMatrix(data, [counter.modules[index] for index in order])
+
 
 # FIXME: move this provider in its own repo? it's not ready
 # class CodeIssuesAndSimilarities(Provider):
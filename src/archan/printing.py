@@ -2,21 +2,25 @@
 
 """Printing module."""
 
+import functools
 import shutil
+import sys
 import textwrap
 
-from colorama import Fore, Style
-
 from .enums import ResultCode
 from .logging import Logger
 
 logger = Logger.get_logger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
 def console_width(default=80):
     """
     Return current console width.
 
+    The width is computed once, use ``console_width.cache_clear()``
+    to compute it again.
+
     Args:
         default (int): default value if width cannot be retrieved.
 
@@ -28,6 +32,22 @@ def console_width(default=80):
     return shutil.get_terminal_size((default, 20)).columns
 
 
+@functools.lru_cache(maxsize=64)
+def text_wrapper_for(width, indent=0):
+    """
+    Return a text wrapper, shared by every text wrapped with the same width and indent.
+
+    Args:
+        width (int): maximum length of a line.
+        indent (int): level of indentation.
+
+    Returns:
+        textwrap.TextWrapper: the text wrapper.
+    """
+    indent = " " * indent
+    return textwrap.TextWrapper(width=width, replace_whitespace=False, initial_indent=indent, subsequent_indent=indent)
+
+
 def pretty_description(description, wrap_at=None, indent=0):
     """
     Return a pretty formatted string given some text.
@@ -47,10 +67,13 @@ def pretty_description(description, wrap_at=None, indent=0):
         else:
             wrap_at += width
 
-    indent = " " * indent
-    text_wrapper = textwrap.TextWrapper(
-        width=wrap_at, replace_whitespace=False, initial_indent=indent, subsequent_indent=indent
-    )
+    # fast path: a single short line does not need wrapping
+    if "\n" not in description and "\t" not in description:
+        line = description.strip()
+        if line and indent + len(line) <= wrap_at:
+            return " " * indent + line
+
+    text_wrapper = text_wrapper_for(wrap_at, indent)
     new_desc = []
     for line in description.split("\n"):
         new_desc.append(line.replace("\n", "").strip())
@@ -77,6 +100,8 @@ class PrintableNameMixin:
 
     def print_name(self, indent=0, end="\n"):
         """Print name with optional indent and end."""
+        from colorama import Style  # noqa: WPS433 (costly import, done only when needed)
+
         print(Style.BRIGHT + " " * indent + self.name, end=end)
 
 
@@ -85,6 +110,8 @@ class PrintableArgumentMixin:
 
     def print(self, indent=0):
         """Print self with optional indent."""
+        from colorama import Fore, Style  # noqa: WPS433 (costly import, done only when needed)
+
         text = ("{indent}{magenta}{name}{none} ({dim}{cls}{none}, " "default {dim}{default}{none})").format(
             indent=" " * indent,
             dim=Style.DIM,
@@ -106,6 +133,8 @@ class PrintablePluginMixin:
 
     def print(self):
         """Print self."""
+        from colorama import Fore, Style  # noqa: WPS433 (costly import, done only when needed)
+
         print(
             "{dim}Identifier:{none} {cyan}{identifier}{none}\n"
             "{dim}Name:{none} {name}\n"
@@ -128,15 +157,26 @@ class PrintablePluginMixin:
 class PrintableResultMixin:
     """Mixin to add a print method to Result instances."""
 
-    def print(self, indent=2):
-        """Print self with optional indent."""
+    __slots__ = ()
+
+    def print(self, indent=2, stream=None):
+        """
+        Print self with optional indent.
+
+        Args:
+            indent (int): level of indentation of messages.
+            stream (file): the stream to write to, standard output by default.
+        """
+        from colorama import Fore, Style  # noqa: WPS433 (costly import, done only when needed)
+
         status = {
             ResultCode.NOT_IMPLEMENTED: "{}not implemented{}".format(Fore.YELLOW, Style.RESET_ALL),
+            ResultCode.TIMEOUT: "{}timed out{}".format(Fore.RED, Style.RESET_ALL),
             ResultCode.IGNORED: "{}failed (ignored){}".format(Fore.YELLOW, Style.RESET_ALL),
             ResultCode.FAILED: "{}failed{}".format(Fore.RED, Style.RESET_ALL),
             ResultCode.PASSED: "{}passed{}".format(Fore.GREEN, Style.RESET_ALL),
         }.get(self.code)
-        print(
+        lines = [
             "{bold}{group}{provider}{checker}: {none}{status}{none}".format(
                 bold=Style.BRIGHT,
                 group=(self.group.name + " – ") if self.group.name else "",
@@ -145,9 +185,10 @@ class PrintableResultMixin:
                 none=Style.RESET_ALL,
                 status=status,
             )
-        )
+        ]
         if self.messages:
-            for message in self.messages.split("\n"):
-                print(pretty_description(message, indent=indent))
+            lines.extend(pretty_description(message.text, indent=indent) for message in self.messages)
             if self.checker.hint:
-                print(pretty_description("Hint: " + self.checker.hint, indent=indent))
+                lines.append(pretty_description("Hint: " + self.checker.hint, indent=indent))
+        # a single write per result
+        (stream or sys.stdout).write("\n".join(lines) + "\n")
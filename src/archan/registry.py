@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registry module.
+
+Contains the PluginRegistry class, which discovers installed plugins
+through entry points and loads them only when they are referenced.
+Discovered plugins are stored in an on-disk cache, refreshed
+automatically when the installed distributions change.
+"""
+
+import importlib
+import os
+
+from .cache import cache_dir, environment_signature, read_json, write_json
+from .errors import PluginNotFoundError
+from .logging import Logger
+from .plugins import Argument, Checker, Provider
+from .printing import PrintablePluginMixin
+
+logger = Logger.get_logger(__name__)
+
+ENTRY_POINTS_GROUP = "archan"
+
+
+def iter_entry_points(group=ENTRY_POINTS_GROUP):
+    """
+    Iterate on the entry points of a group, without loading them.
+
+    Args:
+        group (str): the entry points group.
+
+    Returns:
+        iterable: the entry points.
+    """
+    try:
+        from importlib import metadata  # noqa: WPS433 (costly import, done only when needed)
+    except ImportError:  # Python < 3.8
+        import importlib_metadata as metadata  # type: ignore  # noqa: WPS433,WPS440
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=group)
+    return entry_points.get(group, ())
+
+
+def load_object(value):
+    """
+    Import an object given its entry point value.
+
+    Args:
+        value (str): the entry point value, as ``module:attr``.
+
+    Returns:
+        obj: the imported object.
+    """
+    module_name, _, attributes = value.partition("[")[0].strip().partition(":")
+    obj = importlib.import_module(module_name.strip())
+    for attribute in attributes.strip().split(".") if attributes else ():
+        obj = getattr(obj, attribute)
+    return obj
+
+
+class PluginInfo(PrintablePluginMixin):
+    """Metadata of an installed plugin, printable without importing it."""
+
+    def __init__(self, identifier, name, description, hint="", argument_list=()):
+        """
+        Initialization method.
+
+        Args:
+            identifier (str): identifier of the plugin.
+            name (str): name of the plugin.
+            description (str): description of the plugin.
+            hint (str): hint of the plugin (checkers only).
+            argument_list (list of Argument): arguments of the plugin.
+        """
+        self.identifier = identifier
+        self.name = name
+        self.description = description
+        self.hint = hint
+        self.argument_list = argument_list
+
+
+class PluginRegistry(object):
+    """
+    Registry of installed plugins.
+
+    Plugins specifications (entry point value, kind and metadata) are read
+    from the on-disk cache when it is up-to-date. Otherwise, entry points are
+    discovered, every plugin is loaded once to fill the cache, and the cache
+    is written back. Plugin classes are then imported only when requested.
+    """
+
+    def __init__(self, group=ENTRY_POINTS_GROUP, use_cache=True):
+        """
+        Initialization method.
+
+        Args:
+            group (str): the entry points group.
+            use_cache (bool): whether to read and write the on-disk cache.
+        """
+        self.group = group
+        self.use_cache = use_cache
+        self._specs = None
+        self._classes = {}
+
+    def __repr__(self):
+        return "<PluginRegistry %s: %s>" % (self.group, ", ".join(self.identifiers))
+
+    def __contains__(self, identifier):
+        return identifier in self.specs
+
+    @property
+    def cache_file(self):
+        """Return the path to the cache file, or None if the cache directory is not writable."""
+        try:
+            return os.path.join(cache_dir(), "plugins-%s.json" % self.group)
+        except OSError as error:
+            logger.debug("Cannot use cache directory: %s", error)
+            return None
+
+    @property
+    def specs(self):
+        """Return the plugins specifications, by identifier."""
+        if self._specs is None:
+            cache_file = self.cache_file if self.use_cache else None
+            signature = environment_signature() if cache_file else None
+            if cache_file:
+                cached = read_json(cache_file)
+                if cached and cached.get("signature") == signature:
+                    logger.debug("Read plugins from cache %s", cache_file)
+                    self._specs = cached["plugins"]
+                    return self._specs
+            self._specs = self.discover()
+            if cache_file:
+                logger.debug("Write plugins to cache %s", cache_file)
+                write_json(cache_file, {"signature": signature, "plugins": self._specs})
+        return self._specs
+
+    @property
+    def identifiers(self):
+        """Return the sorted identifiers of installed plugins."""
+        return sorted(self.specs)
+
+    def discover(self):
+        """
+        Discover plugins through entry points and load them to get their specifications.
+
+        Plugins that cannot be loaded are logged and skipped.
+
+        Returns:
+            dict: the plugins specifications, by identifier.
+        """
+        specs = {}
+        for entry_point in iter_entry_points(self.group):
+            if entry_point.name in specs:
+                continue
+            try:
+                plugin = load_object(entry_point.value)
+            except (ImportError, AttributeError) as error:
+                logger.error("Could not load installed plugin %s. Exception: %s.", entry_point.name, error)
+                continue
+            kind = kind_of(plugin)
+            if kind is None:
+                continue
+            self._classes[entry_point.name] = plugin
+            specs[entry_point.name] = dict(value=entry_point.value, kind=kind, **plugin_metadata(plugin))
+        logger.debug("Discovered %d plugins", len(specs))
+        return specs
+
+    def load(self, identifier):
+        """
+        Load the plugin class corresponding to the given identifier.
+
+        Args:
+            identifier (str): identifier of the plugin.
+
+        Returns:
+            type: the plugin class.
+
+        Raises:
+            PluginNotFoundError: when the plugin is not installed or cannot be loaded.
+        """
+        if identifier not in self._classes:
+            if identifier not in self.specs:
+                raise PluginNotFoundError("No installed plugin identified by %s" % identifier)
+            logger.debug("Load plugin %s", identifier)
+            try:
+                self._classes[identifier] = load_object(self.specs[identifier]["value"])
+            except (ImportError, AttributeError) as error:
+                raise PluginNotFoundError(error)
+        return self._classes[identifier]
+
+    def kind(self, identifier):
+        """
+        Return the kind of an installed plugin, without importing it.
+
+        Args:
+            identifier (str): identifier of the plugin.
+
+        Returns:
+            str: "provider", "checker", or None if there is no such installed plugin.
+        """
+        spec = self.specs.get(identifier)
+        return spec["kind"] if spec else None
+
+    def get(self, identifier, cls=None):
+        """
+        Return the installed plugin corresponding to the given identifier and type.
+
+        Args:
+            identifier (str): identifier of the plugin.
+            cls (str): one of checker / provider, or None for both.
+
+        Returns:
+            Checker/Provider: plugin class, or None if there is no such installed plugin.
+        """
+        kind = self.kind(identifier)
+        if kind is None or (cls is not None and kind != cls):
+            return None
+        return self.load(identifier)
+
+    def all(self, cls):  # noqa: A003 (method, not shadowing the builtin)
+        """
+        Load and return every installed plugin of the given type.
+
+        Plugins that cannot be loaded are logged and skipped.
+
+        Args:
+            cls (str): one of checker / provider.
+
+        Returns:
+            dict: plugin classes by identifier.
+        """
+        plugins = {}
+        for identifier in self.identifiers:
+            if self.kind(identifier) != cls:
+                continue
+            try:
+                plugins[identifier] = self.load(identifier)
+            except PluginNotFoundError as error:
+                logger.error("Could not load installed plugin %s. Exception: %s.", identifier, error)
+        return plugins
+
+    def infos(self, cls):
+        """
+        Return the metadata of every installed plugin of the given type, without importing them.
+
+        Args:
+            cls (str): one of checker / provider.
+
+        Returns:
+            list of PluginInfo: the plugins metadata, sorted by identifier.
+        """
+        infos = []
+        for spec in self.specs.values():
+            if spec["kind"] == cls:
+                infos.append(
+                    PluginInfo(
+                        spec["identifier"],
+                        spec["name"],
+                        spec["description"],
+                        spec["hint"],
+                        [Argument(*argument) for argument in spec["argument_list"]],
+                    )
+                )
+        return sorted(infos, key=lambda info: info.identifier)
+
+    @property
+    def providers(self):
+        """Return installed providers classes, by identifier."""
+        return self.all("provider")
+
+    @property
+    def checkers(self):
+        """Return installed checkers classes, by identifier."""
+        return self.all("checker")
+
+
+def kind_of(plugin):
+    """
+    Return the kind of a plugin class.
+
+    Args:
+        plugin (type): a plugin class.
+
+    Returns:
+        str: "provider", "checker", or None.
+    """
+    if isinstance(plugin, type):
+        if issubclass(plugin, Provider):
+            return "provider"
+        elif issubclass(plugin, Checker):
+            return "checker"
+    return None
+
+
+def plugin_metadata(plugin):
+    """
+    Return the printable metadata of a plugin class, as JSON-serializable values.
+
+    Args:
+        plugin (type): a plugin class.
+
+    Returns:
+        dict: the identifier, name, description, hint and arguments.
+    """
+    argument_list = []
+    for argument in plugin.argument_list or ():
+        default = argument.default
+        if not isinstance(default, (type(None), bool, int, float, str)):
+            default = str(default)
+        argument_list.append((argument.name, str(argument.cls), argument.description, default))
+    return {
+        "identifier": plugin.identifier,
+        "name": plugin.name,
+        "description": plugin.description,
+        "hint": getattr(plugin, "hint", ""),
+        "argument_list": argument_list,
+    }
+
+
+registry = PluginRegistry()
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+
+"""
+Server module.
+
+Contains the ``archan serve`` command: a long-running process that loads
+the configuration and plugins once, and runs analyses on request over
+HTTP, either on a local TCP port or on a Unix socket.
+
+Endpoints:
+
+- ``GET /health``: return the server status and archan's version.
+- ``GET /plugins``: return the identifiers and kinds of installed plugins.
+- ``POST /analyze``: run the analysis and return its results as JSON.
+
+The body of analysis requests is either a JSON object, sent with an
+``application/json`` content type, or raw CSV data, sent with a ``text/csv``
+content type. The JSON object can contain
+one of the following items to replace the configured providers' data:
+
+- ``file_path``: path to a CSV file, read by the server;
+- ``csv``: inline CSV data;
+- ``dsm``: an object with ``data``, ``entities`` and ``categories`` items.
+
+The ``delimiter`` and ``categories_delimiter`` items apply to CSV data.
+Without input, the configured providers are run.
+
+Requests whose ``Host`` header does not designate the address the server
+listens on are rejected, so that web pages cannot send requests to the
+server through DNS rebinding.
+"""
+
+import argparse
+import collections
+import ipaddress
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from . import __version__
+from .analysis import Analysis
+from .cli import valid_file, valid_level
+from .config import Config
+from .dsm import DesignStructureMatrix
+from .errors import MatrixError
+from .logging import Logger
+from .plugins import Provider
+from .plugins.providers import CSVInput, open_input
+
+logger = Logger.get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LOOPBACK_NAMES = frozenset(("localhost", "127.0.0.1", "::1"))
+WILDCARD_HOSTS = frozenset(("", "0.0.0.0", "::"))  # noqa: S104 (not binding, comparing)
+
+
+class InputError(ValueError):
+    """Exception raised when the input of an analysis request is invalid."""
+
+
+class DataProvider(Provider):
+    """Provider returning data sent along with an analysis request."""
+
+    identifier = "archan.server.DataProvider"
+    name = "Request Input"
+    description = "Provide the matrix sent along with an analysis request."
+
+    def __init__(self, data, name=None):
+        """
+        Initialization method.
+
+        Args:
+            data (DSM/DMM/MDM): the data to provide.
+            name (str): the name of the provider.
+        """
+        super().__init__(name=name)
+        self._data = data
+
+    def get_data(self, **kwargs):
+        """
+        Return the data sent along with the request.
+
+        Args:
+            **kwargs: unused.
+
+        Returns:
+            DSM/DMM/MDM: the data.
+        """
+        return self._data
+
+
+class AnalysisServer(object):
+    """
+    Run analyses on request, with warm configuration and plugins.
+
+    The configuration is compiled once. Each request inflates its own
+    plugin instances from the compiled analysis groups, so concurrent
+    requests do not share state. Matrices read from files are kept in a
+    bounded cache, keyed on the path, modification time and size of the file.
+    """
+
+    def __init__(self, config, require_input=False, cache_size=32):
+        """
+        Initialization method.
+
+        Args:
+            config (Config): the configuration to use for every analysis.
+            require_input (bool): whether requests must send input data,
+                for example when the configuration reads standard input.
+            cache_size (int): maximum number of matrices kept in cache.
+        """
+        self.config = config
+        self.require_input = require_input
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, request):
+        """
+        Run an analysis.
+
+        Args:
+            request (dict): the request, see the module documentation.
+
+        Returns:
+            dict: the analysis results.
+
+        Raises:
+            InputError: when the request input is missing or invalid.
+        """
+        data, name = self.get_input(request)
+        if data is None and self.require_input:
+            raise InputError('missing input: send "file_path", "csv" or "dsm"')
+
+        config = Config(self.config.config_dict, self.config.plugins, self.config.compiled_groups)
+        if data is not None:
+            for group in config.analysis_groups:
+                if group.providers:
+                    group.providers = [DataProvider(data, name)]
+
+        analysis = Analysis(config, provider_data="free")
+        analysis.run(verbose=False)
+        return analysis.as_dict()
+
+    def get_input(self, request):
+        """
+        Return the matrix sent along with a request.
+
+        Args:
+            request (dict): the request.
+
+        Returns:
+            tuple (DSM, str): the matrix and its name, or (None, None) if there is no input.
+
+        Raises:
+            InputError: when the input is invalid.
+        """
+        if not isinstance(request, dict):
+            raise InputError("request must be a JSON object")
+        delimiter = request.get("delimiter", ",")
+        categories_delimiter = request.get("categories_delimiter")
+        try:
+            if request.get("file_path"):
+                return self.read_file(request["file_path"], delimiter, categories_delimiter), request["file_path"]
+            elif request.get("csv"):
+                lines = request["csv"].splitlines()
+                return CSVInput.parse_lines(lines, delimiter, categories_delimiter), None
+            elif request.get("dsm"):
+                dsm = request["dsm"]
+                return DesignStructureMatrix(dsm["data"], dsm.get("entities"), dsm.get("categories")), None
+        except OSError as error:
+            raise InputError("cannot read input file: %s" % error)
+        except (MatrixError, KeyError, TypeError, ValueError, IndexError) as error:
+            raise InputError("invalid input data: %s" % error)
+        return None, None
+
+    def read_file(self, file_path, delimiter=",", categories_delimiter=None):
+        """
+        Read a matrix from a CSV file, or return it from cache if the file did not change.
+
+        Args:
+            file_path (str): path to the CSV file.
+            delimiter (str): character(s) used as delimiter for columns.
+            categories_delimiter (str): character(s) used as delimiter for categories.
+
+        Returns:
+            DSM: the matrix.
+        """
+        file_path = os.path.realpath(file_path)
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size, delimiter, categories_delimiter)
+        with self._lock:
+            if key in self._cache:
+                logger.debug("Read %s from cache", file_path)
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        with open_input(file_path) as stream:
+            dsm = CSVInput.parse_lines(stream, delimiter, categories_delimiter)
+        with self._lock:
+            self._cache[key] = dsm
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dsm
+
+    def plugins(self):
+        """
+        Return the installed plugins.
+
+        Returns:
+            dict: the kind of each installed plugin, by identifier.
+        """
+        return {identifier: self.config.plugins.kind(identifier) for identifier in self.config.plugins.identifiers}
+
+
+def ip_address_or_none(host):
+    """
+    Return the IP address of a host, if it is an address and not a name.
+
+    Args:
+        host (str): the host.
+
+    Returns:
+        ipaddress.IPv4Address/IPv6Address: the address, or None.
+    """
+    try:
+        return ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """HTTP requests handler, delegating to the server's ``AnalysisServer``."""
+
+    server_version = "archan/%s" % __version__
+
+    def host_allowed(self):
+        """
+        Tell if the Host header of the request designates the address the server listens on.
+
+        On a loopback address, every loopback name is accepted. On every address,
+        any IP address is accepted, but no other domain name.
+        Requests on Unix sockets are always accepted.
+
+        Returns:
+            bool: whether the request can be handled.
+        """
+        if not isinstance(self.server.server_address, tuple):
+            return True
+        bound_host, bound_port = self.server.server_address[:2]
+        host, _, port = self.headers.get("Host", "").rpartition(":")
+        if not host or not port.isdigit() or int(port) != bound_port:
+            return False
+        host = host.strip("[]").lower()
+        if host == bound_host:
+            return True
+        bound_ip = ip_address_or_none(bound_host)
+        if bound_host in LOOPBACK_NAMES or (bound_ip is not None and bound_ip.is_loopback):
+            return host in LOOPBACK_NAMES
+        if bound_host in WILDCARD_HOSTS:
+            return host == "localhost" or ip_address_or_none(host) is not None
+        return False
+
+    def do_GET(self):  # noqa: N802 (name imposed by the base class)
+        """Handle GET requests."""
+        if not self.host_allowed():
+            self.send_json(403, {"error": "invalid Host header"})
+        elif self.path == "/health":
+            self.send_json(200, {"status": "ok", "version": __version__})
+        elif self.path == "/plugins":
+            self.send_json(200, self.server.analysis_server.plugins())
+        else:
+            self.send_json(404, {"error": "not found: %s" % self.path})
+
+    def do_POST(self):  # noqa: N802 (name imposed by the base class)
+        """Handle POST requests."""
+        if not self.host_allowed():
+            self.send_json(403, {"error": "invalid Host header"})
+            return
+        if self.path != "/analyze":
+            self.send_json(404, {"error": "not found: %s" % self.path})
+            return
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.send_json(411, {"error": "missing Content-Length header"})
+            return
+        body = self.rfile.read(int(length))
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if body and content_type not in {"text/csv", "application/json"}:
+            self.send_json(415, {"error": "send JSON as application/json, or CSV as text/csv"})
+            return
+        try:
+            if content_type == "text/csv":
+                request = {"csv": body.decode()}
+            else:
+                request = json.loads(body.decode() or "{}")
+            response = self.server.analysis_server.analyze(request)
+        except (InputError, ValueError) as error:
+            self.send_json(400, {"error": str(error)})
+        except Exception as error:  # noqa: W0703 (report every plugin error to the client)
+            logger.exception("Analysis failed")
+            self.send_json(500, {"error": "%s: %s" % (type(error).__name__, error)})
+        else:
+            self.send_json(200, response)
+
+    def send_json(self, status, obj):
+        """
+        Send a JSON response.
+
+        Args:
+            status (int): the HTTP status code.
+            obj (obj): the object to encode.
+        """
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        """Return the client address, which is empty for Unix sockets."""
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format, *args):  # noqa: A002 (name imposed by the base class)
+        """Log requests with archan's logger instead of standard error."""
+        logger.info("%s - " + format, self.address_string(), *args)
+
+
+def remove_socket(socket_path):
+    """
+    Remove a Unix socket file, for example left by a previous server.
+
+    Args:
+        socket_path (str): path to the socket.
+
+    Raises:
+        FileExistsError: when the path exists but is not a socket, which is never removed.
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError("%s exists and is not a socket" % socket_path)
+    os.remove(socket_path)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server handling each request in a thread."""
+
+    daemon_threads = True
+
+
+def make_server(analysis_server, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+    """
+    Create an HTTP server listening on a TCP port or a Unix socket.
+
+    Args:
+        analysis_server (AnalysisServer): the object running analyses.
+        host (str): the host to listen on.
+        port (int): the port to listen on, 0 to pick a free one.
+        socket_path (str): path to a Unix socket, used instead of host and port.
+
+    Returns:
+        socketserver.BaseServer: the server, already bound.
+
+    Raises:
+        OSError: when Unix sockets are not supported on this platform,
+            or when the socket path exists and is not a socket.
+    """
+    if socket_path:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise OSError("Unix sockets are not supported on this platform")
+
+        class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):  # noqa: WPS431
+            daemon_threads = True
+
+        remove_socket(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, AnalysisRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.analysis_server = analysis_server
+    return server
+
+
+def server_address(server):
+    """
+    Return the printable address of a server.
+
+    Args:
+        server (socketserver.BaseServer): the server.
+
+    Returns:
+        str: the URL or socket path the server listens on.
+    """
+    if isinstance(server.server_address, tuple):
+        return "http://%s:%s" % server.server_address[:2]
+    return "unix:%s" % server.server_address
+
+
+def get_parser():
+    """
+    Return the ``archan serve`` argument parser.
+
+    Returns:
+        argparse.ArgumentParser: the parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="archan serve", description="Run archan as a server, with configuration and plugins loaded once."
+    )
+    parser.add_argument(
+        "-c", "--config", type=valid_file, dest="config_file", metavar="FILE", help="Configuration file to use."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Host to listen on. Default: %(default)s.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on. Default: %(default)s.")
+    parser.add_argument("--socket", dest="socket_path", metavar="PATH", help="Listen on a Unix socket instead.")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=32,
+        help="Maximum number of matrices read from files kept in cache. Default: %(default)s.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Do not read or write cached plugins and configuration. Default: false.",
+    )
+    parser.add_argument(
+        "--no-config",
+        action="store_true",
+        default=False,
+        help="Do not load configuration from file: requests must send input data. Default: false.",
+    )
+    parser.add_argument("--log-json", metavar="FILE", help="Also write log records as JSON lines to this file.")
+    parser.add_argument(
+        "-v", "--verbose-level", dest="level", type=valid_level, default="ERROR", help="Level of verbosity."
+    )
+    return parser
+
+
+def main(args=None):
+    """
+    Run the ``archan serve`` command.
+
+    Args:
+        args (list of str): the command-line arguments.
+
+    Returns:
+        int: an exit code.
+    """
+    opts = get_parser().parse_args(args=args)
+    Logger.set_level(opts.level)
+    if opts.log_json:
+        Logger.add_json_sink(opts.log_json)
+
+    from .registry import registry as default_registry  # noqa: WPS433
+
+    if opts.no_cache:
+        default_registry.use_cache = False
+
+    config_file = None if opts.no_config else opts.config_file or Config.find()
+    if config_file:
+        logger.info("Load configuration from %s", config_file)
+        config = Config.from_file(config_file, use_cache=not opts.no_cache)
+    else:
+        logger.info("No configuration file, use default one")
+        config = Config.default_config(None)
+
+    analysis_server = AnalysisServer(config, require_input=not config_file, cache_size=opts.cache_size)
+    try:
+        server = make_server(analysis_server, opts.host, opts.port, opts.socket_path)
+    except OSError as error:
+        print("archan serve: %s" % error, file=sys.stderr)
+        return 1
+
+    print("Serving on %s" % server_address(server), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Keyboard interruption, stopping server")
+    finally:
+        server.server_close()
+        if opts.socket_path:
+            remove_socket(opts.socket_path)
+    return 0
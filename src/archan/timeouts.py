@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+Timeouts module.
+
+Contains the function used to run plugins with a timeout. In the main
+thread of a process, where signals are delivered, the call is interrupted
+by a ``SIGALRM`` timer. Elsewhere, as in the threads of ``archan serve``,
+or on platforms without ``SIGALRM``, the call runs in a daemon thread
+which is abandoned when the timeout expires: the caller gets control
+back, but the abandoned call keeps running in the background.
+
+A timer only interrupts Python code: a plugin blocked in a single
+long call of a C extension is interrupted when this call returns.
+"""
+
+import signal
+import threading
+
+from .errors import PluginTimeoutError
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+
+def can_use_alarm():
+    """
+    Tell if calls can be interrupted by a ``SIGALRM`` timer.
+
+    Returns:
+        bool: true in the main thread, on platforms supporting it,
+        when no other timer is already running.
+    """
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+        and signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    )
+
+
+def call_with_timeout(function, timeout, *args, **kwargs):
+    """
+    Call a function, raising an error if it runs for longer than the timeout.
+
+    Args:
+        function (callable): the function to call.
+        timeout (float): the timeout in seconds, None for no timeout.
+        *args: positional arguments of the function.
+        **kwargs: keyword arguments of the function.
+
+    Returns:
+        obj: the return value of the function.
+
+    Raises:
+        PluginTimeoutError: when the timeout expired.
+    """
+    if timeout is None:
+        return function(*args, **kwargs)
+    if timeout <= 0:
+        raise PluginTimeoutError(0)
+    if can_use_alarm():
+        return _call_with_alarm(function, timeout, args, kwargs)
+    return _call_in_thread(function, timeout, args, kwargs)
+
+
+def _call_with_alarm(function, timeout, args, kwargs):
+    def on_alarm(signum, frame):
+        raise PluginTimeoutError(timeout)
+
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return function(*args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _call_in_thread(function, timeout, args, kwargs):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = function(*args, **kwargs)
+        except BaseException as error:  # noqa: WPS424 (re-raised in the calling thread)
+            outcome["error"] = error
+
+    thread = threading.Thread(target=target, name="archan-timeout", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        name = getattr(function, "__qualname__", function)
+        logger.warning("Abandoning call of %s still running after %gs", name, timeout)
+        raise PluginTimeoutError(timeout)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
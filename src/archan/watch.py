@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+
+"""
+Watch module.
+
+Contains the file watchers and the watch loop used by ``archan --watch``:
+the configuration file and the providers' input paths are watched,
+and only the analysis groups affected by a change are run again.
+
+On Linux, changes are detected with inotify (through ctypes), other
+platforms fall back to polling the modification time and size of files.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+
+from .config import Config
+from .logging import Logger
+
+logger = Logger.get_logger(__name__)
+
+IGNORED_DIRECTORIES = ("__pycache__", "node_modules")
+
+
+def snapshot(paths):
+    """
+    Return the modification time and size of files in the given paths.
+
+    Directories are walked recursively, skipping hidden directories.
+
+    Args:
+        paths (iterable of str): files and directories.
+
+    Returns:
+        dict: ``(mtime, size)`` tuples by file path. Missing files are absent.
+    """
+    state = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [name for name in dirs if not name.startswith(".") and name not in IGNORED_DIRECTORIES]
+                for name in files:
+                    _stat_into(state, os.path.join(root, name))
+        else:
+            _stat_into(state, path)
+    return state
+
+
+def _stat_into(state, path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return
+    state[path] = (stat.st_mtime_ns, stat.st_size)
+
+
+def changed_paths(before, after):
+    """
+    Return the paths of files that were modified, created or deleted between two snapshots.
+
+    Args:
+        before (dict): the previous snapshot.
+        after (dict): the current snapshot.
+
+    Returns:
+        set of str: the changed paths.
+    """
+    changed = {path for path, state in after.items() if before.get(path) != state}
+    changed.update(path for path in before if path not in after)
+    return changed
+
+
+class PollingWatcher(object):
+    """
+    Watch files and directories by polling them.
+
+    Changes are debounced: once a change is detected, the watcher waits
+    for the paths to stay unchanged during the debounce delay, so that
+    editors writing several files, or a file in several steps,
+    trigger only one notification.
+    """
+
+    def __init__(self, paths=(), interval=0.5, debounce=0.1):
+        """
+        Initialization method.
+
+        Args:
+            paths (iterable of str): files and directories to watch.
+            interval (float): delay between two polls, in seconds.
+            debounce (float): delay without changes before notifying, in seconds.
+        """
+        self.interval = interval
+        self.debounce = debounce
+        self.paths = set()
+        self.state = {}
+        self.set_paths(paths)
+
+    def set_paths(self, paths):
+        """
+        Replace the watched paths.
+
+        Args:
+            paths (iterable of str): files and directories to watch.
+        """
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.state = snapshot(self.paths)
+
+    def wait(self, timeout=None):
+        """
+        Wait for changes.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds, or None to wait forever.
+
+        Returns:
+            set of str: the changed paths, empty if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            if not self.wait_event(remaining):
+                if deadline is not None and time.monotonic() >= deadline:
+                    return set()
+                continue
+            # debounce: wait until nothing moves anymore
+            current = snapshot(self.paths)
+            while True:
+                self.wait_event(self.debounce, drain=True)
+                settled = snapshot(self.paths)
+                if settled == current:
+                    break
+                current = settled
+            changed = changed_paths(self.state, current)
+            self.state = current
+            if changed:
+                logger.debug("Changed paths: %s", changed)
+                return changed
+
+    def wait_event(self, timeout, drain=False):
+        """
+        Wait until something may have changed.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds, or None to wait forever.
+            drain (bool): whether the caller only wants to let time pass.
+
+        Returns:
+            bool: whether something may have changed.
+        """
+        if drain:
+            time.sleep(timeout)
+            return True
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        return snapshot(self.paths) != self.state
+
+    def close(self):
+        """Release the watcher resources."""
+
+
+class InotifyWatcher(PollingWatcher):
+    """
+    Watch files and directories with Linux's inotify.
+
+    The directories containing the watched files are watched as well,
+    so that files replaced atomically (written then renamed, like many
+    editors do) are still detected. Events only wake the watcher up:
+    changes are computed by comparing snapshots.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    MASK = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+        | IN_MOVE_SELF
+    )
+
+    def __init__(self, paths=(), interval=0.5, debounce=0.1):
+        """
+        Initialization method.
+
+        Args:
+            paths (iterable of str): files and directories to watch.
+            interval (float): unused, kept for compatibility with the polling watcher.
+            debounce (float): delay without changes before notifying, in seconds.
+
+        Raises:
+            OSError: when inotify is not available.
+        """
+        self.libc = _load_libc()
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        super().__init__(paths, interval, debounce)
+
+    def set_paths(self, paths):
+        """
+        Replace the watched paths.
+
+        Previous inotify watches are kept: they only cause spurious wake-ups.
+
+        Args:
+            paths (iterable of str): files and directories to watch.
+        """
+        super().set_paths(paths)
+        self.add_watches()
+
+    def add_watches(self):
+        """Watch the watched directories, their sub-directories, and the parent directories of watched files."""
+        directories = set()
+        for path in self.paths:
+            if os.path.isdir(path):
+                for root, dirs, _ in os.walk(path):
+                    dirs[:] = [name for name in dirs if not name.startswith(".") and name not in IGNORED_DIRECTORIES]
+                    directories.add(root)
+            directories.add(os.path.dirname(path))
+        for directory in directories:
+            if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+                logger.debug("Cannot watch %s: errno %s", directory, ctypes.get_errno())
+
+    def wait(self, timeout=None):
+        """
+        Wait for changes.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds, or None to wait forever.
+
+        Returns:
+            set of str: the changed paths, empty if the timeout expired.
+        """
+        changed = super().wait(timeout)
+        if changed:
+            # watch directories created in the meantime
+            self.add_watches()
+        return changed
+
+    def wait_event(self, timeout, drain=False):
+        """
+        Wait for inotify events.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds, or None to wait forever.
+            drain (bool): whether to keep reading events until the timeout expires.
+
+        Returns:
+            bool: whether events were received.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        received = False
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return received
+            try:
+                while os.read(self.fd, 65536):
+                    received = True
+            except BlockingIOError:
+                pass
+            if not drain:
+                return received
+
+    def close(self):
+        """Close the inotify file descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _load_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify is not available")
+    libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    return libc
+
+
+def get_watcher(paths=(), interval=0.5, debounce=0.1):
+    """
+    Return the most efficient watcher available on this platform.
+
+    Args:
+        paths (iterable of str): files and directories to watch.
+        interval (float): delay between two polls, in seconds, for the polling watcher.
+        debounce (float): delay without changes before notifying, in seconds.
+
+    Returns:
+        PollingWatcher: an inotify watcher on Linux, a polling watcher otherwise.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths, interval, debounce)
+        except (OSError, AttributeError) as error:
+            logger.debug("Cannot use inotify, fall back to polling: %s", error)
+    return PollingWatcher(paths, interval, debounce)
+
+
+def input_paths(compiled_group):
+    """
+    Return the files and directories given as arguments to the providers of a group.
+
+    Arguments that do not exist yet are returned too when their parent
+    directory exists: watchers notice when they are created.
+
+    Args:
+        compiled_group (dict): the compiled analysis group definition.
+
+    Returns:
+        set of str: absolute paths.
+    """
+    paths = set()
+    for _, definition in compiled_group["providers"]:
+        arguments = (definition or {}).get("arguments") or {}
+        for value in arguments.values():
+            for item in value if isinstance(value, (list, tuple)) else (value,):
+                if not isinstance(item, str) or not item:
+                    continue
+                path = os.path.abspath(item)
+                if os.path.exists(path) or os.path.isdir(os.path.dirname(path)):
+                    paths.add(path)
+    return paths
+
+
+def is_affected(paths, changed):
+    """
+    Tell if a change affects any of the given paths.
+
+    Args:
+        paths (set of str): files and directories.
+        changed (set of str): changed files.
+
+    Returns:
+        bool: whether one of the changed files is, or is contained in, one of the paths.
+    """
+    for path in changed:
+        if path in paths:
+            return True
+        for directory in paths:
+            if path.startswith(directory + os.sep):
+                return True
+    return False
+
+
+class AnalysisWatcher(object):
+    """Run an analysis again each time its configuration or inputs change."""
+
+    def __init__(self, analysis, config_file=None, use_cache=True, watcher=None):
+        """
+        Initialization method.
+
+        Args:
+            analysis (Analysis): an analysis, already run.
+            config_file (str): path to the configuration file, if any.
+            use_cache (bool): whether to use the compiled configuration cache on reload.
+            watcher (PollingWatcher): the watcher to use, ``get_watcher()`` by default.
+        """
+        self.analysis = analysis
+        self.config_file = os.path.abspath(config_file) if config_file else None
+        self.use_cache = use_cache
+        self.group_paths = [input_paths(group) for group in analysis.config.compiled_groups]
+        self.watcher = watcher or get_watcher()
+        self.watcher.set_paths(self.watched_paths())
+
+    def watched_paths(self):
+        """Return the configuration file and every input path."""
+        paths = set().union(*self.group_paths)
+        if self.config_file:
+            paths.add(self.config_file)
+        return paths
+
+    def update(self, changed):
+        """
+        Run the analysis groups affected by changes again.
+
+        Args:
+            changed (set of str): the changed files.
+
+        Returns:
+            int: the number of analysis groups that were run.
+        """
+        config = self.analysis.config
+        groups = config.analysis_groups
+        to_run = []
+
+        if self.config_file in changed:
+            try:
+                new_config = Config.from_file(self.config_file, use_cache=self.use_cache)
+            except Exception as error:  # noqa: W0703 (keep watching whatever the configuration error)
+                logger.error("Could not reload configuration, keep previous one. Exception: %s.", error)
+                new_config = None
+            if new_config is not None:
+                old_groups = list(zip(config.compiled_groups, groups))
+                groups = []
+                for index, compiled_group in enumerate(new_config.compiled_groups):
+                    reused = None
+                    for old_index, (old_compiled_group, old_group) in enumerate(old_groups):
+                        if old_compiled_group == compiled_group:
+                            reused = old_groups.pop(old_index)[1]
+                            break
+                    if reused is None:
+                        reused = new_config.analysis_groups[index]
+                        to_run.append(reused)
+                    groups.append(reused)
+                new_config.analysis_groups = groups
+                self.analysis.config = config = new_config
+                self.group_paths = [input_paths(group) for group in config.compiled_groups]
+                self.watcher.set_paths(self.watched_paths())
+
+        for index, paths in enumerate(self.group_paths):
+            if is_affected(paths, changed) and groups[index] not in to_run:
+                # fresh plugin instances, so previous data are released
+                groups[index] = config.inflate_analysis_group(config.compiled_groups[index])
+                to_run.append(groups[index])
+
+        # the time budget applies to each update, like to a whole analysis
+        with self.analysis.time_budget():
+            for group in to_run:
+                logger.info("Run analysis group %s again", group.name or "")
+                self.analysis.run_group(group)
+        self.analysis.collect_results()
+        return len(to_run)
+
+    def run(self, output=None):
+        """
+        Watch for changes until interrupted, and output results after each update.
+
+        Args:
+            output (callable): function called after each update, ``analysis.output_tap`` by default.
+        """
+        output = output or self.analysis.output_tap
+        try:
+            while True:
+                changed = self.watcher.wait()
+                start = time.perf_counter()
+                count = self.update(changed)
+                if count:
+                    print(
+                        "# archan: %d analysis group(s) updated in %.0f ms"
+                        % (count, (time.perf_counter() - start) * 1000)
+                    )
+                    output()
+                    sys.stdout.flush()
+        finally:
+            self.watcher.close()
@@ -108,6 +108,19 @@ def _python(versions: Sequence[str]) -> Callable:
 invoke.python = _python
 
 
+@invoke.task
+def benchmark(context, sizes="100,200,500,1000,2000", output="benchmarks.json"):
+    """
+    Run the benchmark suite on synthetic DSMs.
+
+    Arguments:
+        context: The context of the Invoke task.
+        sizes: Comma-separated sizes of the generated DSMs.
+        output: The file to write JSON results to.
+    """
+    context.run(f"archan-benchmark run --sizes {sizes} --output {output}", pty=PTY)
+
+
 @invoke.task
 def changelog(context):
     """
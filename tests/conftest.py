@@ -1 +1,15 @@
 """Configuration for the pytest test suite."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path, monkeypatch):
+    """
+    Isolate archan's on-disk caches in a temporary directory.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setenv("ARCHAN_CACHE_DIR", str(tmp_path / "cache"))
@@ -0,0 +1,330 @@
+"""Tests for the `analysis` module."""
+
+import asyncio
+import gc
+import os
+import time
+import weakref
+
+import pytest
+
+from archan.analysis import Analysis
+from archan.cache import ProviderCache
+from archan.config import Config
+from archan.dsm import DesignStructureMatrix
+from archan.plugins import Checker, Message, Provider, normalize_messages
+
+
+class MatrixProvider(Provider):
+    """Provider of a small matrix."""
+
+    identifier = "tests.MatrixProvider"
+    name = "Matrix"
+
+    def get_data(self, **kwargs):
+        """
+        Return a new matrix.
+
+        Arguments:
+            **kwargs: Unused.
+
+        Returns:
+            A DSM.
+        """
+        return DesignStructureMatrix([[1, 0], [0, 1]], ["a", "b"], ["appmodule", "appmodule"])
+
+
+CONFIG = {
+    "analysis": {
+        "tests.test_analysis.MatrixProvider": {
+            "checkers": ["archan.plugins.checkers.CompleteMediation", "archan.plugins.checkers.LayeredArchitecture"]
+        }
+    }
+}
+
+
+def test_free_provider_data():
+    """Data are freed once every checker ran, results only keep the provider's metadata."""
+    analysis = Analysis(Config(CONFIG), provider_data="free")
+    provider = analysis.config.analysis_groups[0].providers[0]
+    dsm_ref = []
+    original_run = provider.run
+
+    def run():
+        original_run()
+        dsm_ref.append(weakref.ref(provider.data))
+
+    provider.run = run
+    analysis.run(verbose=False)
+    gc.collect()
+    assert dsm_ref[0]() is None
+    assert provider.data is None
+    assert [result.provider.name for result in analysis.results] == ["Matrix", "Matrix"]
+    assert not isinstance(analysis.results[0].provider, Provider)
+
+
+def test_spill_provider_data():
+    """Spilled data are reloaded from disk on access, and removed with the analysis."""
+    analysis = Analysis(Config(CONFIG), provider_data="spill")
+    analysis.run(verbose=False)
+    provider = analysis.config.analysis_groups[0].providers[0]
+    assert provider._data is None  # noqa: WPS437 (private attribute)
+    assert provider.data.entities == ["a", "b"]
+    spill_dir = analysis.spill_dir
+    assert os.listdir(spill_dir)
+    del analysis  # noqa: WPS420 (trigger the finalizer)
+    gc.collect()
+    assert not os.path.exists(spill_dir)
+
+
+def test_invalid_provider_data_mode():
+    """Unknown modes are rejected."""
+    with pytest.raises(ValueError, match="provider_data"):
+        Analysis(Config(CONFIG), provider_data="drop")
+
+
+def test_compact_results():
+    """Results are immutable records without instance dictionaries, with structured messages."""
+    analysis = Analysis(Config(CONFIG))
+    analysis.run(verbose=False)
+    result = analysis.results[0]
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.code = Checker.Code.FAILED  # noqa: WPS428 (checking immutability)
+    assert isinstance(result.messages, tuple)
+
+
+def test_normalize_messages():
+    """Checkers can return messages as strings, or iterables of strings and messages."""
+    message = Message("Dependency from %s to %s", ("a", "b"), "a", "b")
+    assert message.text == "Dependency from a to b"
+    assert normalize_messages("one\ntwo") == (Message("one"), Message("two"))
+    assert normalize_messages(["one", message]) == (Message("one"), message)
+    assert normalize_messages(message) == (message,)
+    assert normalize_messages(None) == ()
+
+
+class SlowChecker(Checker):
+    """Checker sleeping for a while."""
+
+    identifier = "tests.SlowChecker"
+    name = "Slow"
+
+    def check(self, dsm, **kwargs):
+        """
+        Sleep, then pass.
+
+        Arguments:
+            dsm: Unused.
+            **kwargs: Unused.
+
+        Returns:
+            True.
+        """
+        time.sleep(1)
+        return True
+
+
+def test_checker_timeout():
+    """Slow checkers are interrupted, and the analysis goes on."""
+    config = Config(
+        {
+            "analysis": {
+                "tests.test_analysis.MatrixProvider": {
+                    "checkers": [
+                        {"tests.test_analysis.SlowChecker": {"timeout": 0.05}},
+                        "archan.plugins.checkers.CompleteMediation",
+                    ]
+                }
+            }
+        }
+    )
+    analysis = Analysis(config)
+    analysis.run(verbose=False)
+    assert [result.code for result in analysis.results] == [Checker.Code.TIMEOUT, Checker.Code.PASSED]
+    assert analysis.results[0].as_dict()["status"] == "timeout"
+    assert not analysis.successful
+
+
+def test_time_budget():
+    """Once the time budget is exhausted, the remaining checkers are not run."""
+    config = Config(
+        {
+            "time_budget": 0.05,
+            "analysis": {
+                "tests.test_analysis.MatrixProvider": {
+                    "checkers": ["tests.test_analysis.SlowChecker", "archan.plugins.checkers.CompleteMediation"]
+                }
+            },
+        }
+    )
+    analysis = Analysis(config)
+    start = time.monotonic()
+    analysis.run(verbose=False)
+    assert time.monotonic() - start < 1
+    assert [result.code for result in analysis.results] == [Checker.Code.TIMEOUT, Checker.Code.TIMEOUT]
+    assert analysis.results[1].text == "Time budget of 0.05s exhausted"
+
+
+def test_fail_fast():
+    """Checkers run by priority then cost, and the analysis stops on the first failure."""
+    config = Config(
+        {
+            "analysis": {
+                "tests.test_analysis.MatrixProvider": {
+                    "checkers": [
+                        "archan.plugins.checkers.CompleteMediation",
+                        {"archan.plugins.checkers.LayeredArchitecture": {"passes": False}},
+                        {"archan.plugins.checkers.EconomyOfMechanism": {"priority": 1}},
+                    ]
+                }
+            }
+        }
+    )
+    analysis = Analysis(config, fail_fast=True)
+    analysis.run(verbose=False)
+    assert [result.checker.name for result in analysis.results] == ["Economy of Mechanism", "Layered Architecture"]
+    assert analysis.stopped
+    assert not analysis.successful
+
+
+class CountingCSVProvider(Provider):
+    """Provider reading a CSV file, counting its runs."""
+
+    identifier = "tests.CountingCSVProvider"
+    path_arguments = ("file_path",)
+    cache = True
+    runs = 0
+
+    def get_data(self, file_path=None):
+        """
+        Read a matrix and count the run.
+
+        Arguments:
+            file_path: The path to the CSV file.
+
+        Returns:
+            A DSM.
+        """
+        CountingCSVProvider.runs += 1
+        from archan.plugins.providers import CSVInput
+
+        with open(file_path) as stream:
+            return CSVInput.parse_lines(stream)
+
+
+def test_provider_cache(tmp_path):
+    """Providers are skipped while their arguments and input files do not change."""
+    file_path = tmp_path / "dsm.csv"
+    file_path.write_text("entity,a,b\na,1,0\nb,0,1\n")
+    config = {
+        "analysis": {
+            "tests.test_analysis.CountingCSVProvider": {
+                "arguments": {"file_path": str(file_path)},
+                "checkers": ["archan.plugins.checkers.CompleteMediation"],
+            }
+        }
+    }
+    CountingCSVProvider.runs = 0
+    for _ in range(2):
+        Analysis(Config(config)).run(verbose=False)
+    assert CountingCSVProvider.runs == 1
+    Analysis(Config(config), use_cache=False).run(verbose=False)
+    assert CountingCSVProvider.runs == 2
+    file_path.write_text("entity,a,b,c\na,1,0,0\nb,0,1,0\nc,0,0,1\n")
+    analysis = Analysis(Config(config))
+    analysis.run(verbose=False)
+    assert CountingCSVProvider.runs == 3
+    assert analysis.config.analysis_groups[0].providers[0].data.size == (3, 3)
+
+
+def test_provider_cache_eviction(tmp_path):
+    """The least recently used entries are removed first."""
+    cache = ProviderCache(str(tmp_path), max_size=2.5 / 1024)
+    for index, key in enumerate(("first", "second")):
+        cache.store(key, b"x" * 1000)
+        os.utime(os.path.join(str(tmp_path), key + ".pickle"), ns=(index, index))
+    assert cache.load("first") is not None
+    cache.store("third", b"x" * 1000)
+    assert sorted(os.listdir(str(tmp_path))) == ["first.pickle", "third.pickle"]
+
+
+class AsyncProvider(Provider):
+    """Provider waiting asynchronously before returning a small matrix."""
+
+    identifier = "tests.AsyncProvider"
+
+    async def get_data(self, delay=0):
+        """
+        Wait, then return a new matrix.
+
+        Arguments:
+            delay: The time to wait, in seconds.
+
+        Returns:
+            A DSM.
+        """
+        await asyncio.sleep(delay)
+        return DesignStructureMatrix([[1, 0], [0, 1]], ["a", "b"], ["appmodule", "appmodule"])
+
+
+class SleepingProvider(MatrixProvider):
+    """Provider sleeping before returning a small matrix."""
+
+    def get_data(self, delay=0):
+        """
+        Sleep, then return a new matrix.
+
+        Arguments:
+            delay: The time to sleep, in seconds.
+
+        Returns:
+            A DSM.
+        """
+        time.sleep(delay)
+        return super().get_data()
+
+
+def test_concurrent_providers():
+    """Asynchronous providers, and synchronous ones in threads, wait concurrently."""
+    providers = [{"tests.test_analysis.AsyncProvider": {"arguments": {"delay": 0.3}}} for _ in range(4)]
+    providers.append({"tests.test_analysis.AsyncProvider": {"arguments": {"delay": 5}, "timeout": 0.1}})
+    providers.append({"tests.test_analysis.SleepingProvider": {"arguments": {"delay": 0.3}}})
+    config = {
+        "provider_concurrency": 6,
+        "analysis": {"group": {"providers": providers, "checkers": ["archan.plugins.checkers.CompleteMediation"]}},
+    }
+    analysis = Analysis(Config(config))
+    start = time.monotonic()
+    analysis.run(verbose=False)
+    assert time.monotonic() - start < 1
+    assert [result.code for result in analysis.results] == [Checker.Code.PASSED] * 4 + [
+        Checker.Code.TIMEOUT,
+        Checker.Code.PASSED,
+    ]
+    provider = AsyncProvider(arguments={"delay": 0})
+    provider.run()
+    assert provider.data.entities == ["a", "b"]
+
+
+def test_no_concurrent_providers_when_releasing_data():
+    """Providers run in turn when their data are released, or in fail-fast mode."""
+    config = Config({"analysis": {"tests.test_analysis.AsyncProvider": {"checkers": []}}})
+    groups = config.analysis_groups
+    assert len(Analysis(config).concurrent_providers(groups)) == 1
+    assert Analysis(config, provider_data="free").concurrent_providers(groups) == []
+    assert Analysis(config, provider_data="spill").concurrent_providers(groups) == []
+    assert Analysis(config, fail_fast=True).concurrent_providers(groups) == []
+
+
+def test_provider_cache_relative_paths(tmp_path, monkeypatch):
+    """Relative paths are resolved, so the same path in another directory gets another key."""
+    provider = CountingCSVProvider(arguments={"file_path": "dsm.csv"})
+    keys = []
+    for directory in ("first", "second"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "dsm.csv").write_text("entity,a\na,1\n")
+        os.utime(tmp_path / directory / "dsm.csv", ns=(0, 0))
+        monkeypatch.chdir(tmp_path / directory)
+        keys.append(ProviderCache.key(provider))
+    assert keys[0] != keys[1]
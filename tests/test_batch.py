@@ -0,0 +1,72 @@
+"""Tests for the `batch` module."""
+
+import io
+import json
+
+from archan import batch
+from archan.config import Config
+
+CSV = "entity,a,b\na,1,0\nb,0,1\n"
+
+CONFIG = {
+    "analysis": {
+        "Group": {
+            "providers": ["archan.plugins.providers.CSVInput"],
+            "checkers": ["archan.plugins.checkers.CompleteMediation", "archan.plugins.checkers.LayeredArchitecture"],
+        }
+    }
+}
+
+
+def test_expand_inputs(tmp_path):
+    """Inputs are expanded from paths, glob patterns and manifests, in order and without duplicates."""
+    for name in ("a.csv", "b.csv", "c.txt"):
+        (tmp_path / name).write_text(CSV)
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# comment\n\n%s\n" % (tmp_path / "c.txt"))
+    inputs = batch.expand_inputs([str(tmp_path / "b.csv"), str(tmp_path / "*.csv")], str(manifest))
+    assert inputs == [str(tmp_path / name) for name in ("b.csv", "a.csv", "c.txt")]
+
+
+def test_run_batch(tmp_path):
+    """Each input gets its own section, and errors do not stop the batch."""
+    inputs = [str(tmp_path / "a.csv"), str(tmp_path / "missing.csv"), str(tmp_path / "b.csv")]
+    (tmp_path / "a.csv").write_text(CSV)
+    (tmp_path / "b.csv").write_text(CSV)
+    stream = io.StringIO()
+    summary = batch.run_batch(Config(CONFIG), inputs, jobs=1, output_format="json", stream=stream)
+    reports = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [report["input"] for report in reports] == inputs
+    assert [len(report["results"]) for report in reports] == [2, 0, 2]
+    assert reports[1]["error"]
+    assert summary["inputs"] == 3
+    assert summary["errors"] == 1
+
+
+def test_run_batch_tap(tmp_path):
+    """Inputs are numbered in a single TAP stream, with their results as subtests."""
+    inputs = [str(tmp_path / "a.csv"), str(tmp_path / "missing.csv")]
+    (tmp_path / "a.csv").write_text(CSV)
+    stream = io.StringIO()
+    batch.run_batch(Config(CONFIG), inputs, jobs=1, stream=stream)
+    lines = stream.getvalue().splitlines()
+    assert lines.count("TAP version 13") == 1
+    assert lines[1] == "# Subtest: %s" % inputs[0]
+    assert "    1..2" in lines
+    assert "ok 1 %s" % inputs[0] in lines
+    assert "not ok 2 %s" % inputs[1] in lines
+    assert lines[-1] == "1..2"
+
+
+def test_main_exit_code(tmp_path, monkeypatch, capsys):
+    """The exit code aggregates the status of every input, analyzed in worker processes."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "archan.yml").write_text(json.dumps(CONFIG))
+    (tmp_path / "a.csv").write_text(CSV)
+    (tmp_path / "b.csv").write_text(CSV)
+    assert batch.main(["*.csv", "--jobs", "2"]) == 0
+    output = capsys.readouterr().out
+    assert "# Subtest: a.csv" in output
+    assert "ok 2 b.csv" in output
+    (tmp_path / "c.csv").write_text("not a matrix")
+    assert batch.main(["*.csv", "--jobs", "2"]) == 1
@@ -0,0 +1,106 @@
+"""Tests for the `benchmark` module."""
+
+import json
+
+from archan import benchmark
+from archan.plugins.providers import CSVInput
+
+
+def test_generate_dsm_is_seeded():
+    """Same seed, same DSM."""
+    first = benchmark.generate_dsm(50, seed=1)
+    second = benchmark.generate_dsm(50, seed=1)
+    assert first.data == second.data
+    assert first.entities == second.entities
+    assert benchmark.generate_dsm(50, seed=2).data != first.data
+
+
+def test_generate_dsm_options():
+    """Check size, categories, package depth and cycle rate."""
+    dsm = benchmark.generate_dsm(64, density=0.1, package_depth=3, cycle_rate=0, categories=(("corelib", 1),))
+    assert dsm.size == (64, 64)
+    assert set(dsm.categories) == {"corelib"}
+    assert len(set(dsm.entities)) == 64
+    assert all(entity.count(".") == 2 for entity in dsm.entities)
+    # no dependency above the diagonal except for the first row
+    assert not any(dsm.data[i][j] for i in range(1, 64) for j in range(i + 1, 64))
+
+
+def test_write_csv_roundtrip(tmp_path):
+    """
+    Write a generated DSM and read it back with `CSVInput`.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    dsm = benchmark.generate_dsm(20)
+    file_path = str(tmp_path / "dsm.csv")
+    benchmark.write_csv(dsm, file_path, categories_delimiter="|")
+    read = CSVInput().get_data(file_path, categories_delimiter="|")
+    assert [list(row) for row in read.data] == dsm.data
+    assert list(read.entities) == dsm.entities
+    assert list(read.categories) == dsm.categories
+
+
+def test_run_benchmarks(tmp_path):
+    """
+    Run every benchmark on small sizes and store the results as JSON.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    output = tmp_path / "results.json"
+    assert benchmark.main(["run", "--sizes", "10,20", "--repeat", "1", "-o", str(output)]) == 0
+    results = json.loads(output.read_text())
+    names = {result["name"] for result in results["benchmarks"].values()}
+    assert {"provider.CSVInput", "dsm.transitive_closure", "checker.CompleteMediation"} <= names
+    assert results["benchmarks"]["checker.LayeredArchitecture[20]"]["peak_memory"] > 0
+
+
+def _results(median, stdev=0.0, peak_memory=1000000):
+    return {
+        "benchmarks": {
+            "checker.CodeClean[100]": {
+                "name": "checker.CodeClean",
+                "size": 100,
+                "skipped": None,
+                "median": median,
+                "stdev": stdev,
+                "peak_memory": peak_memory,
+            }
+        }
+    }
+
+
+def test_compare_results():
+    """Compare results with significant and insignificant deltas."""
+    key = "checker.CodeClean[100]"
+    baseline = _results(1.0)
+    assert benchmark.compare_results(baseline, _results(1.05))[key]["status"] == "unchanged"
+    assert benchmark.compare_results(baseline, _results(1.5))[key]["status"] == "regression"
+    assert benchmark.compare_results(baseline, _results(0.5))[key]["status"] == "improvement"
+    # within noise
+    assert benchmark.compare_results(_results(1.0, 0.2), _results(1.5, 0.2))[key]["status"] == "unchanged"
+    # memory regression only
+    assert benchmark.compare_results(baseline, _results(1.0, peak_memory=2000000))[key]["status"] == "regression"
+    assert benchmark.compare_results(baseline, {"benchmarks": {}})[key]["status"] == "missing"
+    # no memory allocated by the baseline
+    comparison = benchmark.compare_results(_results(1.0, peak_memory=0), _results(1.0, peak_memory=100))[key]
+    assert comparison["memory_ratio"] == 0.0
+
+
+def test_compare_exit_code(tmp_path):
+    """
+    Exit with code 1 on significant regressions only.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    baseline = tmp_path / "baseline.json"
+    faster = tmp_path / "faster.json"
+    slower = tmp_path / "slower.json"
+    baseline.write_text(json.dumps(_results(1.0)))
+    faster.write_text(json.dumps(_results(0.9)))
+    slower.write_text(json.dumps(_results(2.0)))
+    assert benchmark.main(["compare", str(baseline), str(faster)]) == 0
+    assert benchmark.main(["compare", str(baseline), str(slower)]) == 1
@@ -1,5 +1,8 @@
 """Tests for the `cli` module."""
 
+import subprocess
+import sys
+
 import pytest
 
 from archan import cli
@@ -21,3 +24,20 @@ def test_show_help(capsys):
         cli.main(["-h"])
     captured = capsys.readouterr()
     assert "archan" in captured.out
+
+
+def test_fast_startup():
+    """Heavy modules and plugins are not imported to show the version."""
+    code = (
+        "import sys\n"
+        "from archan import cli\n"
+        "try:\n"
+        "    cli.main(['--version'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "heavy = ('pkg_resources', 'yaml', 'tap', 'colorama', 'archan.config', 'archan.plugins.checkers',\n"
+        "         'asyncio', 'logging.handlers')\n"
+        "print(','.join(module for module in heavy if module in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout
+    assert output.decode().split("\n")[-2] == ""
@@ -0,0 +1,95 @@
+"""Tests for the `cochange` module."""
+
+import subprocess
+
+import pytest
+
+from archan import cochange
+from archan.plugins.providers import GitCoChanges
+
+
+def commit(repository, *files):
+    """
+    Change files and commit them.
+
+    Arguments:
+        repository: The path to the git repository.
+        *files: The paths of the files to change.
+    """
+    for path in files:
+        file_path = repository / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_path.open("a") as stream:
+            stream.write("change\n")
+    subprocess.run(["git", "-C", str(repository), "add", "."], check=True)
+    subprocess.run(
+        ["git", "-C", str(repository), "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + ["commit", "-q", "-m", "change"],
+        check=True,
+    )
+
+
+@pytest.fixture()
+def repository(tmp_path):
+    """
+    Create a git repository with a few commits.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+
+    Returns:
+        The path to the repository.
+    """
+    path = tmp_path / "repository"
+    path.mkdir()
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    commit(path, "a/one.py", "b/two.py")
+    commit(path, "a/one.py", "a/three.py", "c/README.md")
+    commit(path, "b/two.py")
+    return path
+
+
+def test_co_changes(repository):
+    """Modules changed in the same commit, or within the window, are counted together."""
+    dsm = GitCoChanges().get_data(str(repository), depth=1, pattern="*.py", resume=False)
+    assert dsm.entities == ["a", "b"]
+    assert [list(row) for row in dsm.data] == [[0, 1], [1, 0]]
+    dsm = GitCoChanges().get_data(str(repository), depth=1, window=2, resume=False)
+    assert dsm.entities == ["a", "b", "c"]
+    assert [list(row) for row in dsm.data] == [[0, 3, 1], [3, 0, 2], [1, 2, 0]]
+    # the skipped commit still separates the first and last ones
+    dsm = GitCoChanges().get_data(str(repository), depth=1, window=2, max_files=2, resume=False)
+    assert dsm.entities == ["a", "b"]
+    assert [list(row) for row in dsm.data] == [[0, 1], [1, 0]]
+
+
+def test_resume(repository, monkeypatch):
+    """Only the new commits are processed by the next run."""
+    ranges = []
+    iter_commits = cochange.iter_commits
+
+    def recording_iter_commits(path, revisions):
+        ranges.append(revisions)
+        return iter_commits(path, revisions)
+
+    monkeypatch.setattr(cochange, "iter_commits", recording_iter_commits)
+    cochange.count_co_changes(str(repository), window=2)
+    commit(repository, "c/README.md", "b/two.py")
+    counter = cochange.count_co_changes(str(repository), window=2)
+    assert len(ranges) == 2
+    assert ".." in ranges[1]
+    fresh = cochange.count_co_changes(str(repository), window=2, resume=False)
+    assert counter.modules == fresh.modules
+    assert counter.counts == fresh.counts
+    cochange.count_co_changes(str(repository), window=2)
+    assert len(ranges) == 3
+
+
+def test_unusable_cache_directory(repository, tmp_path, monkeypatch):
+    """Co-changes are counted from the first commit when the cache directory cannot be created."""
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("ARCHAN_CACHE_DIR", str(tmp_path / "file" / "cache"))
+    for resume in (True, False):
+        counter = cochange.count_co_changes(str(repository), depth=1, pattern="*.py", resume=resume)
+        assert counter.modules == ["a", "b"]
+        assert counter.counts == {(0, 1): 1}
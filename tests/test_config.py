@@ -0,0 +1,71 @@
+"""Tests for the `config` module."""
+
+import pytest
+
+from archan import config as config_module
+from archan.config import Config
+from archan.plugins.checkers import CompleteMediation, LayeredArchitecture
+from archan.plugins.providers import CSVInput
+
+CONFIG = """
+analysis:
+  archan.plugins.providers.CSVInput:
+    arguments:
+      file_path: matrix.csv
+    checkers:
+      - archan.plugins.checkers.CompleteMediation
+      - archan.plugins.checkers.LayeredArchitecture:
+          allow_failure: true
+  Named group:
+    description: A named group.
+    Open design: true
+    Closed design:
+      passes: false
+      allow_failure: true
+"""
+
+
+def _check_groups(config):
+    provider_group, named_group = config.analysis_groups
+    assert isinstance(provider_group.providers[0], CSVInput)
+    assert provider_group.providers[0].arguments == {"file_path": "matrix.csv"}
+    assert [type(checker) for checker in provider_group.checkers] == [CompleteMediation, LayeredArchitecture]
+    assert provider_group.checkers[1].allow_failure
+    assert named_group.name == "Named group"
+    assert named_group.description == "A named group."
+    assert [checker.name for checker in named_group.checkers] == ["Open design", "Closed design"]
+
+
+def test_compile_does_not_modify_config_dict():
+    """The configuration dictionary is left untouched, so it can be inflated again."""
+    config_dict = config_module.load_yaml(CONFIG)
+    config = Config(config_dict)
+    _check_groups(config)
+    assert config_dict == config_module.load_yaml(CONFIG)
+    assert config.inflate_analysis_groups()[0].checkers[0] is not config.analysis_groups[0].checkers[0]
+
+
+def test_compiled_config_cache(tmp_path, monkeypatch):
+    """
+    The second read of a configuration file comes from the compiled cache.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    config_file = tmp_path / "archan.yml"
+    config_file.write_text(CONFIG)
+    _check_groups(Config.from_file(str(config_file)))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(config_module, "load_yaml", pytest.fail)
+        _check_groups(Config.from_file(str(config_file)))
+
+    config_file.write_text(CONFIG.replace("Open design", "Opened design"))
+    assert Config.from_file(str(config_file)).analysis_groups[1].checkers[0].name == "Opened design"
+
+
+def test_compile_plugins_tuple():
+    """Plugins lists can be tuples, as in the default configuration."""
+    identifier = "archan.plugins.checkers.CompleteMediation"
+    assert Config().compile_plugins((identifier, "unknown.Checker"), "checker") == [(identifier, None)]
@@ -0,0 +1,90 @@
+"""Tests for the `dsm` module."""
+
+import pickle
+from array import array
+
+import pytest
+
+from archan.dsm import DesignStructureMatrix, DomainMappingMatrix, MultipleDomainMatrix
+from archan.errors import MatrixError
+
+
+def test_shared_memory_round_trip():
+    """Attached matrices have the same cells, in the smallest type, without validation."""
+    dsm = DesignStructureMatrix([[1, 0, 300], [0, 1, 0], [2, 0, 1]], ["a", "b", "c"], ["app"] * 3)
+    handle = dsm.share()
+    try:
+        assert handle.typecode == "h"  # 300 does not fit in a byte
+        attached = handle.attach()
+        assert isinstance(attached, DesignStructureMatrix)
+        assert [list(row) for row in attached.data] == dsm.data
+        assert attached.entities == dsm.entities
+        assert attached.size == (3, 3)
+        with pytest.raises(TypeError):
+            attached.data[0][0] = 0  # noqa: WPS428 (read-only rows)
+        attached.detach()
+    finally:
+        handle.unlink()
+
+
+def test_share_floats_and_mdm():
+    """Floats are shared as doubles, multiple domain matrices cannot be shared."""
+    handle = DomainMappingMatrix([[0.5, 1.0]], ["a", "b", "c"]).share()
+    try:
+        attached = handle.attach()
+        assert handle.typecode == "d"
+        assert list(attached.data[0]) == [0.5, 1.0]
+        attached.detach()
+    finally:
+        handle.unlink()
+    dsm = DesignStructureMatrix([[1]], ["a"])
+    with pytest.raises(MatrixError):
+        MultipleDomainMatrix([[dsm]]).share()
+    with pytest.raises(MatrixError):
+        DomainMappingMatrix([[0.5, 1]], ["a", "b", "c"]).share()
+
+
+@pytest.mark.parametrize(
+    ("data", "entities"),
+    [
+        ([[0, 1], [1, 0]], ["a", "b"]),
+        ([[1, -5], [70000, 1]], ["a", "b"]),
+        ([[0.5, 1]], ["a", "b", "c"]),
+        ([[0.5, 1.5]], ["a", "b", "c"]),
+        ([[1, 2 ** 70], [0, 1]], ["a", "b"]),
+        ([], []),
+    ],
+)
+def test_compact_pickling(data, entities):
+    """Cells are packed and compressed, and matrices are restored without validation."""
+    matrix_class = DomainMappingMatrix if len(entities) == 3 else DesignStructureMatrix
+    matrix = matrix_class(data, entities, ["app"] * len(entities) if entities else None)
+    matrix.extra = "kept"
+    restored = pickle.loads(pickle.dumps(matrix))  # noqa: S301 (our own pickle)
+    assert type(restored) is matrix_class
+    assert restored.data == data
+    assert [list(map(type, row)) for row in restored.data] == [list(map(type, row)) for row in data]
+    assert restored.entities == entities
+    assert restored.categories == matrix.categories
+    assert restored.extra == "kept"
+
+
+def test_array_rows_pickling():
+    """Array rows are restored as arrays, of the same type."""
+    data = [array("h", [1, 300]), array("h", [0, 1])]
+    restored = pickle.loads(pickle.dumps(DesignStructureMatrix(data, ["a", "b"])))  # noqa: S301 (our own pickle)
+    assert restored.data == data
+    assert [row.typecode for row in restored.data] == ["h", "h"]
+    mixed = [array("b", [1, 0]), array("h", [0, 300])]
+    restored = pickle.loads(pickle.dumps(DesignStructureMatrix(mixed, ["a", "b"])))  # noqa: S301 (our own pickle)
+    assert [row.typecode for row in restored.data] == ["b", "h"]
+
+
+def test_compact_pickling_size():
+    """Sparse matrices are much smaller once pickled."""
+    size = 200
+    data = [[1 if (row * 7 + column) % 50 == 0 else 0 for column in range(size)] for row in range(size)]
+    matrix = DesignStructureMatrix(data, [str(index) for index in range(size)])
+    assert len(pickle.dumps(matrix)) * 10 < len(pickle.dumps(data))
+    nested = MultipleDomainMatrix([[matrix]])
+    assert pickle.loads(pickle.dumps(nested)).data[0][0].data == data  # noqa: S301 (our own pickle)
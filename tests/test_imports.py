@@ -0,0 +1,91 @@
+"""Tests for the `imports` module."""
+
+import os
+
+from archan import imports
+from archan.plugins.providers import PythonImports
+
+
+def write_package(root):
+    """
+    Write a small package.
+
+    Arguments:
+        root: The directory to write the package in.
+
+    Returns:
+        The path to the package.
+    """
+    package = root / "pkg"
+    (package / "sub").mkdir(parents=True)
+    (package / "__init__.py").write_text("from .core import run\n")
+    (package / "core.py").write_text("import os\nfrom . import sub\nfrom .sub.tools import helper, other\n")
+    (package / "sub" / "__init__.py").write_text("")
+    (package / "sub" / "tools.py").write_text("from ..core import run\nfrom pkg import core\nimport pkg.sub\n")
+    return package
+
+
+def test_parse_imports():
+    """Relative imports are resolved from the module name, and its kind."""
+    source = "import a.b\nfrom . import c\nfrom ..d import e, f\nfrom .... import g\n"
+    assert imports.parse_imports(source, "x.y.z") == ["a.b", "x.y.c", "x.d.e", "x.d.f"]
+    assert imports.parse_imports("from . import c", "x.y", is_package=True) == ["x.y.c"]
+    assert imports.parse_imports("from ..x import y", "pkg.mod") == []
+    assert imports.parse_imports("from ...w import g", "x.y.z") == []
+    assert imports.resolve_import("x.d.e", {"x", "x.d"}) == "x.d"
+    assert imports.resolve_import("os.path", {"x"}) is None
+
+
+def test_import_matrix(tmp_path):
+    """Internal imports are counted between modules, external imports are ignored."""
+    dsm = PythonImports().get_data([str(write_package(tmp_path))], jobs=1, cache_imports=False)
+    assert dsm.entities == ["pkg", "pkg.core", "pkg.sub", "pkg.sub.tools"]
+    assert [list(row) for row in dsm.data] == [[0, 1, 0, 0], [0, 0, 1, 2], [0, 0, 0, 0], [0, 2, 1, 0]]
+
+
+def test_cached_imports(tmp_path, monkeypatch):
+    """Only the files whose contents changed are parsed again."""
+    package = write_package(tmp_path)
+    parsed = []
+    parse_imports = imports.parse_imports
+
+    def counting_parse_imports(source, module_name, *args):
+        parsed.append(module_name)
+        return parse_imports(source, module_name, *args)
+
+    monkeypatch.setattr(imports, "parse_imports", counting_parse_imports)
+    imports.scan_imports([str(package)], jobs=1)
+    assert len(parsed) == 4
+    parsed.clear()
+    core = package / "core.py"
+    os.utime(core, ns=(0, 0))
+    (package / "sub" / "tools.py").write_text("import pkg\n")
+    _, dependencies = imports.scan_imports([str(package)], jobs=1)
+    assert parsed == ["pkg.sub.tools"]
+    assert dependencies[("pkg.sub.tools", "pkg")] == 1
+    assert dependencies[("pkg.core", "pkg.sub.tools")] == 2
+
+
+def test_no_pool_in_daemon_process(tmp_path, monkeypatch):
+    """Files are parsed in turn in daemon processes, which cannot have children."""
+
+    class DaemonProcess(object):
+        daemon = True
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("daemonic processes are not allowed to have children")
+
+    monkeypatch.setattr(imports.multiprocessing, "current_process", DaemonProcess)
+    monkeypatch.setattr(imports.multiprocessing, "Pool", no_pool)
+    modules, dependencies = imports.scan_imports([str(write_package(tmp_path))], jobs=2, cache=False)
+    assert len(modules) == 4
+    assert dependencies[("pkg.core", "pkg.sub.tools")] == 2
+
+
+def test_unusable_cache_directory(tmp_path, monkeypatch):
+    """Imports are scanned without cache when the cache directory cannot be created."""
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv("ARCHAN_CACHE_DIR", str(tmp_path / "file" / "cache"))
+    modules, dependencies = imports.scan_imports([str(write_package(tmp_path))], jobs=1)
+    assert len(modules) == 4
+    assert dependencies[("pkg.core", "pkg.sub.tools")] == 2
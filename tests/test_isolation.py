@@ -0,0 +1,142 @@
+"""Tests for the `isolation` module."""
+
+import os
+
+import pytest
+
+from archan.analysis import Analysis
+from archan.config import Config
+from archan.errors import PluginCrashError, PluginTimeoutError
+from archan.isolation import WorkerPool
+from archan.plugins import Checker
+from tests.test_analysis import SlowChecker
+
+
+class CrashingChecker(Checker):
+    """Checker killing its process."""
+
+    identifier = "tests.CrashingChecker"
+    name = "Crashing"
+
+    def check(self, dsm, **kwargs):
+        """
+        Exit abruptly.
+
+        Arguments:
+            dsm: Unused.
+            **kwargs: Unused.
+        """
+        os._exit(3)  # noqa: WPS437 (simulating a crash)
+
+
+class RaisingChecker(Checker):
+    """Checker raising an error."""
+
+    identifier = "tests.RaisingChecker"
+    name = "Raising"
+
+    def check(self, dsm, **kwargs):
+        """
+        Raise an error.
+
+        Arguments:
+            dsm: Unused.
+            **kwargs: Unused.
+
+        Raises:
+            RuntimeError: Always.
+        """
+        raise RuntimeError("broken")
+
+
+class PidChecker(Checker):
+    """Checker returning its process identifier."""
+
+    identifier = "tests.PidChecker"
+    name = "PID"
+
+    def check(self, dsm, **kwargs):
+        """
+        Pass, with the process identifier as message.
+
+        Arguments:
+            dsm: Unused.
+            **kwargs: Unused.
+
+        Returns:
+            True and the process identifier.
+        """
+        return True, str(os.getpid())
+
+
+def test_worker_pool():
+    """Workers are reused, replaced when they crash, and killed on timeout."""
+    pool = WorkerPool()
+    try:
+        checker = PidChecker()
+        pool.run_checker(checker, None)
+        pid = checker.result.messages[0].text
+        assert pid != str(os.getpid())
+        with pytest.raises(PluginCrashError, match="RuntimeError: broken"):
+            pool.run_checker(RaisingChecker(), None)
+        pool.run_checker(checker, None)
+        assert checker.result.messages[0].text == pid
+        with pytest.raises(PluginCrashError, match="exited with code 3"):
+            pool.run_checker(CrashingChecker(), None)
+        pool.run_checker(checker, None)
+        assert checker.result.messages[0].text != pid
+        with pytest.raises(PluginTimeoutError):
+            pool.run_checker(SlowChecker(), None, timeout=0.05)
+    finally:
+        pool.close()
+
+
+def test_crashes_are_results():
+    """Crashes of isolated checkers are failed results, the other checkers still run."""
+    config = Config(
+        {
+            "analysis": {
+                "tests.test_analysis.MatrixProvider": {
+                    "checkers": [
+                        {"tests.test_isolation.CrashingChecker": {"isolate": True}},
+                        "archan.plugins.checkers.CompleteMediation",
+                    ]
+                }
+            }
+        }
+    )
+    analysis = Analysis(config)
+    analysis.run(verbose=False)
+    analysis.close()
+    assert [result.code for result in analysis.results] == [Checker.Code.FAILED, Checker.Code.PASSED]
+    assert analysis.results[0].text == "Checker crashed: worker exited with code 3"
+
+
+def test_isolated_checkers_attach_shared_data():
+    """Isolated checkers receive the provider's data through shared memory."""
+    config = Config(
+        {
+            "analysis": {
+                "tests.test_analysis.MatrixProvider": {
+                    "checkers": [
+                        {"archan.plugins.checkers.CompleteMediation": {"isolate": True}},
+                        {"archan.plugins.checkers.LayeredArchitecture": {"isolate": True}},
+                    ]
+                }
+            }
+        }
+    )
+    analysis = Analysis(config)
+    shared = []
+    original_share = analysis._share_data  # noqa: WPS437 (private method)
+
+    def share_data(provider, checkers):
+        handle = original_share(provider, checkers)
+        shared.append(handle)
+        return handle
+
+    analysis._share_data = share_data  # noqa: WPS437 (private method)
+    analysis.run(verbose=False)
+    analysis.close()
+    assert [result.code for result in analysis.results] == [Checker.Code.PASSED, Checker.Code.PASSED]
+    assert shared[0].shape == (2, 2)
@@ -0,0 +1,68 @@
+"""Tests for the `logging` module."""
+
+import json
+import logging
+import queue
+
+import pytest
+
+from archan.logging import Logger
+
+
+@pytest.fixture()
+def shared_handlers():
+    """
+    Restore the shared handlers and level after a test.
+
+    Yields:
+        The shared handlers at the start of the test.
+    """
+    handlers = list(Logger.get_handlers())
+    level = Logger.level
+    yield handlers
+    for handler in Logger.handlers:
+        if handler not in handlers:
+            handler.close()
+    Logger.set_handlers(handlers)
+    Logger.set_level(level)
+
+
+def test_loggers_share_handlers(shared_handlers):
+    """Loggers do not get a handler each."""
+    first = Logger.get_logger("tests.logging.first")
+    second = Logger.get_logger("tests.logging.second")
+    assert first.handlers == second.handlers == shared_handlers
+
+
+def test_lazy_formatting(shared_handlers):
+    """Arguments of records under the logging level are never formatted."""
+
+    class Expensive(object):
+        formatted = 0
+
+        def __str__(self):
+            Expensive.formatted += 1
+            return "expensive"
+
+    Logger.set_level(logging.ERROR)
+    Logger.get_logger("tests.logging.lazy").debug("Value = %s", Expensive())
+    assert Expensive.formatted == 0
+
+
+def test_queue_to_json_sink(shared_handlers, tmp_path):
+    """Records sent through a queue reach the JSON-lines sink of the listener."""
+    sink = tmp_path / "log.jsonl"
+    Logger.add_json_sink(str(sink))
+    Logger.set_level(logging.INFO)
+    records = queue.Queue()
+    listener = Logger.listen(records)
+    logger = Logger.get_logger("tests.logging.queue")
+    listening_handlers = list(Logger.handlers)
+    Logger.enable_queue(records)
+    logger.info("Read %s entities", 3)
+    listener.stop()
+    Logger.set_handlers(listening_handlers)
+    entry = json.loads(sink.read_text())
+    assert entry["message"] == "Read 3 entities"
+    assert entry["logger"] == "tests.logging.queue"
+    assert entry["level"] == "INFO"
@@ -0,0 +1,44 @@
+"""Tests for the `output` module."""
+
+import io
+
+from archan.output import TapWriter
+from archan.plugins import Message
+
+
+def test_tap_stream():
+    """Tests are numbered across suites, diagnostics are YAML blocks, and the plan comes last."""
+    stream = io.StringIO()
+    with TapWriter(stream) as writer:
+        writer.suite("First")
+        writer.ok("passed")
+        writer.suite("Second")
+        writer.not_ok("failed #1", messages=(Message('"%s" depends on %s', ("a", "b")),), hint="Fix\n  it.")
+        writer.not_ok("not implemented", "TODO implement the test")
+    assert stream.getvalue() == (
+        "TAP version 13\n"
+        "# TAP results for First\n"
+        "ok 1 passed\n"
+        "# TAP results for Second\n"
+        "not ok 2 failed \\#1\n"
+        "  ---\n"
+        "  messages:\n"
+        '    - "\\"a\\" depends on b"\n'
+        '  hint: "Fix it."\n'
+        "  ...\n"
+        "not ok 3 not implemented # TODO implement the test\n"
+        "1..3\n"
+    )
+
+
+def test_truncated_diagnostics(tmp_path):
+    """Messages over the limit are counted, and written to the side file."""
+    stream = io.StringIO()
+    side_file = tmp_path / "diagnostics.txt"
+    messages = tuple(Message("message %s", (index,)) for index in range(5))
+    with TapWriter(stream, max_messages=2, diagnostics_file=str(side_file)) as writer:
+        writer.not_ok("failed", messages=messages)
+    output = stream.getvalue()
+    assert '    - "message 1"\n  truncated: 3\n' in output
+    assert "message 2" not in output
+    assert side_file.read_text().splitlines() == ["# 1 failed"] + ["message %s" % index for index in range(5)]
@@ -0,0 +1,36 @@
+"""Tests for the `printing` module."""
+
+import os
+
+import pytest
+
+from archan import printing
+
+
+@pytest.mark.parametrize(
+    "description",
+    ["short line", "  padded line  ", "a line long enough to be wrapped " * 4, "two\nlines", "tab\tseparated"],
+)
+@pytest.mark.parametrize("indent", [0, 4])
+def test_pretty_description_fast_path(description, indent):
+    """Short lines skip the text wrapper, with the same output."""
+    wrapper = printing.text_wrapper_for(40, indent)
+    expected = wrapper.fill(" ".join(line.strip() for line in description.strip().split("\n")))
+    assert printing.pretty_description(description, wrap_at=40, indent=indent) == expected
+
+
+def test_console_width_computed_once(monkeypatch):
+    """The terminal size is queried once per run."""
+    printing.console_width.cache_clear()
+    calls = []
+
+    def get_terminal_size(fallback):
+        calls.append(fallback)
+        return os.terminal_size((100, 20))
+
+    monkeypatch.setattr(printing.shutil, "get_terminal_size", get_terminal_size)
+    for _ in range(3):
+        printing.pretty_description("some text")
+    assert len(calls) == 1
+    assert printing.text_wrapper_for(100, 2) is printing.text_wrapper_for(100, 2)
+    printing.console_width.cache_clear()
@@ -0,0 +1,95 @@
+"""Tests for the `providers` module."""
+
+import bz2
+import gzip
+import io
+import lzma
+from array import array
+
+import pytest
+
+from archan.plugins.providers import CSVInput, EdgeListInput, open_input, parse_rows
+
+CSV = "entity,a,b,c\na,1,0,0\nb,0,1,0\nc,0,1,1\n"
+
+
+def test_compact_rows():
+    """Rows are arrays of the smallest integer type fitting every cell."""
+    assert parse_rows(["a,1,0\n", "b,0,1\n"]) == [array("b", [1, 0]), array("b", [0, 1])]
+    rows = parse_rows(["a;1;0", "b;300;01"], delimiter=";")
+    assert [row.typecode for row in rows] == ["h", "h"]
+    assert [list(row) for row in rows] == [[1, 0], [300, 1]]
+    assert parse_rows(["a,1,0\n"], compact=False) == [[1, 0]]
+    with pytest.raises(ValueError):
+        parse_rows(["a,1.5,0\n"])
+    with pytest.raises(ValueError):
+        parse_rows(["a,true,false\n"])
+    with pytest.raises(ValueError):
+        parse_rows(["a,%d,0\n" % 2 ** 64])
+    assert parse_rows(["a,%d,0\n" % 2 ** 64], compact=False) == [[2 ** 64, 0]]
+
+
+def test_streamed_lines():
+    """Lines are consumed from an iterator, up to the number of entities."""
+    lines = iter(CSV.splitlines(keepends=True) + ["trailing,line\n"])
+    dsm = CSVInput.parse_lines(lines, categories_delimiter=None)
+    assert list(dsm.entities) == ["a", "b", "c"]
+    assert [list(row) for row in dsm.data] == [[1, 0, 0], [0, 1, 0], [0, 1, 1]]
+    assert next(lines) == "trailing,line\n"
+
+
+def test_parallel_parsing(tmp_path):
+    """Chunks parsed in parallel give the same matrix."""
+    size = 50
+    header = ",".join(["entity"] + ["e%d" % index for index in range(size)])
+    lines = [
+        ",".join(["e%d" % row] + [str((row * column) % 200) for column in range(size)]) for row in range(size)
+    ]
+    file_path = tmp_path / "dsm.csv"
+    file_path.write_text("\n".join([header] + lines) + "\n")
+    sequential = CSVInput().get_data(str(file_path))
+    parallel = CSVInput().get_data(str(file_path), jobs=3)
+    assert parallel.data == sequential.data
+    assert parallel.entities == sequential.entities
+
+
+def test_edge_list(tmp_path):
+    """Edges fill a matrix indexed by the entities file, then by order of appearance."""
+    edges = tmp_path / "edges.csv"
+    edges.write_text("source,target,weight\na,b,2\nc,a\na,b,3\nd,a,200\n")
+    entities = tmp_path / "entities.csv"
+    entities.write_text("entity,category\na,app\nb,lib\nc,app\ne,app\n")
+    dsm = EdgeListInput().get_data(str(edges), entities_file=str(entities), header=True)
+    assert list(dsm.entities) == ["a", "b", "c", "e", "d"]
+    assert list(dsm.categories) == ["app", "lib", "app", "app", ""]
+    assert [list(row) for row in dsm.data] == [
+        [0, 5, 0, 0, 0],
+        [0, 0, 0, 0, 0],
+        [1, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0],
+        [200, 0, 0, 0, 0],
+    ]
+    assert dsm.data[0].typecode == "h"
+    dsm = EdgeListInput().get_data(str(edges), header=True)
+    assert list(dsm.entities) == ["a", "b", "c", "d"]
+    assert not dsm.categories
+    edges.write_text("a,b\na,\n,c\n\nb,a\n")
+    entities.write_text("a\n\nb,lib\n")
+    dsm = EdgeListInput().get_data(str(edges), entities_file=str(entities), header=False)
+    assert list(dsm.entities) == ["a", "b"]
+    assert [list(row) for row in dsm.data] == [[0, 1], [1, 0]]
+    entities.write_text("entity,category\na\nb,lib\n")
+    dsm = EdgeListInput().get_data(str(edges), entities_file=str(entities), entities_header=True)
+    assert list(dsm.categories) == ["", "lib"]
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress])
+def test_compressed_input(tmp_path, compress):
+    """Compressed files and standard input are detected and decompressed while parsed."""
+    file_path = tmp_path / "dsm.csv.any"
+    file_path.write_bytes(compress(CSV.encode()))
+    for jobs in (1, 2):
+        dsm = CSVInput().get_data(str(file_path), jobs=jobs)
+        assert [list(row) for row in dsm.data] == [[1, 0, 0], [0, 1, 0], [0, 1, 1]]
+    stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(compress(CSV.encode()))))
+    assert list(CSVInput.parse_lines(open_input(stdin)).entities) == ["a", "b", "c"]
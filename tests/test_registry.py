@@ -0,0 +1,79 @@
+"""Tests for the `registry` module."""
+
+from collections import namedtuple
+
+import pytest
+
+from archan import registry as registry_module
+from archan.config import Config
+from archan.plugins.checkers import CompleteMediation
+from archan.plugins.providers import CSVInput
+
+EntryPoint = namedtuple("EntryPoint", "name value")
+ENTRY_POINTS = (
+    EntryPoint("archan.CSVInput", "archan.plugins.providers:CSVInput"),
+    EntryPoint("archan.CompleteMediation", "archan.plugins.checkers:CompleteMediation"),
+)
+
+
+def _no_discovery(group):
+    raise AssertionError("entry points should not be discovered")
+
+
+@pytest.fixture()
+def registry(monkeypatch):
+    """
+    Return a registry whose cache was written by a previous registry.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+
+    Returns:
+        A plugin registry reading its plugins from the cache.
+    """
+    monkeypatch.setattr(registry_module, "iter_entry_points", lambda group: ENTRY_POINTS)
+    assert registry_module.PluginRegistry().identifiers == ["archan.CSVInput", "archan.CompleteMediation"]
+    monkeypatch.setattr(registry_module, "iter_entry_points", _no_discovery)
+    return registry_module.PluginRegistry()
+
+
+def test_plugins_read_from_cache(registry):
+    """
+    Plugins kinds and metadata are read from the cache, without importing plugins.
+
+    Arguments:
+        registry: A plugin registry reading its plugins from the cache.
+    """
+    assert registry.kind("archan.CSVInput") == "provider"
+    assert registry.kind("archan.CompleteMediation") == "checker"
+    checkers = registry.infos("checker")
+    assert [checker.name for checker in checkers] == [CompleteMediation.name]
+    assert registry.infos("provider")[0].argument_list[0].name == "file_path"
+    assert not registry._classes  # noqa: WPS437 (private attribute)
+
+
+def test_plugins_loaded_on_demand(registry):
+    """
+    Only referenced plugins are loaded.
+
+    Arguments:
+        registry: A plugin registry reading its plugins from the cache.
+    """
+    config = Config(registry=registry)
+    assert config.get_checker("archan.CompleteMediation") is CompleteMediation
+    assert registry.get("archan.CompleteMediation", "provider") is None
+    assert list(registry._classes) == ["archan.CompleteMediation"]  # noqa: WPS437 (private attribute)
+    assert config.available_providers == {"archan.CSVInput": CSVInput}
+
+
+def test_cache_refreshed_on_environment_change(registry, monkeypatch):
+    """
+    The cache is ignored when the installed distributions change.
+
+    Arguments:
+        registry: A plugin registry reading its plugins from the cache.
+        monkeypatch: Pytest fixture to patch objects.
+    """
+    monkeypatch.setattr(registry_module, "environment_signature", lambda: "changed")
+    monkeypatch.setattr(registry_module, "iter_entry_points", lambda group: ENTRY_POINTS[:1])
+    assert registry_module.PluginRegistry().identifiers == ["archan.CSVInput"]
@@ -0,0 +1,103 @@
+"""Tests for the `server` module."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from archan.config import Config
+from archan.server import AnalysisServer, InputError, make_server, server_address
+
+CONFIG = {
+    "analysis": {
+        "archan.plugins.providers.CSVInput": {
+            "arguments": {"file_path": "missing.csv"},
+            "checkers": ["archan.plugins.checkers.CompleteMediation", "archan.plugins.checkers.LayeredArchitecture"],
+        }
+    }
+}
+
+CSV = "entity,a,b,c\na,1,0,0\nb,1,1,0\nc,0,1,1\n"
+
+
+@pytest.fixture()
+def url():
+    """
+    Run a server on a free port, in a thread.
+
+    Yields:
+        The URL of the server.
+    """
+    server = make_server(AnalysisServer(Config(CONFIG), require_input=True), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server_address(server)
+    server.shutdown()
+    server.server_close()
+
+
+def _post(url, body, content_type="application/json", host=None):
+    headers = {"Content-Type": content_type}
+    if host:
+        headers["Host"] = host
+    request = urllib.request.Request(url + "/analyze", data=body.encode(), headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:  # noqa: S310 (local URL)
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def test_analyze_inline_data(url):
+    """Inline CSV and JSON data replace the configured providers."""
+    status, response = _post(url, json.dumps({"csv": CSV}))
+    assert status == 200
+    assert [result["checker"] for result in response["results"]] == ["Complete Mediation", "Layered Architecture"]
+    assert all(result["provider"] == "Request Input" for result in response["results"])
+
+    dsm = {"data": [[1, 0, 0], [1, 1, 0], [0, 1, 1]], "entities": ["a", "b", "c"]}
+    assert _post(url, json.dumps({"dsm": dsm}))[1] == response
+    assert _post(url, CSV, content_type="text/csv")[1] == response
+
+
+def test_analyze_invalid_input(url):
+    """Missing or invalid input is reported as a client error."""
+    assert _post(url, "{}")[0] == 400
+    assert _post(url, "not json")[0] == 400
+    assert _post(url, json.dumps({"dsm": {"data": [[1, 0]]}}))[0] == 400
+
+
+def test_cross_site_requests_rejected(url):
+    """Bodies without a JSON or CSV content type, and requests to other hosts, are rejected."""
+    assert _post(url, json.dumps({"csv": CSV}), content_type="text/plain")[0] == 415
+    port = url.rpartition(":")[2]
+    assert _post(url, json.dumps({"csv": CSV}), host="attacker.example:%s" % port)[0] == 403
+    assert _post(url, json.dumps({"csv": CSV}), host="localhost:%s" % port)[0] == 200
+
+
+def test_read_file_cache(tmp_path):
+    """Matrices read from files are cached until the file changes."""
+    csv_file = tmp_path / "matrix.csv"
+    csv_file.write_text(CSV)
+    server = AnalysisServer(Config(CONFIG))
+    dsm = server.read_file(str(csv_file))
+    assert server.read_file(str(csv_file)) is dsm
+    csv_file.write_text(CSV.replace("a,1,0,0", "a,1,1,0"))
+    assert server.read_file(str(csv_file)) is not dsm
+    with pytest.raises(InputError):
+        server.get_input({"file_path": str(tmp_path / "missing.csv")})
+
+
+def test_socket_path_not_removed(tmp_path):
+    """Only stale sockets are removed, not other files at the socket path."""
+    regular_file = tmp_path / "archan.sock"
+    regular_file.write_text("data")
+    with pytest.raises(FileExistsError):
+        make_server(AnalysisServer(Config(CONFIG)), socket_path=str(regular_file))
+    assert regular_file.read_text() == "data"
+    regular_file.unlink()
+    for _ in range(2):
+        server = make_server(AnalysisServer(Config(CONFIG)), socket_path=str(regular_file))
+        server.server_close()
@@ -0,0 +1,65 @@
+"""Tests for the `timeouts` module."""
+
+import threading
+import time
+
+import pytest
+
+from archan.dsm import DesignStructureMatrix
+from archan.errors import PluginTimeoutError
+from archan.plugins import Checker
+from archan.plugins.checkers import CompleteMediation
+from archan.timeouts import call_with_timeout
+
+
+def busy_loop():
+    """Loop until interrupted."""
+    while True:  # noqa: WPS457 (interrupted by the timer)
+        time.sleep(0.01)
+
+
+def test_alarm_interrupts_main_thread():
+    """Calls in the main thread are interrupted."""
+    start = time.monotonic()
+    with pytest.raises(PluginTimeoutError):
+        call_with_timeout(busy_loop, 0.05)
+    assert time.monotonic() - start < 1
+    assert call_with_timeout(sum, 1, (1, 2)) == 3
+
+
+def test_thread_fallback():
+    """Calls in other threads run in an abandoned thread, errors are raised in the calling thread."""
+    outcome = {}
+
+    def run():
+        with pytest.raises(PluginTimeoutError):
+            call_with_timeout(time.sleep, 0.05, 0.5)
+        with pytest.raises(ZeroDivisionError):
+            call_with_timeout(lambda: 1 / 0, 1)
+        outcome["value"] = call_with_timeout(max, 1, 1, 2)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert outcome["value"] == 2
+
+
+def test_timeout_not_swallowed():
+    """Plugins catching every exception are still interrupted."""
+
+    def swallowing_loop():
+        while True:  # noqa: WPS457 (interrupted by the timer)
+            try:
+                time.sleep(0.01)
+            except Exception:  # noqa: W0703 (the plugin's own error handling)
+                return "swallowed"
+
+    with pytest.raises(PluginTimeoutError):
+        call_with_timeout(swallowing_loop, 0.05)
+
+
+def test_explicit_zero_timeout():
+    """An explicit timeout of zero is not replaced by the plugin's own timeout."""
+    checker = CompleteMediation(timeout=10)
+    checker.run(DesignStructureMatrix([[1, 0], [0, 1]], ["a", "b"]), timeout=0)
+    assert checker.result.code == Checker.Code.TIMEOUT
@@ -0,0 +1,115 @@
+"""Tests for the `watch` module."""
+
+import sys
+import threading
+
+import pytest
+
+from archan.analysis import Analysis
+from archan.config import Config
+from archan.watch import AnalysisWatcher, InotifyWatcher, PollingWatcher, input_paths
+
+CSV = "entity,a,b\na,1,0\nb,1,1\n"
+
+CONFIG = """
+analysis:
+  A:
+    providers:
+      - archan.plugins.providers.CSVInput:
+          arguments: {file_path: a.csv}
+    checkers:
+      - archan.plugins.checkers.CompleteMediation
+  B:
+    providers:
+      - archan.plugins.providers.CSVInput:
+          arguments: {file_path: b.csv}
+    checkers:
+      - archan.plugins.checkers.LayeredArchitecture
+"""
+
+
+@pytest.fixture()
+def project(tmp_path, monkeypatch):
+    """
+    Create a configuration file and two input files in a temporary directory.
+
+    Arguments:
+        tmp_path: Pytest fixture providing a temporary directory.
+        monkeypatch: Pytest fixture to patch objects.
+
+    Returns:
+        The temporary directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.csv").write_text(CSV)
+    (tmp_path / "b.csv").write_text(CSV)
+    (tmp_path / "archan.yml").write_text(CONFIG)
+    return tmp_path
+
+
+watchers = [PollingWatcher]
+if sys.platform.startswith("linux"):
+    watchers.append(InotifyWatcher)
+
+
+@pytest.mark.parametrize("watcher_class", watchers)
+def test_watcher_detects_changes(project, watcher_class):
+    """Watchers report changed files once they are settled."""
+    watcher = watcher_class([str(project / "a.csv"), str(project)], interval=0.01, debounce=0.05)
+    assert watcher.wait(timeout=0.1) == set()
+    timer = threading.Timer(0.05, (project / "a.csv").write_text, args=(CSV + "\n",))
+    timer.start()
+    assert watcher.wait(timeout=5) == {str(project / "a.csv")}
+    timer.join()
+    watcher.close()
+
+
+@pytest.mark.parametrize("watcher_class", watchers)
+def test_missing_inputs_are_watched(project, watcher_class):
+    """Input files created after the watch started are noticed."""
+    compiled_group = {"providers": [("archan.CSVInput", {"arguments": {"file_path": "c.csv", "delimiter": ","}})]}
+    paths = input_paths(compiled_group)
+    assert str(project / "c.csv") in paths
+    watcher = watcher_class(paths, interval=0.01, debounce=0.05)
+    timer = threading.Timer(0.05, (project / "c.csv").write_text, args=(CSV,))
+    timer.start()
+    assert watcher.wait(timeout=5) == {str(project / "c.csv")}
+    timer.join()
+    watcher.close()
+
+
+def test_only_affected_groups_run_again(project):
+    """Changing an input file runs its group again, and keeps the results of other groups."""
+    analysis = Analysis(Config.from_file("archan.yml"))
+    analysis.run(verbose=False)
+    group_a, group_b = analysis.config.analysis_groups
+    analysis_watcher = AnalysisWatcher(analysis, "archan.yml", watcher=PollingWatcher())
+
+    assert analysis_watcher.update({str(project / "a.csv")}) == 1
+    assert analysis.config.analysis_groups[0] is not group_a
+    assert analysis.config.analysis_groups[1] is group_b
+    assert len(analysis.results) == 2
+
+    (project / "archan.yml").write_text(CONFIG.replace("CompleteMediation", "EconomyOfMechanism"))
+    assert analysis_watcher.update({str(project / "archan.yml")}) == 1
+    assert analysis.config.analysis_groups[1] is group_b
+    assert [result.checker.name for result in analysis.results] == ["Economy of Mechanism", "Layered Architecture"]
+
+
+def test_time_budget_applies_to_updates(project, monkeypatch):
+    """Groups run again get the time budget of the configuration."""
+    (project / "archan.yml").write_text("time_budget: 60\n" + CONFIG)
+    analysis = Analysis(Config.from_file("archan.yml"))
+    analysis.run(verbose=False)
+    analysis_watcher = AnalysisWatcher(analysis, "archan.yml", watcher=PollingWatcher())
+    remaining = []
+    run_group = analysis.run_group
+
+    def timed_run_group(group, verbose=False):
+        remaining.append(analysis.remaining_time())
+        return run_group(group, verbose)
+
+    monkeypatch.setattr(analysis, "run_group", timed_run_group)
+    assert analysis_watcher.update({str(project / "b.csv")}) == 1
+    assert 0 < remaining[0] <= 60
+    assert analysis.remaining_time() is None